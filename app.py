@@ -1,10 +1,12 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
+import time
+import uuid
 import pandas as pd
 from sseclient import SSEClient
-from src.core.database import verify_user, create_session, verify_session, delete_session, create_user
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -12,7 +14,19 @@ load_dotenv()
 
 # 환경 변수에서 설정 가져오기
 CHAT_API_URL = os.getenv('CHAT_API_URL', 'http://localhost:8000/api/v1/chat')
-EMPLOYEE_SEARCH_API = os.getenv('EMPLOYEE_SEARCH_API', 'http://your-api-url/search')
+# 인증/사용자 관리 API 기본 주소 (기본값은 CHAT_API_URL의 /chat 앞부분)
+API_BASE_URL = os.getenv('API_BASE_URL', CHAT_API_URL.rsplit('/chat', 1)[0])
+# 캐시한 로그인 상태를 서버에 다시 확인하는 간격(초, 로그아웃 등으로 폐기된 토큰 감지)
+AUTH_RECHECK_INTERVAL = int(os.getenv('AUTH_RECHECK_INTERVAL', '60'))
+# 직원 검색 API (기본값은 API 서버의 /employees/search)
+EMPLOYEE_SEARCH_API = os.getenv('EMPLOYEE_SEARCH_API', f"{API_BASE_URL}/employees/search")
+# API 서버로의 연결 풀 크기 (Streamlit 세션 전체가 공유)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+# 스트리밍 중 화면 갱신 간격과 갱신 없이 모을 수 있는 최대 글자 수
+STREAM_RENDER_INTERVAL_MS = int(os.getenv('STREAM_RENDER_INTERVAL_MS', '100'))
+STREAM_RENDER_CHARS = int(os.getenv('STREAM_RENDER_CHARS', '500'))
+# 한 번에 표시하는 최근 메시지 수 (나머지는 "이전 메시지 더 보기"로 펼침)
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '20'))
 
 # 페이지 설정
 st.set_page_config(
@@ -21,11 +35,39 @@ st.set_page_config(
     layout="wide"
 )
 
+# API 서버 연결을 재사용하는 HTTP 세션 (요청마다 TCP/TLS 연결을 새로 맺지 않음)
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+http = get_http_session()
+
+def fetch_current_user(token: str) -> dict | None:
+    """API 서버에 토큰 확인 (유효하지 않으면 None, 서버에 닿지 않으면 requests 예외)"""
+    response = http.get(f"{API_BASE_URL}/auth/me", headers={'Authorization': f'Bearer {token}'}, timeout=10)
+    if response.status_code == 401:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+def clear_auth():
+    st.session_state.auth_token = None
+    st.session_state.current_user = None
+    st.session_state.auth_expires_at = 0
+    st.session_state.auth_checked_at = 0
+
 # 세션 상태 초기화
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# 서버에 저장되는 대화 ID (이전 대화는 서버가 이어 붙이므로 매 요청마다 다시 보내지 않음)
+if "conversation_id" not in st.session_state:
+    st.session_state.conversation_id = uuid.uuid4().hex
 if "auth_token" not in st.session_state:
-    st.session_state.auth_token = None
+    clear_auth()
 if "show_user_management" not in st.session_state:
     st.session_state.show_user_management = False
 if "search_query" not in st.session_state:
@@ -34,13 +76,28 @@ if "selected_result" not in st.session_state:
     st.session_state.selected_result = ""
 if "search_results" not in st.session_state:
     st.session_state.search_results = []
+# 화면에 표시할 최근 메시지 수
+if "history_limit" not in st.session_state:
+    st.session_state.history_limit = CHAT_HISTORY_PAGE_SIZE
 
-# 토큰으로 로그인 상태 확인
+# 로그인 상태 확인 (재실행마다 서버에 묻지 않고 만료 시각까지 캐시, 폐기 여부는 AUTH_RECHECK_INTERVAL마다 확인)
 if st.session_state.auth_token:
-    user = verify_session(st.session_state.auth_token)
-    if not user:
-        st.session_state.auth_token = None
-        st.rerun()
+    now = time.time()
+    if now >= st.session_state.auth_expires_at:
+        clear_auth()
+    elif now - st.session_state.auth_checked_at >= AUTH_RECHECK_INTERVAL:
+        try:
+            user = fetch_current_user(st.session_state.auth_token)
+        except requests.RequestException:
+            # API 서버에 잠시 닿지 않으면 캐시한 상태를 유지하고 다음 재실행에서 다시 확인
+            user = st.session_state.current_user
+        else:
+            st.session_state.auth_checked_at = now
+        if user:
+            st.session_state.current_user = user
+            st.session_state.auth_expires_at = user['expires_at']
+        else:
+            clear_auth()
 
 # 로그인 상태가 아닐 때 로그인 폼 표시
 if not st.session_state.auth_token:
@@ -52,18 +109,38 @@ if not st.session_state.auth_token:
         password = st.text_input("Password", type="password")
         
         if st.button("Login"):
-            if user := verify_user(username, password):
-                token = create_session(user['id'])
-                st.session_state.auth_token = token
-                st.rerun()
-            else:
-                st.error("Invalid credentials")
+            try:
+                response = http.post(
+                    f"{API_BASE_URL}/auth/login",
+                    json={"username": username, "password": password},
+                    timeout=30
+                )
+                if response.status_code == 200:
+                    token = response.json()["access_token"]
+                    user = fetch_current_user(token)
+                    if user is None:
+                        # 발급 직후 세션이 만료되거나 폐기된 경우 (다른 곳에서 로그아웃 등)
+                        st.error("로그인 세션을 확인하지 못했습니다. 다시 로그인해주세요.")
+                        st.stop()
+                    st.session_state.auth_token = token
+                    st.session_state.current_user = user
+                    st.session_state.auth_expires_at = user['expires_at']
+                    st.session_state.auth_checked_at = time.time()
+                    st.rerun()
+                elif response.status_code == 401:
+                    st.error("Invalid credentials")
+                elif response.status_code == 429:
+                    st.error("로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요.")
+                else:
+                    st.error(f"API 요청 실패: {response.status_code}")
+            except requests.RequestException as e:
+                st.error(f"API 서버에 연결할 수 없습니다: {str(e)}")
     
     # 로그인 전에는 여기서 중단
     st.stop()
 
-# 현재 사용자 정보 가져오기
-current_user = verify_session(st.session_state.auth_token)
+# 현재 사용자 정보 (위에서 확인해 캐시한 값)
+current_user = st.session_state.current_user
 
 # 로그인 된 경우 채팅 인터페이스 표시
 # 사이드바 설정
@@ -79,9 +156,15 @@ with st.sidebar:
         st.markdown("<br>", unsafe_allow_html=True)  # 약간의 수직 정렬을 위한 공간
         if st.button("🚪", help="로그아웃", key="logout_btn", use_container_width=True):
             if st.session_state.auth_token:
-                delete_session(st.session_state.auth_token)
-            st.session_state.auth_token = None
+                try:
+                    http.post(f"{API_BASE_URL}/auth/logout",
+                              headers={'Authorization': f'Bearer {st.session_state.auth_token}'}, timeout=10)
+                except requests.RequestException:
+                    pass
+            clear_auth()
             st.session_state.messages = []
+            st.session_state.conversation_id = uuid.uuid4().hex
+            st.session_state.history_limit = CHAT_HISTORY_PAGE_SIZE
             st.session_state.show_user_management = False
             st.rerun()
     
@@ -179,7 +262,7 @@ with st.sidebar:
             
             try:
                 with st.spinner("검색 중..."):
-                    response = requests.get(
+                    response = http.get(
                         EMPLOYEE_SEARCH_API,
                         params={
                             'type': 'name' if search_type == "이름으로 검색" else 'position',
@@ -189,17 +272,11 @@ with st.sidebar:
                     )
                     
                     if response.status_code == 200:
-                        results_data = response.json().get("response", "[]")
-                        
-                        if isinstance(results_data, str):
-                            try:
-                                results = json.loads(results_data.replace("'", '"'))
-                            except json.JSONDecodeError:
-                                results = []
-                        elif isinstance(results_data, list):
-                            results = results_data
-                        else:
-                            results = []
+                        # 이름으로 검색하면 직책을, 직책으로 검색하면 이름을 선택지로 사용 (중복 제거, 순위 순서 유지)
+                        other_field = 'position' if search_type == "이름으로 검색" else 'name'
+                        results = list(dict.fromkeys(
+                            employee[other_field] for employee in response.json()["results"] if employee[other_field]
+                        ))
                         
                         st.session_state.search_results = results
                         
@@ -272,6 +349,8 @@ with st.sidebar:
     # 대화 초기화 버튼
     if st.button("🔄 대화 초기화", use_container_width=True):
         st.session_state.messages = []
+        st.session_state.conversation_id = uuid.uuid4().hex
+        st.session_state.history_limit = CHAT_HISTORY_PAGE_SIZE
         st.rerun()
 
 # 메인 인터페이스
@@ -295,10 +374,22 @@ if st.session_state.show_user_management and current_user['username'] == 'admin'
                     st.error("사용자명과 비밀번호를 모두 입력해주세요.")
                 elif new_password != new_password_confirm:
                     st.error("비밀번호가 일치하지 않습니다.")
-                elif create_user(new_username, new_password):
-                    st.success(f"사용자 '{new_username}'가 생성되었습니다.")
                 else:
-                    st.error("이미 존재하는 사용자명입니다.")
+                    try:
+                        response = http.post(
+                            f"{API_BASE_URL}/users",
+                            json={"username": new_username, "password": new_password},
+                            headers={'Authorization': f'Bearer {st.session_state.auth_token}'},
+                            timeout=30
+                        )
+                        if response.status_code == 201:
+                            st.success(f"사용자 '{new_username}'가 생성되었습니다.")
+                        elif response.status_code == 409:
+                            st.error("이미 존재하는 사용자명입니다.")
+                        else:
+                            st.error(f"API 요청 실패: {response.status_code}")
+                    except requests.RequestException as e:
+                        st.error(f"사용자 생성 중 오류가 발생했습니다: {str(e)}")
     
     # 직원 검색 탭
     with search_tab:
@@ -321,17 +412,19 @@ if st.session_state.show_user_management and current_user['username'] == 'admin'
             try:
                 with st.spinner("검색 중..."):
                     # API 요청
-                    response = requests.get(
+                    response = http.get(
                         EMPLOYEE_SEARCH_API,
                         params={
                             'type': 'name' if search_type == "이름으로 검색" else 'position',
-                            'query': search_query
+                            'query': search_query,
+                            'limit': 100
                         },
                         headers={'Authorization': f'Bearer {st.session_state.auth_token}'}
                     )
                     
                     if response.status_code == 200:
-                        results = response.json()
+                        data = response.json()
+                        results = data["results"]
                         
                         # 결과 표시
                         if results:
@@ -355,7 +448,8 @@ if st.session_state.show_user_management and current_user['username'] == 'admin'
                             )
                             
                             # 검색 결과 통계
-                            st.info(f"총 {len(results)}개의 결과를 찾았습니다.")
+                            more = " (상위 결과만 표시, 검색어를 더 입력해 좁혀 보세요)" if data["has_more"] else ""
+                            st.info(f"총 {len(results)}개의 결과를 찾았습니다.{more}")
                         else:
                             st.info("검색 결과가 없습니다.")
                     else:
@@ -369,8 +463,14 @@ if st.session_state.show_user_management and current_user['username'] == 'admin'
 else:
     st.title("🤖 Gemma Chat")
     
-    # 메시지 표시
-    for message in st.session_state.messages:
+    # 메시지 표시 (긴 대화는 최근 메시지만 그리고 이전 메시지는 요청할 때만 펼침)
+    messages = st.session_state.messages
+    hidden = max(len(messages) - st.session_state.history_limit, 0)
+    if hidden:
+        if st.button(f"⬆️ 이전 메시지 더 보기 ({hidden}개)", key="show_older_messages"):
+            st.session_state.history_limit += CHAT_HISTORY_PAGE_SIZE
+            st.rerun()
+    for message in messages[hidden:]:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
@@ -391,35 +491,49 @@ else:
         with st.chat_message("assistant"):
             if use_streaming:
                 message_placeholder = st.empty()
+                parts = []
                 full_response = ""
                 try:
                     # SSE 스트리밍 요청
-                    response = requests.post(
+                    with http.post(
                         api_url,
                         json={
                             "message": prompt,
-                            "stream": True
+                            "stream": True,
+                            "conversation_id": st.session_state.conversation_id
                         },
                         stream=True,
                         headers=headers,
                         verify=False
-                    )
-                    client = SSEClient(response)
-                    
-                    for event in client.events():
-                        try:
-                            chunk = json.loads(event.data)
+                    ) as response:
+                        client = SSEClient(response)
+                        # 토큰마다 전체 응답을 다시 그리지 않고 시간/글자 수 단위로 모아서 갱신
+                        rendered_at = time.monotonic()
+                        pending_chars = 0
+
+                        for event in client.events():
+                            # 마지막 timing 이벤트 등 이름 있는 이벤트는 무시 (끝까지 읽어야 연결이 풀로 반환됨)
+                            if event.event != "message":
+                                continue
+                            try:
+                                chunk = json.loads(event.data)
+                            except json.JSONDecodeError:
+                                continue
                             if "error" in chunk:
                                 st.error(chunk["error"])
                                 break
                             if chunk.get("done", False):
-                                break
-                            
-                            full_response += chunk["text"]
-                            message_placeholder.markdown(full_response + "▌")
-                        except json.JSONDecodeError:
-                            continue
-                    
+                                continue
+
+                            parts.append(chunk["text"])
+                            pending_chars += len(chunk["text"])
+                            now = time.monotonic()
+                            if pending_chars >= STREAM_RENDER_CHARS or (now - rendered_at) * 1000 >= STREAM_RENDER_INTERVAL_MS:
+                                message_placeholder.markdown("".join(parts) + "▌")
+                                rendered_at = now
+                                pending_chars = 0
+
+                    full_response = "".join(parts)
                     message_placeholder.markdown(full_response)
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
@@ -427,11 +541,12 @@ else:
             else:
                 try:
                     # 일반 요청
-                    response = requests.post(
+                    response = http.post(
                         api_url,
                         json={
                             "message": prompt,
-                            "stream": False
+                            "stream": False,
+                            "conversation_id": st.session_state.conversation_id
                         },
                         headers=headers,
                         verify=False
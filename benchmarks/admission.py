@@ -0,0 +1,86 @@
+"""LLM 스케줄러 공정성/부하 차단 벤치마크
+
+한 사용자가 동시에 많은 요청을 보내는 동안 다른 사용자들이 요청 하나씩을 보내고,
+가벼운 사용자들의 지연이 무거운 사용자의 대기열 뒤에 묶이지 않는지와
+대기열이 가득 찼을 때 429/503이 바로 반환되는지(거절 응답 지연)를 측정한다.
+
+    python -m benchmarks.admission --heavy 40 --light 4 --ttft 0.3 --concurrency 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+async def _run(args) -> dict:
+    import httpx
+    from main import app
+    from src.core.database import bootstrap_db, create_session, create_user, get_user_by_username
+
+    def user_token(username: str) -> str:
+        create_user(username, username)
+        return create_session(get_user_by_username(username)["id"])
+
+    bootstrap_db()
+    heavy_token = user_token("heavy-user")
+    light_tokens = [user_token(f"light-user-{i}") for i in range(args.light)]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def chat(token: str, i: int) -> tuple[int, float]:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chat",
+                json={"message": f"admission {token[-8:]} {i}", "stream": False, "bypass_cache": True},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            return response.status_code, time.perf_counter() - start
+
+        heavy = [asyncio.create_task(chat(heavy_token, i)) for i in range(args.heavy)]
+        await asyncio.sleep(0.05)
+        light = await asyncio.gather(*(chat(token, 0) for token in light_tokens))
+        heavy_results = await asyncio.gather(*heavy)
+        stats = (await client.get("/api/v1/stats", headers={"Authorization": f"Bearer {heavy_token}"})).json()
+
+    def summarize(results):
+        ok = [latency for status, latency in results if status == 200]
+        rejected = [latency for status, latency in results if status in (429, 503)]
+        return {
+            "ok": len(ok),
+            "rejected": len(rejected),
+            "ok_max_latency_s": round(max(ok), 3) if ok else None,
+            "rejected_max_latency_s": round(max(rejected), 3) if rejected else None,
+        }
+
+    return {
+        "heavy_user": summarize(heavy_results),
+        "light_users": summarize(light),
+        "scheduler": stats["llm_scheduler"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM admission control benchmark")
+    parser.add_argument("--heavy", type=int, default=40, help="무거운 사용자의 동시 요청 수")
+    parser.add_argument("--light", type=int, default=4, help="요청을 하나씩 보내는 사용자 수")
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=2, help="LLM_MAX_CONCURRENCY")
+    args = parser.parse_args()
+
+    server = start_fake_ollama(config=FakeOllamaConfig(ttft=args.ttft, tokens=10))
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="admission-bench-")) / "users.db")
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+
+    try:
+        print(json.dumps(asyncio.run(_run(args)), indent=2))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
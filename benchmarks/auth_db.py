@@ -0,0 +1,116 @@
+"""인증 DB 처리량 벤치마크 (요청마다 새 연결 vs 스레드별 풀링 연결 + WAL)
+
+임시 DB에 대해 여러 스레드에서 create_session / verify_session을 반복 실행하고 초당
+처리량을 비교한다. "before"는 기존 방식(작업마다 sqlite3.connect, 기본 저널 모드)을
+재현한 것이다. 세션 캐시는 DB 비용만 측정하도록 비활성화한다.
+
+    python -m benchmarks.auth_db --threads 8 --ops 500
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp(prefix="auth-bench-")
+os.environ["DATABASE_PATH"] = str(Path(_tmpdir) / "bench.db")
+os.environ["SESSION_CACHE_TTL_SECONDS"] = "0"
+
+import jwt  # noqa: E402
+
+from src.core import database  # noqa: E402
+from src.core.settings import settings  # noqa: E402
+
+
+def _legacy_connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(database.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def legacy_create_session(user_id: int) -> str:
+    token = database.jwt.encode(
+        {"user_id": user_id, "exp": database.datetime.datetime.utcnow() + database.datetime.timedelta(hours=1),
+         "jti": os.urandom(8).hex()},
+        settings.SECRET_KEY,
+        algorithm="HS256",
+    )
+    conn = _legacy_connect()
+    conn.execute("INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, datetime('now', '+1 hour'))",
+                 (user_id, token))
+    conn.commit()
+    conn.close()
+    return token
+
+
+def legacy_verify_session(token: str):
+    jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    conn = _legacy_connect()
+    user = conn.execute(
+        "SELECT u.* FROM users u JOIN sessions s ON u.id = s.user_id "
+        "WHERE s.token = ? AND s.expires_at > CURRENT_TIMESTAMP",
+        (token,),
+    ).fetchone()
+    conn.close()
+    return dict(user) if user else None
+
+
+def _throughput(label: str, fn, args_for, threads: int, ops: int) -> float:
+    errors = []
+
+    def worker(worker_id: int):
+        try:
+            for i in range(ops):
+                fn(*args_for(worker_id, i))
+        except Exception as e:  # "database is locked" 등
+            errors.append(e)
+        finally:
+            database.close_db()
+
+    pool = [threading.Thread(target=worker, args=(w,)) for w in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    rate = threads * ops / elapsed
+    suffix = f" ({len(errors)} errors, e.g. {errors[0]})" if errors else ""
+    print(f"{label:<28} {rate:>10.0f} ops/s{suffix}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth database throughput benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--seed-sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    database.init_db()
+    database.create_user("bench", "bench")
+    user_id = database.get_db().execute("SELECT id FROM users WHERE username = 'bench'").fetchone()["id"]
+    with database.get_db() as conn:
+        conn.executemany(
+            "INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, datetime('now', '+1 hour'))",
+            ((user_id, f"seed-{i}") for i in range(args.seed_sessions)),
+        )
+
+    tokens = [database.create_session(user_id) for _ in range(args.threads)]
+
+    # before: 작업마다 새 연결, 롤백 저널 모드
+    with database.get_db() as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    database.close_db()
+    _throughput("before create_session", legacy_create_session, lambda w, i: (user_id,), args.threads, args.ops)
+    _throughput("before verify_session", legacy_verify_session, lambda w, i: (tokens[w],), args.threads, args.ops)
+
+    # after: 스레드별 연결 재사용, WAL, 인덱스
+    _throughput("after  create_session", database.create_session, lambda w, i: (user_id,), args.threads, args.ops)
+    _throughput("after  verify_session", database.verify_session, lambda w, i: (tokens[w],), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
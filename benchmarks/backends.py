@@ -0,0 +1,109 @@
+"""여러 Ollama 서버 부하 분산/장애 처리 확인
+
+서로 다른 지연을 가진 가짜 Ollama 서버 여러 대를 띄우고 OLLAMA_BACKENDS로 등록한 뒤,
+1) 동시 요청이 서버별로 어떻게 나뉘는지, 2) 같은 대화가 같은 서버로 가는지,
+3) 서버 하나를 내렸을 때 헬스체크/연속 실패로 제외되고 나머지 서버로 넘어가는지를 확인한다.
+대화 고정(OLLAMA_STICKY_ROUTING)은 끄지 않고 기본값 그대로 사용한다.
+
+    python -m benchmarks.backends --servers 3 --requests 60 --balancer ewma
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+async def _run(args, servers) -> dict:
+    import httpx
+    from main import app
+    from src.core.database import create_session, get_db
+    from src.services.backends import backend_pool
+
+    async with app.router.lifespan_context(app):
+        user = get_db().execute("SELECT id FROM users WHERE username = ?", ("admin",)).fetchone()
+        headers = {"Authorization": f"Bearer {create_session(user['id'])}"}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            async def chat(i: int, conversation_id: str | None = None) -> int:
+                response = await client.post(
+                    "/api/v1/chat",
+                    json={
+                        "message": f"backend {i}",
+                        "stream": i % 2 == 0,
+                        "bypass_cache": True,
+                        "conversation_id": conversation_id,
+                    },
+                    headers=headers,
+                )
+                await response.aread()
+                return response.status_code
+
+            def requests_by_backend() -> dict:
+                return {b.url: b.requests for b in backend_pool.backends}
+
+            # 1) 분산: 대화 ID 없는 동시 요청 (같은 사용자라도 서버에 고정되지 않음)
+            await asyncio.gather(*(chat(i) for i in range(args.requests)))
+            spread = requests_by_backend()
+
+            # 2) 대화 고정: 같은 대화의 연속 요청
+            before = requests_by_backend()
+            for i in range(10):
+                await chat(1000 + i, "bench-conversation")
+            after = requests_by_backend()
+            sticky = {url: after[url] - before[url] for url in after if after[url] != before[url]}
+
+            # 3) 장애: 첫 번째 서버가 모든 요청에 500을 반환하게 하고 동시 요청을 몇 차례 더 보냄
+            servers[0].RequestHandlerClass.config.error_rate = 1.0
+            statuses = Counter()
+            for wave in range(5):
+                for status in await asyncio.gather(*(chat(2000 + wave * 10 + i) for i in range(args.servers * 2))):
+                    statuses[status] += 1
+            await asyncio.sleep(args.probe_interval * 2)
+
+            stats = (await client.get("/api/v1/stats", headers=headers)).json()["ollama_backends"]
+
+    return {
+        "balancer": args.balancer,
+        "spread": spread,
+        "sticky_conversation_requests": sticky,
+        "after_failure_statuses": dict(statuses),
+        "backends": stats["backends"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-backend Ollama load balancing")
+    parser.add_argument("--servers", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--balancer", choices=["least_outstanding", "ewma"], default="least_outstanding")
+    parser.add_argument("--probe-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # 서버마다 첫 토큰 지연을 다르게 설정 (마지막 서버가 가장 느림)
+    servers = [
+        start_fake_ollama(config=FakeOllamaConfig(ttft=0.05 * (i + 1) ** 2, token_delay=0.005, tokens=10))
+        for i in range(args.servers)
+    ]
+    backends = [{"url": f"http://127.0.0.1:{server.server_address[1]}"} for server in servers]
+    os.environ["OLLAMA_BACKENDS"] = json.dumps(backends)
+    os.environ["OLLAMA_BALANCER"] = args.balancer
+    os.environ["OLLAMA_HEALTH_CHECK_INTERVAL"] = str(args.probe_interval)
+    os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="backends-bench-")) / "users.db")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["LLM_MAX_CONCURRENCY"] = "64"
+    os.environ["SESSION_COMPACTION_ENABLED"] = "false"
+
+    try:
+        print(json.dumps(asyncio.run(_run(args, servers)), indent=2))
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""요청마다 ChatOllama 생성 vs 풀링된 클라이언트 레지스트리 지연 비교
+
+가짜 Ollama 서버에 순차 요청을 보내며 요청당 지연을 비교한다. 요청마다 새로
+만드는 방식은 httpx 클라이언트 생성과 TCP 연결 비용을 매번 치르고, 레지스트리는
+keep-alive 연결을 재사용한다.
+
+    python -m benchmarks.client_pool --requests 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+async def _measure(make_llm, n: int, close_each: bool) -> list[float]:
+    from langchain_core.messages import HumanMessage
+
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        llm = make_llm()
+        await llm.ainvoke([HumanMessage(content=f"benchmark {i}")])
+        if close_each:
+            llm._client.close()
+            await llm._async_client.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _summary(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p95 = ordered[int(len(ordered) * 0.95) - 1] * 1000
+    return f"mean={statistics.mean(latencies) * 1000:.2f}ms p50={p50:.2f}ms p95={p95:.2f}ms"
+
+
+async def _run(base_url: str, n: int):
+    from langchain_ollama import ChatOllama
+    from src.services.llm_pool import LLMClientRegistry
+
+    per_request = await _measure(lambda: ChatOllama(base_url=base_url, model="gemma3"), n, close_each=True)
+
+    registry = LLMClientRegistry(max_connections=20, max_keepalive=10, keepalive_expiry=30.0, idle_timeout=600.0)
+    pooled = await _measure(lambda: registry.get(base_url, "gemma3"), n, close_each=False)
+    await registry.aclose()
+
+    print(f"per-request client: {_summary(per_request)}")
+    print(f"pooled registry   : {_summary(pooled)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM client pooling benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_fake_ollama(config=FakeOllamaConfig(tokens=5))
+    try:
+        asyncio.run(_run(f"http://127.0.0.1:{server.server_address[1]}", args.requests))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""비스트리밍 /api/v1/chat 동시 요청 부하 테스트
+
+가짜 Ollama 서버(첫 토큰 지연 고정)에 N개의 비스트리밍 요청을 동시에 보내고
+전체 소요 시간을 단건 지연 x N과 비교한다. 요청이 이벤트 루프를 블로킹하면
+전체 시간이 단건 지연 x N에 가까워지고, 제대로 겹쳐 실행되면 단건 지연에 가깝다.
+부하 중 /health 응답 시간도 함께 측정한다.
+
+    python -m benchmarks.concurrent_chat --requests 16 --ttft 0.5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+def _auth_token() -> str:
+    from src.core.database import get_db, create_session
+
+    user = get_db().execute("SELECT id FROM users WHERE username = ?", ("admin",)).fetchone()
+    return create_session(user["id"])
+
+
+async def _run(n: int) -> dict:
+    import httpx
+    from main import app
+    from src.core.database import delete_session
+
+    token = _auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def chat(i: int) -> float:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/chat",
+                    json={"message": f"benchmark {i}", "stream": False},
+                    headers=headers,
+                )
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+            async def health_probe() -> float:
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                (await client.get("/health")).raise_for_status()
+                return time.perf_counter() - start
+
+            single = await chat(-1)
+
+            start = time.perf_counter()
+            results = await asyncio.gather(health_probe(), *(chat(i) for i in range(n)))
+            wall = time.perf_counter() - start
+    finally:
+        delete_session(token)
+
+    health, latencies = results[0], results[1:]
+    return {
+        "requests": n,
+        "single_latency_s": round(single, 3),
+        "serial_estimate_s": round(single * n, 3),
+        "concurrent_wall_s": round(wall, 3),
+        "overlap_factor": round(single * n / wall, 2),
+        "max_latency_s": round(max(latencies), 3),
+        "health_latency_s": round(health, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent non-streaming chat load test")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--ttft", type=float, default=0.5)
+    parser.add_argument("--sync-fallback", action="store_true", help="LLM_SYNC_FALLBACK 경로 측정")
+    args = parser.parse_args()
+
+    server = start_fake_ollama(config=FakeOllamaConfig(ttft=args.ttft, tokens=10))
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    # 저장소의 users.db 대신 임시 DB에 세션을 기록
+    os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="concurrent-chat-bench-")) / "users.db")
+    # 한 사용자가 동시에 보내는 요청이 속도 제한이나 동시성 한도에 막히지 않도록 해제
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["LLM_MAX_CONCURRENCY"] = str(max(64, args.requests))
+    os.environ["LLM_QUEUE_MAX_PER_USER"] = str(max(64, args.requests))
+    os.environ["SESSION_COMPACTION_ENABLED"] = "false"
+    if args.sync_fallback:
+        os.environ["LLM_SYNC_FALLBACK"] = "true"
+
+    from src.core.database import bootstrap_db
+    bootstrap_db()
+
+    try:
+        result = asyncio.run(_run(args.requests))
+    finally:
+        server.shutdown()
+
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""대화 길이에 따른 프롬프트 구성 비용 측정
+
+대화가 N턴 쌓였을 때 매 요청마다 전체 기록으로 LangChain 메시지를 새로 만드는 방식과,
+ConversationStore.context()가 캐시된 메시지/토큰 수로 예산 안의 최근 메시지만 모으는 방식을 비교한다.
+DB와 LLM 요약은 사용하지 않는다 (요약이 없는 최악의 경우, 메모리에 N턴이 모두 남아 있다고 가정).
+
+    python -m benchmarks.conversation_context --turns 10 100 1000 --budget 2048
+"""
+import argparse
+import json
+import time
+
+from src.core.rate_limit import estimate_tokens
+from src.services.conversations import Conversation, ConversationStore, Turn
+from src.services.llm import build_messages
+
+
+def _conversation(turns: int) -> Conversation:
+    items = []
+    for i in range(turns):
+        items.append(Turn(2 * i + 1, "user", f"{i}번째 질문입니다. " * 5, 0))
+        items.append(Turn(2 * i + 2, "assistant", f"{i}번째 답변입니다. " * 20, 0))
+    for turn in items:
+        turn.tokens = estimate_tokens(turn.content)
+    return Conversation(1, "bench", items, None, 0)
+
+
+def _naive(conversation: Conversation, message: str) -> tuple[list, int]:
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    history = [(HumanMessage if t.role == "user" else AIMessage)(content=t.content) for t in conversation.turns]
+    return build_messages(message, None, history), sum(estimate_tokens(t.content) for t in conversation.turns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation prompt building cost")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--budget", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    store = ConversationStore(max_entries=1, context_tokens=args.budget, load_max_messages=0,
+                              summary_enabled=False, summary_trigger_tokens=0)
+    results = []
+    for turns in args.turns:
+        conversation = _conversation(turns)
+        store.context(conversation)  # 메시지 객체 캐시 채우기 (이후 요청과 같은 상태)
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            _, naive_tokens = _naive(conversation, "새 질문")
+        naive_us = (time.perf_counter() - started) / args.repeat * 1e6
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            messages = build_messages("새 질문", None, store.context(conversation))
+        store_us = (time.perf_counter() - started) / args.repeat * 1e6
+
+        window = conversation.turns[conversation.window_start(args.budget):]
+        results.append({
+            "turns": turns,
+            "full_history": {"messages": 2 * turns + 1, "prompt_tokens": naive_tokens, "build_us": round(naive_us, 1)},
+            "store_context": {"messages": len(messages), "prompt_tokens": sum(t.tokens for t in window),
+                              "build_us": round(store_us, 1)},
+        })
+
+    print(json.dumps({"budget": args.budget, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
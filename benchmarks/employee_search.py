@@ -0,0 +1,143 @@
+"""직원 검색 인덱스 벤치마크
+
+시드를 고정한 가짜 직원 데이터(기본 10만 명)를 CSV로 만들어 임시 DB의 employees 테이블에 넣고,
+EmployeeDirectory로 전체 색인한 뒤 검색 유형별(완전 일치, 성 한 글자, 입력 중인 글자, 첫 낱자, 초성,
+이름 부분 일치, 직책 단어 접두/부분 일치, 깊은 페이지) 조회 지연을 측정한다. 이어서 일부 직원을
+수정/삭제하고 증분 반영 시간과 반영 결과를 확인한다.
+
+    python -m benchmarks.employee_search --employees 100000 --repeat 2000
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류전홍고문양손배백허유남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모탁국어은편용"
+GIVEN = "민서지현준우진영수예은하도윤성재혜주원연경호승희정태동훈채상아소율나석혁규찬빈선미보람유"
+POSITIONS = ["사원", "주임", "대리", "과장", "차장", "부장", "팀장", "본부장", "이사", "상무", "전무",
+             "선임 연구원", "책임 연구원", "수석 연구원", "연구원", "인턴"]
+DEPARTMENTS = ["개발팀", "인프라팀", "데이터팀", "인사팀", "재무팀", "영업팀", "마케팅팀", "디자인팀", "법무팀", "연구소"]
+
+# (이름, 검색 유형, 검색어, offset), 검색어가 None이면 첫 번째 직원의 이름
+QUERIES = [
+    ("exact_name", "name", None, 0),
+    ("surname", "name", "김", 0),
+    ("typing_syllable", "name", "김지", 0),
+    ("typing_jamo", "name", "김ㅈ", 0),
+    ("single_jamo", "name", "ㄱ", 0),
+    ("initials", "name", "ㄱㅈㅇ", 0),
+    ("given_name_substring", "name", "서연", 0),
+    ("single_char_substring", "name", "혁", 0),
+    ("position_exact", "position", "과장", 0),
+    ("position_word_prefix", "position", "연구", 0),
+    ("position_substring", "position", "장", 0),
+    ("deep_page", "name", "이", 1000),
+    ("no_match", "name", "없는사람", 0),
+]
+
+
+def write_employees(path: Path, count: int, seed: int):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "position", "department"])
+        for employee_id in range(1, count + 1):
+            name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.choice((1, 2, 2, 2))))
+            writer.writerow([employee_id, name, rng.choice(POSITIONS), rng.choice(DEPARTMENTS)])
+
+
+def measure(directory, field: str, query: str, offset: int, repeat: int, limit: int) -> dict:
+    # 첫 조회는 접두 일치 순위를 계산하고, 이후 반복은 보관된 순위를 사용
+    started = time.perf_counter_ns()
+    results, has_more = directory.search(query, field, offset, limit)
+    first = time.perf_counter_ns() - started
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        directory.search(query, field, offset, limit)
+        samples.append(time.perf_counter_ns() - started)
+    samples.sort()
+    return {
+        "query": query,
+        "type": field,
+        "offset": offset,
+        "results": len(results),
+        "has_more": has_more,
+        "first": results[0][field] if results else None,
+        "first_query_us": round(first / 1000, 1),
+        "p50_us": round(samples[len(samples) // 2] / 1000, 1),
+        "p99_us": round(samples[int(len(samples) * 0.99)] / 1000, 1),
+        "max_us": round(samples[-1] / 1000, 1),
+    }
+
+
+async def _run(args, csv_path: Path) -> dict:
+    from src.core.database import bootstrap_db, get_db
+    from src.services.employees import EmployeeDirectory, sync_from_csv
+
+    bootstrap_db()
+    started = time.perf_counter()
+    imported = sync_from_csv(str(csv_path))
+    import_seconds = time.perf_counter() - started
+
+    directory = EmployeeDirectory(csv_path=None, refresh_interval=0, rebuild_threshold=args.rebuild_threshold)
+    await directory.refresh()
+    report = {
+        "employees": len(directory.employees),
+        "distinct_values": directory.stats()["distinct_values"],
+        "sqlite_import": {**imported, "seconds": round(import_seconds, 3)},
+        "full_index_s": round(directory.last_load_seconds, 3),
+        "queries": {name: measure(directory, field, query or directory.employees[1]["name"], offset, args.repeat, args.limit)
+                    for name, field, query, offset in QUERIES},
+    }
+
+    # 일부 직원의 직책을 바꾸고 몇 명을 삭제한 뒤 증분 반영
+    rng = random.Random(args.seed + 1)
+    changed = rng.sample(range(1, args.employees + 1), args.changes)
+    deleted = changed[:args.changes // 10]
+    conn = get_db()
+    with conn:
+        conn.executemany("UPDATE employees SET position = '변경 테스트 직책' WHERE id = ?", [(i,) for i in changed])
+        conn.executemany("DELETE FROM employees WHERE id = ?", [(i,) for i in deleted])
+    loads_before = directory.full_loads
+    started = time.perf_counter()
+    await directory.refresh()
+    refresh_seconds = time.perf_counter() - started
+    results, _ = directory.search("변경 테스트", "position", 0, args.changes)
+    report["incremental_refresh"] = {
+        "rows_changed": len(changed),
+        "rows_deleted": len(deleted),
+        "refresh_ms": round(refresh_seconds * 1000, 2),
+        "full_reload": directory.full_loads != loads_before,
+        "searchable_after_refresh": len(results),
+        "expected": len(changed) - len(deleted),
+        # 반영한 변경 로그는 지워지므로 0이어야 함
+        "change_log_rows": conn.execute("SELECT COUNT(*) FROM employee_changes").fetchone()[0],
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee directory search benchmark")
+    parser.add_argument("--employees", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=2000, help="검색어별 반복 횟수")
+    parser.add_argument("--limit", type=int, default=20, help="페이지 크기")
+    parser.add_argument("--changes", type=int, default=200, help="증분 반영을 확인할 변경 행 수")
+    parser.add_argument("--rebuild-threshold", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="employee-bench-"))
+    os.environ["DATABASE_PATH"] = str(workdir / "users.db")
+    csv_path = workdir / "employees.csv"
+    write_employees(csv_path, args.employees, args.seed)
+    print(json.dumps(asyncio.run(_run(args, csv_path)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""벤치마크용 가짜 Ollama 서버
+
+실제 모델 없이 `/api/chat`, `/api/generate` 응답을 흉내 낸다. 첫 토큰 지연(TTFT)과 토큰 간
+지연을 설정할 수 있어 API 서버의 동시성 특성만 따로 측정할 수 있다. `--load-delay`를 주면
+모델이 메모리에 없을 때(처음 또는 keep_alive 만료 후) 그만큼 로드 시간을 더한다.
+`--error-rate`로 주입하는 실패는 `--seed`로 고정한 난수열을 따르므로 같은 순서의 요청에는
+같은 요청이 실패한다.
+
+    python -m benchmarks.fake_ollama --port 11500 --ttft 0.2 --token-delay 0.01 --error-rate 0.05 --seed 1
+"""
+import argparse
+import json
+import random
+import select
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaConfig:
+    def __init__(self, ttft: float = 0.0, token_delay: float = 0.0, tokens: int = 20, token_text: str = "토큰 ",
+                 error_rate: float = 0.0, load_delay: float = 0.0, seed: int | None = 0):
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.token_text = token_text
+        # 이 비율만큼의 요청에 500 응답 (1.0이면 장애 서버처럼 모든 요청 실패)
+        self.error_rate = error_rate
+        # 모델이 로드되어 있지 않을 때 첫 응답 전에 추가되는 지연
+        self.load_delay = load_delay
+        # 실패 주입 난수 시드 (None이면 실행마다 다름)
+        self.seed = seed
+
+
+def _keep_alive_seconds(value) -> float:
+    """Ollama keep_alive 값("30m", "10s", 300, -1)을 초로 변환 (음수는 무기한)"""
+    if value is None:
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    seconds = float(value)
+    return float("inf") if seconds < 0 else seconds
+
+
+class FakeOllamaStats:
+    """끝까지 전송된 스트림과 도중에 끊긴 스트림 수"""
+
+    def __init__(self):
+        self.completed = 0
+        self.aborted = 0
+        self.last_aborted_at: float | None = None
+        self.loads = 0
+        # 마지막으로 받은 /api/chat 요청 본문 (프롬프트 구성 확인용)
+        self.last_request: dict | None = None
+        # 모델 -> 메모리에서 내려가는 시각
+        self.loaded_until: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    config = FakeOllamaConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b"{}"
+        return json.loads(body or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _wait(self, delay: float):
+        """토큰 간 지연 동안 상대가 연결을 닫는지 감시 (닫히면 즉시 ConnectionResetError)"""
+        readable, _, _ = select.select([self.connection], [], [], delay)
+        if readable and not self.connection.recv(1, socket.MSG_PEEK):
+            raise ConnectionResetError("client closed the connection")
+
+    def _inject_error(self) -> bool:
+        if self.config.error_rate and self.server.rng.random() < self.config.error_rate:
+            self._send_json({"error": "injected failure"}, status=500)
+            return True
+        return False
+
+    def do_GET(self):
+        if self._inject_error():
+            return
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "gemma3", "model": "gemma3"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _load_model(self, model: str, keep_alive) -> float:
+        """모델이 메모리에 없으면 로드 지연을 흉내 내고, keep_alive만큼 만료 시각을 연장"""
+        stats = self.server.stats
+        with stats.lock:
+            now = time.monotonic()
+            cold = stats.loaded_until.get(model, 0.0) <= now
+            stats.loaded_until[model] = now + self.config.load_delay * cold + _keep_alive_seconds(keep_alive)
+            if cold:
+                stats.loads += 1
+        delay = self.config.load_delay if cold else 0.0
+        time.sleep(delay)
+        return delay
+
+    def do_POST(self):
+        if self.path == "/api/generate":
+            self._generate()
+            return
+        if self.path != "/api/chat":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        request = self._read_json()
+        if self._inject_error():
+            return
+        model = request.get("model", "gemma3")
+        cfg = self.config
+        self.server.stats.last_request = request
+        self._load_model(model, request.get("keep_alive"))
+
+        def message(content: str, done: bool) -> dict:
+            payload = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": content},
+                "done": done,
+            }
+            if done:
+                payload.update({
+                    "done_reason": "stop",
+                    "total_duration": 0,
+                    "load_duration": 0,
+                    "prompt_eval_count": 1,
+                    "prompt_eval_duration": 0,
+                    "eval_count": cfg.tokens,
+                    "eval_duration": 0,
+                })
+            return payload
+
+        time.sleep(cfg.ttft)
+
+        if not request.get("stream", True):
+            time.sleep(cfg.token_delay * cfg.tokens)
+            self._send_json(message(cfg.token_text * cfg.tokens, True))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        stats = self.server.stats
+        try:
+            for i in range(cfg.tokens):
+                if i:
+                    self._wait(cfg.token_delay)
+                self._write_chunk(json.dumps(message(cfg.token_text, False)).encode() + b"\n")
+            self._write_chunk(json.dumps(message("", True)).encode() + b"\n")
+            self._write_chunk(b"")
+            stats.completed += 1
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트(API 서버)가 생성 도중 연결을 끊음
+            self.close_connection = True
+            stats.aborted += 1
+            stats.last_aborted_at = time.monotonic()
+
+
+    def _generate(self):
+        """/api/generate (stream=false만 지원): 프롬프트가 없으면 모델 로드만 수행"""
+        request = self._read_json()
+        if self._inject_error():
+            return
+        model = request.get("model", "gemma3")
+        load = self._load_model(model, request.get("keep_alive"))
+        payload = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": "",
+            "done": True,
+            "done_reason": "load",
+            "load_duration": int(load * 1e9),
+        }
+        if request.get("prompt"):
+            tokens = min(self.config.tokens, request.get("options", {}).get("num_predict", self.config.tokens))
+            time.sleep(self.config.ttft + self.config.token_delay * max(tokens - 1, 0))
+            payload.update(response=self.config.token_text * tokens, done_reason="stop", eval_count=tokens)
+        self._send_json(payload)
+
+
+def start_fake_ollama(port: int = 0, config: FakeOllamaConfig | None = None) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 가짜 Ollama 서버를 시작하고 서버 객체를 반환"""
+    handler = type("ConfiguredFakeOllamaHandler", (FakeOllamaHandler,), {"config": config or FakeOllamaConfig()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stats = FakeOllamaStats()
+    server.rng = random.Random(server.RequestHandlerClass.config.seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--load-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_fake_ollama(args.port, FakeOllamaConfig(args.ttft, args.token_delay, args.tokens,
+                                                           error_rate=args.error_rate, load_delay=args.load_delay,
+                                                           seed=args.seed))
+    print(f"fake ollama listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,390 @@
+"""실제 HTTP 부하 테스트: 지연 분포, TTFT, 처리량, 서버 CPU/RSS
+
+가짜 Ollama 서버와 API 서버(`uvicorn main:app`)를 각각 별도 프로세스로 띄우고, 임시 DB에
+부하용 사용자와 세션(`src.core.database.create_session`)을 만든 뒤 `/api/v1/chat`에 동시
+요청을 보낸다. 클라이언트, API 서버, 가짜 Ollama가 CPU를 두고 서로 다투지 않도록 프로세스를
+나누며, 서버 CPU 시간과 RSS는 `/proc/<pid>`에서 측정 구간 동안 샘플링한다 (Linux 전용).
+
+요청은 `--requests`개를 합성하거나(`--stream-ratio` 비율만큼 스트리밍) `--replay`로 JSONL
+요청 로그를 재생한다. 로그의 각 줄은 `/api/v1/chat` 요청 본문이며, 다음 키는 본문에서 빠진다.
+
+- `at`: 실행 시작 후 이 시각(초)이 되기 전에는 보내지 않음 (기록된 도착 간격 재현, `--speed`로 배속)
+- `user`: 요청을 보낼 부하 사용자 번호 (없으면 순서대로 돌아가며 배정)
+
+결과는 JSON으로 출력되고 `--output`에도 저장되어 커밋 간 비교에 사용할 수 있다.
+
+    python -m benchmarks.load_test --concurrency 16 --requests 400 --stream-ratio 0.5 --output load.json
+    python -m benchmarks.load_test --replay benchmarks/workloads/chat_sample.jsonl --repeat 5 \\
+        --env LLM_MAX_CONCURRENCY=16
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 요청 본문이 아닌 재생 제어용 키
+CONTROL_KEYS = ("at", "user")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"process exited with code {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"port {port} did not open within {timeout}s")
+
+
+class ProcessSampler:
+    """측정 구간 동안 프로세스의 CPU 시간과 RSS를 주기적으로 기록 (/proc 기반)"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.rss_samples: list[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._cpu_start: float | None = None
+        self._started = 0.0
+        self.available = Path(f"/proc/{pid}/stat").exists()
+
+    def _cpu_seconds(self) -> float:
+        # comm(2번째 필드)에 공백이 있을 수 있으므로 마지막 ')' 뒤부터 나눔, utime/stime은 14/15번째
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _rss_bytes(self) -> int:
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+        return 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.rss_samples.append(self._rss_bytes())
+            except OSError:
+                return
+
+    def start(self):
+        if not self.available:
+            return
+        self._cpu_start = self._cpu_seconds()
+        self._started = time.perf_counter()
+        self.rss_samples.append(self._rss_bytes())
+        self._thread.start()
+
+    def stop(self) -> dict | None:
+        if not self.available:
+            return None
+        self._stop.set()
+        self._thread.join()
+        wall = time.perf_counter() - self._started
+        cpu = self._cpu_seconds() - self._cpu_start
+        self.rss_samples.append(self._rss_bytes())
+        mb = 1024 * 1024
+        return {
+            "cpu_seconds": round(cpu, 3),
+            # 100%가 코어 하나를 모두 사용한 상태
+            "cpu_percent": round(cpu / wall * 100, 1) if wall else None,
+            "rss_start_mb": round(self.rss_samples[0] / mb, 1),
+            "rss_peak_mb": round(max(self.rss_samples) / mb, 1),
+            "rss_end_mb": round(self.rss_samples[-1] / mb, 1),
+        }
+
+
+def _percentiles(values: list[float]) -> dict | None:
+    if not values:
+        return None
+    ms = sorted(v * 1000 for v in values)
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    return {
+        "count": len(ms),
+        "mean": round(statistics.fmean(ms), 2),
+        "p50": round(cuts[49], 2),
+        "p95": round(cuts[94], 2),
+        "p99": round(cuts[98], 2),
+        "max": round(ms[-1], 2),
+    }
+
+
+def _parse_server_timing(value: str) -> dict[str, float]:
+    spans = {}
+    for part in value.split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if duration:
+            spans[name] = float(duration)
+    return spans
+
+
+def load_workload(args) -> list[dict]:
+    """재생할 요청 목록 (각 항목은 요청 본문과 제어 키)"""
+    if args.replay:
+        lines = Path(args.replay).read_text(encoding="utf-8").splitlines()
+        entries = [json.loads(line) for line in lines if line.strip()]
+        # 반복할 때는 기록된 도착 시각을 이전 반복 뒤로 이어 붙임
+        span = max((entry.get("at", 0) for entry in entries), default=0)
+        return [
+            {**entry, "at": entry["at"] + span * round_} if "at" in entry else entry
+            for round_ in range(args.repeat)
+            for entry in entries
+        ]
+
+    return [
+        {
+            # 서로 다른 메시지라 응답 캐시에 걸리지 않음
+            "message": f"부하 테스트 요청 {i}",
+            # 스트리밍 요청을 비율에 맞게 고르게 섞음
+            "stream": int((i + 1) * args.stream_ratio) > int(i * args.stream_ratio),
+        }
+        for i in range(args.requests)
+    ]
+
+
+async def _send(client, entry: dict, token: str) -> dict:
+    body = {k: v for k, v in entry.items() if k not in CONTROL_KEYS}
+    headers = {"Authorization": f"Bearer {token}"}
+    result = {"stream": bool(body.get("stream")), "status": None, "error": None, "ttft": None, "frames": 0, "timing": {}}
+    started = time.perf_counter()
+    try:
+        if result["stream"]:
+            async with client.stream("POST", "/api/v1/chat", json=body, headers=headers) as response:
+                result["status"] = response.status_code
+                if response.status_code != 200:
+                    await response.aread()
+                else:
+                    event = None
+                    async for line in response.aiter_lines():
+                        if line.startswith("event: "):
+                            event = line[7:]
+                        elif line.startswith("data: "):
+                            data = json.loads(line[6:])
+                            if event == "timing":
+                                result["timing"] = data
+                            elif "error" in data:
+                                result["error"] = "stream_error"
+                            elif data.get("text"):
+                                if result["ttft"] is None:
+                                    result["ttft"] = time.perf_counter() - started
+                                result["frames"] += 1
+                        elif not line:
+                            event = None
+        else:
+            response = await client.post("/api/v1/chat", json=body, headers=headers)
+            result["status"] = response.status_code
+            result["timing"] = _parse_server_timing(response.headers.get("server-timing", ""))
+    except Exception as e:
+        result["error"] = type(e).__name__
+    result["latency"] = time.perf_counter() - started
+    if result["status"] != 200 and result["error"] is None:
+        result["error"] = f"http_{result['status']}"
+    return result
+
+
+async def run_workload(base_url: str, tokens: list[str], workload: list[dict], concurrency: int,
+                       speed: float, timeout: float) -> tuple[list[dict], float]:
+    """동시 작업자 concurrency개가 workload를 순서대로 나눠 보내는 폐쇄 루프 부하 (`at`이 있으면 그 시각까지 대기)"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: list[dict] = []
+    queue = iter(enumerate(workload))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+
+        async def worker():
+            for i, entry in queue:
+                if "at" in entry:
+                    delay = started + entry["at"] / speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                token = tokens[entry.get("user", i) % len(tokens)]
+                results.append(await _send(client, entry, token))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def summarize(results: list[dict], elapsed: float) -> dict:
+    ok = [r for r in results if r["error"] is None]
+    errors: dict[str, int] = {}
+    for r in results:
+        if r["error"] is not None:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    # 서버가 보고한 구간별 시간(ms)의 평균 (Server-Timing 헤더 / 스트림의 timing 이벤트)
+    span_totals: dict[str, list[float]] = {}
+    for r in ok:
+        for name, duration in r["timing"].items():
+            span_totals.setdefault(name, []).append(duration)
+
+    summary = {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+        "latency_ms": _percentiles([r["latency"] for r in ok]),
+        # 첫 텍스트 프레임까지의 시간 (스트리밍 요청만 해당)
+        "ttft_ms": _percentiles([r["ttft"] for r in ok if r["ttft"] is not None]),
+        "server_timing_mean_ms": {name: round(statistics.fmean(v), 3) for name, v in span_totals.items()},
+    }
+    for mode, stream in (("streaming", True), ("non_streaming", False)):
+        subset = [r for r in ok if r["stream"] is stream]
+        if subset:
+            summary[mode] = {
+                "succeeded": len(subset),
+                "latency_ms": _percentiles([r["latency"] for r in subset]),
+            }
+    frames = sum(r["frames"] for r in ok)
+    if frames:
+        summary["stream_frames_per_second"] = round(frames / elapsed, 1)
+    return summary
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                             check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _create_sessions(users: int) -> list[str]:
+    from src.core.database import bootstrap_db, create_session, create_user, get_user_by_username
+
+    bootstrap_db()
+    tokens = []
+    for i in range(users):
+        username = f"load-user-{i}"
+        create_user(username, username)
+        tokens.append(create_session(get_user_by_username(username)["id"]))
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test against main:app with a fake Ollama server")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 요청을 보내는 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=200, help="합성 요청 수 (--replay가 없을 때)")
+    parser.add_argument("--stream-ratio", type=float, default=0.5, help="합성 요청 중 스트리밍 비율")
+    parser.add_argument("--replay", help="재생할 JSONL 요청 로그")
+    parser.add_argument("--repeat", type=int, default=1, help="재생 로그 반복 횟수")
+    parser.add_argument("--speed", type=float, default=1.0, help="`at` 도착 시각 배속")
+    parser.add_argument("--warmup", type=int, default=8, help="측정 전에 보내고 버리는 요청 수")
+    parser.add_argument("--users", type=int, default=4, help="부하 사용자(세션) 수")
+    parser.add_argument("--ttft", type=float, default=0.1, help="가짜 Ollama 첫 토큰 지연(초)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="가짜 Ollama 토큰 간 지연(초)")
+    parser.add_argument("--tokens", type=int, default=20, help="응답당 토큰 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 Ollama 실패 주입 비율")
+    parser.add_argument("--seed", type=int, default=0, help="실패 주입 난수 시드")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청당 제한 시간(초)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="서버의 사용자별 요청 한도를 끄지 않음")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="API 서버 설정 덮어쓰기")
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="load-test-"))
+    ollama_port, api_port = _free_port(), _free_port()
+    env = dict(os.environ)
+    env.update({
+        "PYTHONWARNINGS": "ignore",
+        "DATABASE_PATH": str(workdir / "users.db"),
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{ollama_port}",
+        # 주기적인 모델 유지 요청이 측정 구간에 섞이지 않도록
+        "OLLAMA_KEEPER_ENABLED": "false",
+        "PROFILING_DIR": str(workdir / "profiles"),
+    })
+    if not args.keep_rate_limits:
+        env["RATE_LIMIT_ENABLED"] = "false"
+    overrides = dict(item.split("=", 1) for item in args.env)
+    env.update(overrides)
+
+    # 세션은 벤치마크 프로세스에서 같은 DB 파일에 직접 만든다 (로그인/bcrypt 비용을 측정에서 제외)
+    os.environ["DATABASE_PATH"] = env["DATABASE_PATH"]
+    tokens = _create_sessions(args.users)
+    workload = load_workload(args)
+
+    procs = []
+    try:
+        fake = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(ollama_port), "--ttft", str(args.ttft),
+             "--token-delay", str(args.token_delay), "--tokens", str(args.tokens),
+             "--error-rate", str(args.error_rate), "--seed", str(args.seed)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+        )
+        procs.append(fake)
+        _wait_for_port(ollama_port, fake)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(api_port),
+             "--log-level", "warning"],
+            cwd=ROOT, env=env,
+        )
+        procs.append(server)
+        _wait_for_port(api_port, server)
+
+        base_url = f"http://127.0.0.1:{api_port}"
+        if args.warmup:
+            # 지연 초기화(LLM 클라이언트, 커넥션 풀 등)를 측정에서 제외
+            warmup = [{"message": f"워밍업 {i}", "stream": bool(i % 2)} for i in range(args.warmup)]
+            asyncio.run(run_workload(base_url, tokens, warmup, min(args.concurrency, args.warmup), 1.0, args.timeout))
+
+        sampler = ProcessSampler(server.pid)
+        sampler.start()
+        results, elapsed = asyncio.run(run_workload(base_url, tokens, workload, args.concurrency, args.speed,
+                                                    args.timeout))
+        server_usage = sampler.stop()
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            proc.wait()
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "concurrency": args.concurrency,
+            "workload": args.replay or "synthetic",
+            "requests": len(workload),
+            "stream_ratio": None if args.replay else args.stream_ratio,
+            "users": args.users,
+            "fake_ollama": {"ttft": args.ttft, "token_delay": args.token_delay, "tokens": args.tokens,
+                            "error_rate": args.error_rate, "seed": args.seed},
+            "server_env": overrides,
+            "rate_limits": args.keep_rate_limits,
+        },
+        **summarize(results, elapsed),
+        "server": server_usage,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""지표 기록 비용 측정
+
+Histogram.observe / Counter.inc 한 번의 비용을 단일 스레드와 여러 스레드 동시 기록에서 측정하고,
+같은 동작을 공용 락으로 보호하는 방식과 비교한다. 스트리밍 경로에서는 토큰마다 기록하지 않고
+생성이 끝날 때 몇 번만 기록하므로, 스트림 하나당 추가 비용은 아래 값의 수 배 수준이다.
+
+    python -m benchmarks.metrics_overhead --ops 200000 --threads 4
+"""
+import argparse
+import bisect
+import json
+import threading
+import time
+
+from src.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+class _LockedHistogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            data = self.counts.get(labels)
+            if data is None:
+                data = self.counts[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[bisect.bisect_left(self.buckets, value)] += 1
+            data[-1] += value
+
+
+def _run(fn, ops: int, threads: int) -> float:
+    """스레드 수만큼 동시에 fn(i)를 ops번씩 호출하고 호출당 평균 시간(ns)을 반환"""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(ops):
+            fn(i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for w in workers:
+        w.join()
+    return (time.perf_counter() - started) / (ops * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metric recording overhead")
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    # 전역 레지스트리를 오염시키지 않도록 별도 레지스트리에 등록
+    import src.core.metrics as metrics
+    metrics.registry, original = MetricsRegistry(), metrics.registry
+    try:
+        histogram = Histogram("bench_seconds", "bench", ("model",))
+        counter = Counter("bench_total", "bench", ("model",))
+    finally:
+        metrics.registry = original
+    locked = _LockedHistogram(histogram.buckets)
+
+    results = {}
+    for threads in (1, args.threads):
+        results[f"threads={threads}"] = {
+            "histogram_observe_ns": round(_run(lambda i: histogram.observe(i % 100 / 1000, "gemma3"), args.ops, threads), 1),
+            "locked_histogram_observe_ns": round(_run(lambda i: locked.observe(i % 100 / 1000, "gemma3"), args.ops, threads), 1),
+            "counter_inc_ns": round(_run(lambda i: counter.inc("gemma3"), args.ops, threads), 1),
+        }
+
+    started = time.perf_counter()
+    text = histogram.render()
+    results["render_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    expected = args.ops * (1 + args.threads)
+    results["observations_recorded"] = int(text.split('_count{model="gemma3"} ')[1].split()[0])
+    results["observations_expected"] = expected
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""의미 유사도 캐시 조회 지연 벤치마크
+
+임의의 정규화된 임베딩으로 캐시를 채운 뒤 조회(행렬-벡터 곱 한 번) 지연을 측정한다.
+
+    python -m benchmarks.semantic_cache_lookup --sizes 10000 100000 --dim 768
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.services.semantic_cache import HashingEmbedder, SemanticCache
+
+
+def _random_unit_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bench(size: int, dim: int, lookups: int) -> dict:
+    rng = np.random.default_rng(0)
+    cache = SemanticCache(embedder=None, capacity=size, threshold=0.92)
+
+    start = time.perf_counter()
+    for i, vector in enumerate(_random_unit_vectors(size, dim, rng)):
+        cache.insert(vector, scope=0, response=f"response {i}")
+    fill = time.perf_counter() - start
+
+    queries = _random_unit_vectors(lookups, dim, rng)
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        cache.search(query, scope=0)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "entries": size,
+        "dim": dim,
+        "fill_s": round(fill, 2),
+        "lookup_p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "lookup_p99_ms": round(timings[int(len(timings) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic cache lookup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    embedder = HashingEmbedder()
+    start = time.perf_counter()
+    for i in range(1000):
+        embedder.embed_sync(f"회사 휴가 규정은 어떻게 되나요? {i}")
+    print(f"hashing embedder: {(time.perf_counter() - start):.3f}ms/embed")
+
+    for size in args.sizes:
+        print(bench(size, args.dim, args.lookups))
+
+
+if __name__ == "__main__":
+    main()
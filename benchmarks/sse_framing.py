@@ -0,0 +1,88 @@
+"""SSE 프레이밍 파이프라인 벤치마크
+
+가짜 토큰 스트림을 (1) 기존 방식(토큰마다 StreamResponse 생성 + json.dumps(dict) + str 프레임)과
+(2) 미리 인코딩한 bytes 프레임, (3) 토큰 코얼레싱을 켠 경우(시간 창, 크기, 둘 다)로 변환하면서
+토큰당 CPU 시간과 응답당 프레임 수(≈ send 호출 수)를 비교한다. 코얼레싱은 send 호출을 줄이는
+대신 토큰당 CPU가 늘면 의미가 없으므로 두 값을 함께 본다. `+disconnect` 항목은 /chat 스트리밍처럼
+cancel_on_disconnect까지 감싼 전체 파이프라인이다 (연결이 끊기지 않는 클라이언트).
+
+    python -m benchmarks.sse_framing --tokens 500 --responses 200 --token-delay-ms 1
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from src.api.sse import cancel_on_disconnect, sse_frames
+from src.models.schema import StreamResponse
+
+
+async def _tokens(count: int, delay: float):
+    for i in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        yield f"토큰{i} "
+
+
+async def _legacy_frames(chunks):
+    async for text in chunks:
+        chunk = StreamResponse(text=text.encode('utf-8').decode('utf-8'), done=False)
+        yield f"data: {json.dumps(chunk.dict(), ensure_ascii=False)}\n\n"
+        await asyncio.sleep(0)
+    yield f"data: {json.dumps(StreamResponse(text='', done=True).dict(), ensure_ascii=False)}\n\n"
+
+
+async def _connected_receive():
+    # 연결이 끊기지 않는 클라이언트 (http.disconnect를 보내지 않음)
+    await asyncio.Future()
+
+
+async def _run(name: str, make_frames, responses: int, tokens: int, delay: float) -> dict:
+    frames = 0
+    sent_bytes = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(responses):
+        async for frame in make_frames(_tokens(tokens, delay)):
+            frames += 1
+            sent_bytes += len(frame.encode() if isinstance(frame, str) else frame)
+    cpu = time.process_time() - cpu_start
+    return {
+        "pipeline": name,
+        "cpu_us_per_token": round(cpu / (responses * tokens) * 1e6, 2),
+        "frames_per_response": round(frames / responses, 1),
+        "bytes_per_response": sent_bytes // responses,
+        "wall_s": round(time.perf_counter() - wall_start, 2),
+    }
+
+
+async def _main(args):
+    delay = args.token_delay_ms / 1000
+    pipelines = [
+        ("legacy", _legacy_frames),
+        ("bytes", lambda chunks: sse_frames(chunks)),
+        ("bytes+disconnect", lambda chunks: cancel_on_disconnect(sse_frames(chunks), _connected_receive)),
+        (f"coalesce_{args.coalesce_ms}ms", lambda chunks: sse_frames(chunks, flush_ms=args.coalesce_ms)),
+        (f"coalesce_{args.coalesce_bytes}B", lambda chunks: sse_frames(chunks, flush_bytes=args.coalesce_bytes)),
+        (f"coalesce_{args.coalesce_ms}ms_{args.coalesce_bytes}B",
+         lambda chunks: sse_frames(chunks, flush_ms=args.coalesce_ms, flush_bytes=args.coalesce_bytes)),
+        (f"coalesce_{args.coalesce_ms}ms+disconnect",
+         lambda chunks: cancel_on_disconnect(sse_frames(chunks, flush_ms=args.coalesce_ms), _connected_receive)),
+    ]
+    for name, make_frames in pipelines:
+        print(json.dumps(await _run(name, make_frames, args.responses, args.tokens, delay), ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE framing benchmark")
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--responses", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--coalesce-ms", type=int, default=20)
+    parser.add_argument("--coalesce-bytes", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""콜드 스타트 벤치마크: `import main` 시간과 서버 시작 후 첫 /health 200까지의 시간
+
+각 측정은 새 파이썬 프로세스에서 실행한다. DB는 임시 파일을 미리 부트스트랩해 두고
+사용하므로 저장소의 users.db를 건드리지 않는다. 결과는 JSON으로 출력되어 커밋 간 비교에
+사용할 수 있다.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_health(env: dict, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("server did not become healthy")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="startup-bench-")) / "users.db")
+    env["PYTHONWARNINGS"] = "ignore"
+    subprocess.run([sys.executable, "-m", "src.core.database"], cwd=ROOT, env=env, check=True)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    healths = [measure_first_health(env) for _ in range(args.runs)]
+    print(json.dumps({
+        "runs": args.runs,
+        "import_main_s": {"median": round(statistics.median(imports), 3), "max": round(max(imports), 3)},
+        "first_health_200_s": {"median": round(statistics.median(healths), 3), "max": round(max(healths), 3)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
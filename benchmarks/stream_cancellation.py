@@ -0,0 +1,110 @@
+"""SSE 클라이언트 연결 종료 시 업스트림 생성 취소 확인
+
+느린 가짜 Ollama 서버(토큰 간 지연)를 두고 실제 uvicorn 서버로 스트리밍 요청을 보낸 뒤,
+몇 개의 프레임만 받고 연결을 끊는다. 연결을 끊은 시점부터 가짜 Ollama 서버가
+업스트림 연결 종료를 감지할 때까지의 시간을 측정하고, 제한 시간 안에 끊기지 않으면 실패한다.
+(가짜 서버는 다음 토큰을 쓸 때 끊김을 감지하므로 측정값에는 토큰 간 지연만큼의 오차가 있다)
+
+    python -m benchmarks.stream_cancellation --rounds 5 --token-delay 0.05 --max-abort-s 1.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_api_server(port: int):
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def _round(client, url: str, headers: dict, fake, frames_before_close: int, timeout: float) -> float:
+    aborted_before = fake.stats.aborted
+    async with client.stream("POST", url, json={"message": f"cancel {time.time_ns()}", "stream": True,
+                                                "bypass_cache": True}, headers=headers) as response:
+        received = 0
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                received += 1
+                if received >= frames_before_close:
+                    break
+        closed_at = time.monotonic()
+    # 응답 컨텍스트를 빠져나오면 httpx가 연결을 닫음 (브라우저 탭을 닫은 것과 같음)
+
+    deadline = closed_at + timeout
+    while fake.stats.aborted == aborted_before:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"upstream generation was not aborted within {timeout}s")
+        await asyncio.sleep(0.005)
+    return fake.stats.last_aborted_at - closed_at
+
+
+async def _run(args, fake, port: int) -> dict:
+    import httpx
+    from src.core.database import get_db, create_session
+
+    user = get_db().execute("SELECT id FROM users WHERE username = ?", ("admin",)).fetchone()
+    headers = {"Authorization": f"Bearer {create_session(user['id'])}"}
+    base = f"http://127.0.0.1:{port}"
+
+    latencies = []
+    async with httpx.AsyncClient(base_url=base, timeout=None) as client:
+        for _ in range(args.rounds):
+            latencies.append(await _round(client, "/api/v1/chat", headers, fake, args.frames, args.max_abort_s))
+        stats = (await client.get("/api/v1/stats", headers=headers)).json()
+
+    return {
+        "rounds": args.rounds,
+        "token_delay_s": args.token_delay,
+        "abort_latency_s": {"max": round(max(latencies), 3), "mean": round(sum(latencies) / len(latencies), 3)},
+        "upstream_completed": fake.stats.completed,
+        "upstream_aborted": fake.stats.aborted,
+        "streams": stats.get("streams"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upstream cancellation on client disconnect")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=3, help="연결을 끊기 전에 받을 프레임 수")
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--max-abort-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    fake = start_fake_ollama(config=FakeOllamaConfig(ttft=0.05, token_delay=args.token_delay, tokens=args.tokens))
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{fake.server_address[1]}"
+    os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="cancel-bench-")) / "users.db")
+
+    from src.core.database import bootstrap_db
+    bootstrap_db()
+
+    port = _free_port()
+    server = _start_api_server(port)
+    try:
+        print(json.dumps(asyncio.run(_run(args, fake, port)), indent=2))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""모델 예열 효과 측정
+
+모델 로드 시간을 흉내 내는 가짜 Ollama 서버(--load-delay)를 띄우고, 예열을 켠 경우와 끈 경우
+각각 서버 시작 직후 첫 채팅 요청의 첫 토큰까지 걸린 시간(TTFT)을 비교한다. 예열을 켠 경우에는
+예열이 끝난 뒤(실제 서비스에서 첫 사용자가 들어오기 전) 요청을 보낸다.
+
+    python -m benchmarks.warmup --load-delay 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+
+async def _first_request() -> dict:
+    import httpx
+    from main import app
+    from src.core.database import create_session, get_db
+    from src.services.warmup import model_warmer
+
+    async with app.router.lifespan_context(app):
+        if model_warmer._tasks:
+            await asyncio.wait_for(model_warmer._tasks[0], timeout=60)
+        user = get_db().execute("SELECT id FROM users WHERE username = ?", ("admin",)).fetchone()
+        headers = {"Authorization": f"Bearer {create_session(user['id'])}"}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            ttft = None
+            async with client.stream(
+                "POST", "/api/v1/chat", json={"message": "첫 요청", "stream": True, "bypass_cache": True}, headers=headers
+            ) as response:
+                async for _ in response.aiter_bytes():
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+            stats = (await client.get("/api/v1/stats", headers=headers)).json()["model_warmup"]
+
+    return {"client_ttft_seconds": round(ttft, 3), "model_warmup": stats}
+
+
+def _run_mode(warmup: bool, base_url: str) -> dict:
+    env = dict(
+        os.environ,
+        OLLAMA_BASE_URL=base_url,
+        OLLAMA_WARMUP_ENABLED=str(warmup).lower(),
+        OLLAMA_KEEPER_ENABLED="false",
+        DATABASE_PATH=str(Path(tempfile.mkdtemp(prefix="warmup-bench-")) / "users.db"),
+        SESSION_COMPACTION_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.warmup", "--child"], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model warm-up and first request TTFT")
+    parser.add_argument("--load-delay", type=float, default=3.0)
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_first_request())))
+        return
+
+    results = {}
+    for warmup in (False, True):
+        # 모드마다 새 서버를 띄워 모델이 내려가 있는 상태에서 시작
+        server = start_fake_ollama(config=FakeOllamaConfig(ttft=args.ttft, token_delay=0.005, tokens=10,
+                                                           load_delay=args.load_delay))
+        try:
+            result = _run_mode(warmup, f"http://127.0.0.1:{server.server_address[1]}")
+            result["model_loads"] = server.stats.loads
+        finally:
+            server.shutdown()
+        results["warmup" if warmup else "cold"] = result
+
+    print(json.dumps({"load_delay": args.load_delay, **results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from src.core.settings import settings
-from src.core.exceptions import LLMServiceError, InvalidRequestError
+from src.core.exceptions import FeatureDisabledError, LLMServiceError, InvalidRequestError, ServiceBusyError, TooManyRequestsError
+from src.core.passwords import shutdown_password_pool
+from src.core.database import bootstrap_db
+from src.core.maintenance import session_compactor
 from src.api.routes import router
+from src.api.metrics import MetricsMiddleware, render_metrics
+from src.api.tracing import TracingMiddleware
+from src.services.llm import shutdown_sync_executor
+from src.services.llm_pool import llm_registry
+from src.services.backends import backend_pool
+from src.services.warmup import model_warmer
+from src.services.conversations import conversation_store
+from src.services.employees import employee_directory
 
 description = """
 # FastAPI LangChain AI Chat API
@@ -17,6 +30,35 @@ This API provides integration with Ollama's Gemma model for chat completions.
 * 🎯 Custom system prompts support
 """
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스키마 생성/마이그레이션과 기본 계정 생성 (import 시점이 아닌 서버 시작 시 한 번)
+    await asyncio.to_thread(bootstrap_db)
+    llm_registry.start()
+    backend_pool.start()
+    # 첫 요청이 모델 로드 시간을 기다리지 않도록 백그라운드에서 예열
+    model_warmer.start()
+    if settings.SESSION_COMPACTION_ENABLED:
+        session_compactor.start()
+    if settings.EMPLOYEE_DIRECTORY_ENABLED:
+        employee_directory.start()
+    snapshot_path = settings.SEMANTIC_CACHE_SNAPSHOT_PATH if settings.SEMANTIC_CACHE_ENABLED else None
+    if snapshot_path:
+        from src.services.semantic_cache import semantic_cache
+        semantic_cache.load(snapshot_path)
+    yield
+    await session_compactor.stop()
+    await backend_pool.stop()
+    await model_warmer.stop()
+    await conversation_store.stop()
+    await employee_directory.stop()
+    # 종료 시 LLM 리소스 정리
+    if snapshot_path:
+        semantic_cache.save(snapshot_path)
+    await llm_registry.aclose()
+    shutdown_sync_executor()
+    shutdown_password_pool()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=description,
@@ -25,6 +67,7 @@ app = FastAPI(
     openapi_url="/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS 미들웨어 설정
@@ -36,6 +79,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청별 구간 시간(Server-Timing)과 선택적 프로파일링
+app.add_middleware(TracingMiddleware)
+
+# 라우트/상태 코드별 요청 수와 지연 시간 수집
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # 전역 예외 핸들러
 @app.exception_handler(LLMServiceError)
 async def llm_service_error_handler(request: Request, exc: LLMServiceError):
@@ -51,11 +101,40 @@ async def invalid_request_error_handler(request: Request, exc: InvalidRequestErr
         content={"error": exc.detail}
     )
 
+@app.exception_handler(FeatureDisabledError)
+async def feature_disabled_error_handler(request: Request, exc: FeatureDisabledError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail}
+    )
+
+@app.exception_handler(ServiceBusyError)
+async def service_busy_error_handler(request: Request, exc: ServiceBusyError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail},
+        headers=exc.headers
+    )
+
+@app.exception_handler(TooManyRequestsError)
+async def too_many_requests_error_handler(request: Request, exc: TooManyRequestsError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail},
+        headers=exc.headers
+    )
+
 # 헬스체크 엔드포인트
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# Prometheus 수집 엔드포인트
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # API 라우터 등록 - API 엔드포인트만 API_V1_STR 프리픽스 사용
 app.include_router(
     router,
@@ -0,0 +1,166 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.settings import settings
+from ..core.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, registry, render_family, format_labels
+from ..core.rate_limit import chat_request_limiter, chat_token_limiter, login_limiter
+from ..core.session_cache import session_cache
+from ..core.maintenance import session_compactor
+from ..services.cache import response_cache
+from ..services.backends import backend_pool
+from ..services.singleflight import stream_coalescer
+from ..services.scheduler import llm_scheduler
+from ..services.conversations import conversation_store
+from ..services.employees import employee_directory
+from ..services.warmup import model_warmer
+from .sse import stream_metrics
+from .websocket import ws_metrics
+
+def route_template(scope: Scope) -> str:
+    """경로 파라미터 값 대신 라우트 템플릿을 레이블로 사용해 시계열 수를 제한"""
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    # FastAPI 버전에 따라 include_router의 프리픽스가 route.path에 빠져 있으면 요청 경로에서 보충
+    extra = scope["path"].count("/") - template.count("/")
+    if extra > 0:
+        template = "/".join(scope["path"].split("/")[:extra + 1]) + template
+    return template
+
+class MetricsMiddleware:
+    """라우트 템플릿/상태 코드별 요청 수와 응답 완료까지의 시간 기록 (순수 ASGI, 스트리밍 응답을 감싸지 않음)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = (scope["method"], route_template(scope), str(status))
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, *labels)
+
+def _gauge(name: str, help: str, value: float) -> str:
+    return render_family(name, "gauge", help, [("", value)])
+
+def _counter(name: str, help: str, samples: list[tuple[str, float]]) -> str:
+    return render_family(name, "counter", help, samples)
+
+def _optional(value: float | None) -> list[tuple[str, float]]:
+    """아직 측정되지 않은 값(None)은 샘플 없이 HELP/TYPE만 출력"""
+    return [("", value)] if value is not None else []
+
+def _component_metrics() -> list[str]:
+    """기존 구성요소의 stats()를 수집 시점에 지표로 변환"""
+    streams = stream_metrics.stats()
+    sockets = ws_metrics.stats()
+    scheduler = llm_scheduler.stats()
+    cache = response_cache.stats()
+    sessions = session_cache.stats()
+    coalescing = stream_coalescer.stats()
+    conversations = conversation_store.stats()
+    backends = backend_pool.stats()["backends"]
+    warmup = model_warmer.stats()
+    compaction = session_compactor.stats()
+
+    def per_backend(key: str) -> list[tuple[str, float]]:
+        return [(format_labels(("backend",), (b["url"],)), float(b[key])) for b in backends]
+
+    families = [
+        _gauge("llm_streams_in_flight", "SSE chat streams currently open", streams["active"]),
+        _counter("llm_streams_total", "Finished SSE chat streams by outcome", [
+            (format_labels(("outcome",), ("completed",)), streams["completed"]),
+            (format_labels(("outcome",), ("cancelled",)), streams["cancelled"]),
+        ]),
+        _gauge("chat_websockets_open", "Chat WebSocket connections currently open", sockets["connections"]),
+        _counter("chat_websocket_turns_total", "Finished WebSocket chat turns by outcome", [
+            (format_labels(("outcome",), ("completed",)), sockets["turns_completed"]),
+            (format_labels(("outcome",), ("cancelled",)), sockets["turns_cancelled"]),
+            (format_labels(("outcome",), ("failed",)), sockets["turns_failed"]),
+        ]),
+        _counter("chat_websocket_backpressure_waits_total", "Frames that waited for a slow WebSocket client", [("", sockets["backpressure_waits"])]),
+        _counter("chat_websocket_slow_clients_total", "WebSocket connections closed because the client stopped reading", [("", sockets["slow_clients"])]),
+        _gauge("llm_scheduler_active", "Generations holding a scheduler slot", scheduler["active"]),
+        render_family("llm_scheduler_queued", "gauge", "Generations waiting for a slot", [
+            (format_labels(("priority",), (priority,)), count) for priority, count in scheduler["queued_by_priority"].items()
+        ]),
+        _counter("llm_scheduler_admitted_total", "Generations admitted by the scheduler", [("", scheduler["admitted"])]),
+        _counter("llm_scheduler_rejected_total", "Generations rejected by the scheduler", [
+            (format_labels(("reason",), ("queue_full",)), scheduler["rejected_queue_full"]),
+            (format_labels(("reason",), ("user_limit",)), scheduler["rejected_user_limit"]),
+            (format_labels(("reason",), ("timeout",)), scheduler["timed_out"]),
+        ]),
+        _gauge("llm_singleflight_in_flight", "Coalesced upstream streams in flight", coalescing["in_flight"]),
+        _counter("llm_singleflight_joined_total", "Requests that joined an in-flight stream", [("", coalescing["joined"])]),
+        _gauge("response_cache_entries", "Entries in the exact-match response cache", cache["entries"]),
+        _gauge("response_cache_bytes", "Bytes held by the response cache", cache["bytes"]),
+        _counter("response_cache_lookups_total", "Response cache lookups", [
+            (format_labels(("result",), ("hit",)), cache["hits"]),
+            (format_labels(("result",), ("miss",)), cache["misses"]),
+        ]),
+        _counter("session_cache_lookups_total", "Verified session cache lookups", [
+            (format_labels(("result",), ("hit",)), sessions["hits"]),
+            (format_labels(("result",), ("miss",)), sessions["misses"]),
+        ]),
+        _counter("rate_limit_rejected_total", "Requests rejected by rate limiters", [
+            (format_labels(("limiter",), (name,)), limiter.stats()["rejected"])
+            for name, limiter in (("chat_requests", chat_request_limiter), ("chat_tokens", chat_token_limiter),
+                                  ("login", login_limiter))
+        ]),
+        _gauge("conversations_cached", "Conversations held in memory", conversations["cached"]),
+        _counter("conversation_summaries_total", "Conversation summaries generated", [("", conversations["summaries"])]),
+        render_family("model_first_request_ttft_seconds", "gauge",
+                      "Time to first token of the first streaming request since startup", _optional(warmup["first_request_ttft_seconds"])),
+        render_family("model_first_request_latency_seconds", "gauge",
+                      "Generation time of the first non-streaming request since startup", _optional(warmup["first_request_latency_seconds"])),
+        render_family("model_warmup_seconds", "gauge", "Startup warm-up duration per backend and model", [
+            (format_labels(("backend", "model"), tuple(target.split(" ", 1))), seconds)
+            for target, seconds in warmup["warmup_seconds"].items()
+        ]),
+        _counter("model_warmup_errors_total", "Failed startup warm-up requests", [("", warmup["warmup_errors"])]),
+        _counter("model_keeper_requests_total", "Keep-alive reload requests by outcome", [
+            (format_labels(("outcome",), ("ok",)), warmup["keeper_touches"]),
+            (format_labels(("outcome",), ("error",)), warmup["keeper_errors"]),
+        ]),
+        _counter("session_compaction_runs_total", "Session compaction runs", [("", compaction["runs"])]),
+        _counter("session_compaction_rows_purged_total", "Expired sessions deleted by compaction", [("", compaction["rows_purged"])]),
+        _gauge("session_compaction_last_run_duration_seconds", "Duration of the last compaction run", compaction["last_run_duration_seconds"]),
+        render_family("session_compaction_last_run_timestamp_seconds", "gauge",
+                      "Unix time of the last compaction run", _optional(compaction["last_run_at"])),
+        _gauge("sessions_table_rows", "Rows in the sessions table after the last compaction", compaction["table_rows"]),
+        _gauge("database_size_bytes", "SQLite database size after the last compaction", compaction["db_bytes"]),
+        _gauge("employee_directory_employees", "Employees in the in-memory search index", employee_directory.stats()["employees"]),
+        render_family("ollama_backend_outstanding", "gauge", "In-flight requests per Ollama backend", per_backend("outstanding")),
+        render_family("ollama_backend_healthy", "gauge", "Backend health check state (1 healthy)", per_backend("healthy")),
+        render_family("ollama_backend_latency_ewma_seconds", "gauge", "Backend latency EWMA", per_backend("latency_ewma_seconds")),
+        _counter("ollama_backend_failures_total", "Failed requests per Ollama backend", per_backend("failures")),
+    ]
+    if settings.SEMANTIC_CACHE_ENABLED:
+        from ..services.semantic_cache import semantic_cache
+
+        semantic = semantic_cache.stats()
+        families.append(_gauge("semantic_cache_entries", "Entries in the semantic cache", semantic["entries"]))
+        families.append(_counter("semantic_cache_lookups_total", "Semantic cache lookups", [
+            (format_labels(("result",), ("hit",)), semantic["hits"]),
+            (format_labels(("result",), ("miss",)), semantic["misses"]),
+        ]))
+    return families
+
+def render_metrics() -> str:
+    """Prometheus 텍스트 형식(0.0.4)의 전체 지표"""
+    return "\n".join([registry.render(), *_component_metrics()]) + "\n"
+
+__all__ = ['MetricsMiddleware', 'render_metrics', 'route_template']
@@ -1,10 +1,40 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, WebSocket, status
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.responses import StreamingResponse, JSONResponse
-from ..models.schema import ChatRequest, ChatResponse, StreamResponse
-from ..services.llm import generate_response, generate_stream_async, generate_stream_sync
-from ..core.exceptions import LLMServiceError, InvalidRequestError
-from ..core.auth import get_current_user
+from starlette.background import BackgroundTask
+from ..models.schema import (
+    ChatRequest, ChatResponse, StreamResponse, BatchChatRequest, BatchChatResponse,
+    ConversationResponse, LoginRequest, TokenResponse, UserCreateRequest, UserResponse, SessionUserResponse,
+    EmployeeSearchResponse
+)
+from ..services.llm import generate_response, open_text_stream, generate_stream_sync, generate_batch
+from ..core.settings import settings
+from ..services.cache import response_cache
+from ..services.llm_pool import llm_registry
+from ..services.backends import backend_pool
+from ..services.warmup import model_warmer
+from ..services.singleflight import stream_coalescer
+from ..services.scheduler import llm_scheduler
+from ..services.conversations import Conversation, conversation_store
+from ..services.employees import employee_directory
+from ..core.exceptions import FeatureDisabledError, LLMServiceError, InvalidRequestError, ServiceBusyError, TooManyRequestsError
+from ..core.auth import get_current_user, get_admin_user, get_websocket_user, rate_limit_batch, rate_limit_chat, rate_limit_login, security
+from ..core.rate_limit import (
+    charge_generated_tokens, batch_item_limiter, chat_request_limiter, chat_token_limiter, login_limiter
+)
+from ..core.database import (
+    verify_user_async, create_user_async, create_session, delete_session, get_user_by_username, token_expiry
+)
+from ..core.session_cache import session_cache
+from ..core.maintenance import session_compactor
+from .sse import sse_frames, error_frame, timing_frame, cancel_on_disconnect, stream_metrics
+from .websocket import ChatSocket, turn_text_frame, dumps, ws_metrics
+from ..core.tracing import current_trace, start_trace, span
+from pydantic import ValidationError
+from contextlib import aclosing
+from typing import AsyncIterator, Hashable, Literal
 import json
+import math
 import asyncio
 
 router = APIRouter()
@@ -12,65 +42,318 @@ router = APIRouter()
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: dict = Depends(get_current_user)
+    http_request: Request,
+    current_user: dict = Depends(rate_limit_chat)
 ) -> ChatResponse | StreamingResponse:
     try:
-        if not request.message.strip():
-            raise InvalidRequestError("Message cannot be empty")
-
-        # 요청 메시지 디코딩
-        try:
-            decoded_message = request.message.encode().decode('utf-8')
-            decoded_system_prompt = request.system_prompt.encode().decode('utf-8') if request.system_prompt else None
-        except UnicodeError:
-            raise InvalidRequestError("Invalid character encoding in request")
+        validate_message(request)
+        conversation, history, sticky_key = await open_conversation(request, current_user['id'])
 
         if request.stream:
+            # 생성 슬롯은 응답 시작 전에 확보해 대기열 초과 시 429/503을 그대로 반환
+            chunks = await open_text_stream(
+                request.message,
+                request.system_prompt,
+                use_cache=not request.bypass_cache,
+                user=current_user['id'],
+                history=history,
+                sticky_key=sticky_key
+            )
+            # 클라이언트가 연결을 끊으면 업스트림 생성도 바로 취소
+            # 응답 본문을 보내기 전에 연결이 끊겨 생성기가 시작되지 않아도 백그라운드 작업에서 슬롯을 반납
             return StreamingResponse(
-                stream_generator(ChatRequest(
-                    message=decoded_message,
-                    system_prompt=decoded_system_prompt,
-                    stream=True
-                )),
+                cancel_on_disconnect(
+                    stream_generator(request, chunks, current_user['id'], conversation),
+                    http_request.receive
+                ),
                 media_type='text/event-stream',
                 headers={
                     'Cache-Control': 'no-cache',
                     'X-Accel-Buffering': 'no'  # Nginx 버퍼링 비활성화
-                }
+                },
+                background=BackgroundTask(chunks.aclose)
             )
         
-        response = generate_response(decoded_message, decoded_system_prompt)
-        
-        # 응답 인코딩
-        try:
-            encoded_response = response.encode().decode('utf-8')
-        except UnicodeError:
-            raise LLMServiceError("Failed to encode response")
-            
-        return ChatResponse(response=encoded_response)
-    except (LLMServiceError, InvalidRequestError) as e:
+        response = await generate_response(
+            request.message,
+            request.system_prompt,
+            use_cache=not request.bypass_cache,
+            user=current_user['id'],
+            history=history,
+            sticky_key=sticky_key
+        )
+        # 일반 응답은 이미 생성된 뒤이므로 차감만 하고, 초과분은 다음 요청부터 거절
+        charge_generated_tokens(current_user['id'], response)
+        if conversation is not None:
+            await conversation_store.append(conversation, request.message, response)
+        return ChatResponse(response=response, conversation_id=request.conversation_id)
+    except (LLMServiceError, InvalidRequestError, ServiceBusyError, TooManyRequestsError) as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def stream_generator(request: ChatRequest):
-    """비동기 스트리밍 생성기"""
+def validate_message(request: ChatRequest):
+    if not request.message.strip():
+        raise InvalidRequestError("Message cannot be empty")
+
+    # 인코딩할 수 없는 문자(짝이 없는 서로게이트 등) 검사
     try:
-        async for chunk in generate_stream_async(request.message, request.system_prompt):
-            try:
-                # 각 청크를 즉시 전송하고 flush
-                yield f"data: {json.dumps(chunk.dict(), ensure_ascii=False)}\n\n"
-                await asyncio.sleep(0)  # 다른 코루틴에 실행 기회를 줌
-            except UnicodeError:
-                yield f"data: {json.dumps({'error': 'Invalid character encoding in response chunk'})}\n\n"
-                await asyncio.sleep(0)
-                return
+        request.message.encode()
+        if request.system_prompt:
+            request.system_prompt.encode()
+    except UnicodeError:
+        raise InvalidRequestError("Invalid character encoding in request")
+
+async def open_conversation(request: ChatRequest, user_id: int) -> tuple[Conversation | None, list | None, Hashable]:
+    """대화 ID가 있으면 저장된 이전 대화를 토큰 예산 안에서 프롬프트에 포함하고, 같은 대화는 같은 서버로 보냄
+
+    대화 ID가 없는 요청은 서버에 고정하지 않고(sticky_key None) 부하 분산 정책대로 보낸다.
+    """
+    if not request.conversation_id:
+        return None, None, None
+    conversation = await conversation_store.load(user_id, request.conversation_id)
+    return conversation, conversation_store.context(conversation), (user_id, request.conversation_id)
+
+async def metered_chunks(chunks: AsyncIterator[str], user_id: int, parts: list[str] | None = None) -> AsyncIterator[str]:
+    """청크를 보내기 전에 생성 토큰 예산을 차감하고, 예산을 넘으면 스트림을 중단 (parts가 있으면 보낸 청크를 모음)"""
+    async for text in chunks:
+        wait = charge_generated_tokens(user_id, text)
+        if wait:
+            raise TooManyRequestsError("Token rate limit exceeded", retry_after=math.ceil(wait))
+        if parts is not None:
+            parts.append(text)
+        yield text
+
+async def stream_generator(
+    request: ChatRequest,
+    chunks: AsyncIterator[str],
+    user_id: int,
+    conversation: Conversation | None = None
+):
+    """비동기 스트리밍 생성기 (토큰별 모델 생성 없이 미리 인코딩된 SSE 프레임을 전송)"""
+    flush_ms = request.coalesce_ms if request.coalesce_ms is not None else settings.SSE_COALESCE_MS
+    flush_bytes = request.coalesce_bytes if request.coalesce_bytes is not None else settings.SSE_COALESCE_BYTES
+    parts = [] if conversation is not None else None
+    metered = metered_chunks(chunks, user_id, parts)
+    try:
+        async with aclosing(sse_frames(metered, flush_ms, flush_bytes)) as frames:
+            async for frame in frames:
+                yield frame
+        if conversation is not None:
+            # 끝까지 생성된 턴만 기록 (완료 직후 연결이 끊겨도 저장은 마치도록 보호)
+            await asyncio.shield(conversation_store.append(conversation, request.message, "".join(parts)))
+    except TooManyRequestsError as e:
+        yield error_frame(e.detail)
+    except UnicodeError:
+        yield error_frame('Invalid character encoding in response chunk')
     except LLMServiceError as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-        await asyncio.sleep(0)
+        yield error_frame(str(e))
     except Exception as e:
-        yield f"data: {json.dumps({'error': f'Internal server error: {str(e)}'})}\n\n"
-        await asyncio.sleep(0)
+        yield error_frame(f'Internal server error: {str(e)}')
+    finally:
+        await metered.aclose()
+        await chunks.aclose()
+    # 헤더를 보낸 뒤의 구간(첫 토큰, 생성 시간 등)까지 포함한 소요 시간을 마지막 이벤트로 전송
+    if (trace := current_trace()) is not None:
+        yield timing_frame(trace.as_dict())
+
+@router.websocket("/chat/ws")
+async def chat_ws(websocket: WebSocket, current_user: dict = Depends(get_websocket_user)):
+    """한 연결에서 여러 턴을 스트리밍하는 채팅 (인증은 연결 시 한 번, 턴마다 요청 수/토큰 한도 확인)"""
+    await websocket.accept()
+
+    async def handle_turn(socket: ChatSocket, turn_id: str, payload: dict):
+        await websocket_turn(socket, turn_id, payload, current_user)
+
+    await ChatSocket(websocket, handle_turn).run({"type": "ready", "user": current_user['username']})
+
+async def websocket_turn(socket: ChatSocket, turn_id: str, payload: dict, current_user: dict):
+    """WebSocket 턴 하나를 POST /chat 스트리밍과 같은 경로로 생성해 전송 (프레임마다 전송 대기열의 여유를 기다림)"""
+    trace = start_trace() if settings.SERVER_TIMING_ENABLED else None
+    try:
+        request = ChatRequest.model_validate(payload)
+    except ValidationError as e:
+        error = e.errors()[0]
+        raise InvalidRequestError(f"Invalid chat message: {'.'.join(map(str, error['loc']))}: {error['msg']}")
+    await rate_limit_chat(current_user)
+    validate_message(request)
+    conversation, history, sticky_key = await open_conversation(request, current_user['id'])
+
+    chunks = await open_text_stream(
+        request.message,
+        request.system_prompt,
+        use_cache=not request.bypass_cache,
+        user=current_user['id'],
+        history=history,
+        sticky_key=sticky_key
+    )
+    flush_ms = request.coalesce_ms if request.coalesce_ms is not None else settings.SSE_COALESCE_MS
+    flush_bytes = request.coalesce_bytes if request.coalesce_bytes is not None else settings.SSE_COALESCE_BYTES
+    parts = [] if conversation is not None else None
+    metered = metered_chunks(chunks, current_user['id'], parts)
+    try:
+        async with aclosing(sse_frames(metered, flush_ms, flush_bytes, turn_text_frame(turn_id), None)) as frames:
+            async for frame in frames:
+                await socket.send(frame)
+    finally:
+        await metered.aclose()
+        await chunks.aclose()
+    if conversation is not None:
+        # 완료 프레임 전에 기록해 클라이언트가 바로 다음 턴을 보내도 이번 턴이 이전 대화에 포함되도록 함
+        await asyncio.shield(conversation_store.append(conversation, request.message, "".join(parts)))
+    done = {"type": "done", "id": turn_id}
+    if trace is not None:
+        done["timing"] = trace.as_dict()
+    await socket.send(dumps(done))
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    request: BatchChatRequest,
+    current_user: dict = Depends(get_current_user)
+) -> BatchChatResponse | StreamingResponse:
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise InvalidRequestError(f"Batch cannot contain more than {settings.BATCH_MAX_ITEMS} items")
+    # 배치 하나가 아니라 항목마다 요청 하나로 계산
+    await rate_limit_batch(current_user, len(request.items))
+
+    if request.stream:
+        return StreamingResponse(
+            batch_stream_generator(request, current_user['id']),
+            media_type='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    results = []
+    async for result in generate_batch(request.items, request.max_concurrency, current_user['id']):
+        if result.response:
+            charge_generated_tokens(current_user['id'], result.response)
+        results.append(result)
+    results.sort(key=lambda result: result.index)
+    return BatchChatResponse(results=results)
+
+async def batch_stream_generator(request: BatchChatRequest, user_id: int):
+    """배치 결과를 완료되는 순서대로 NDJSON 한 줄씩 전송"""
+    async for result in generate_batch(request.items, request.max_concurrency, user_id):
+        if result.response:
+            charge_generated_tokens(user_id, result.response)
+        yield result.model_dump_json() + "\n"
+
+@router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
+async def get_conversation(
+    conversation_id: str,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user)
+) -> ConversationResponse:
+    """저장된 대화 기록 (최근 limit개 메시지와 이전 대화 요약)"""
+    history = await asyncio.to_thread(conversation_store.history, current_user['id'], conversation_id, max(1, min(limit, 1000)))
+    if history is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return ConversationResponse(conversation_id=conversation_id, **history)
+
+@router.delete("/conversations/{conversation_id}")
+async def delete_conversation(
+    conversation_id: str,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    if not await conversation_store.delete(current_user['id'], conversation_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return {"status": "ok"}
+
+@router.get("/employees/search", response_model=EmployeeSearchResponse, tags=["employees"])
+async def search_employees(
+    query: str = Query(..., min_length=1, max_length=100),
+    search_type: Literal["name", "position"] = Query("name", alias="type"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.EMPLOYEE_SEARCH_MAX_LIMIT),
+    current_user: dict = Depends(get_current_user)
+) -> EmployeeSearchResponse:
+    """이름 또는 직책으로 직원 검색 (완전/접두 일치, 초성, 부분 일치 순으로 정렬)"""
+    if not settings.EMPLOYEE_DIRECTORY_ENABLED:
+        raise FeatureDisabledError("Employee directory is disabled")
+    if not employee_directory.ready:
+        # 첫 색인이 실패했으면 다음 주기에 다시 시도하므로 그때까지 기다리도록 안내
+        if employee_directory.last_error is not None:
+            raise ServiceBusyError(
+                f"Employee directory failed to load: {employee_directory.last_error}",
+                retry_after=max(1, int(employee_directory.refresh_interval)),
+            )
+        raise ServiceBusyError("Employee directory is loading", retry_after=5)
+    with span("employee_search"):
+        results, has_more = employee_directory.search(query, search_type, offset, limit)
+    return EmployeeSearchResponse(results=results, offset=offset, limit=limit, has_more=has_more)
+
+@router.post("/auth/login", response_model=TokenResponse, tags=["auth"], dependencies=[Depends(rate_limit_login)])
+async def login(request: LoginRequest) -> TokenResponse:
+    user = await verify_user_async(request.username, request.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token = await asyncio.to_thread(create_session, user['id'])
+    return TokenResponse(access_token=token, expires_at=token_expiry(token))
+
+@router.get("/auth/me", response_model=SessionUserResponse, tags=["auth"])
+async def me(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user)
+) -> SessionUserResponse:
+    """현재 토큰의 사용자와 만료 시각 (클라이언트가 만료 전까지 사용자 정보를 캐시할 때 사용)"""
+    return SessionUserResponse(
+        id=current_user['id'],
+        username=current_user['username'],
+        expires_at=token_expiry(credentials.credentials)
+    )
+
+@router.post("/auth/logout", tags=["auth"])
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    await asyncio.to_thread(delete_session, credentials.credentials)
+    return {"status": "ok"}
+
+@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["auth"])
+async def create_user(
+    request: UserCreateRequest,
+    current_user: dict = Depends(get_admin_user)
+) -> UserResponse:
+    if not await create_user_async(request.username, request.password):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already exists")
+    user = await asyncio.to_thread(get_user_by_username, request.username)
+    return UserResponse(id=user['id'], username=user['username'])
+
+@router.get("/stats")
+async def stats(current_user: dict = Depends(get_current_user)) -> dict:
+    """캐시 등 내부 구성요소의 통계"""
+    result = {
+        "response_cache": response_cache.stats(),
+        "llm_clients": llm_registry.stats(),
+        "ollama_backends": backend_pool.stats(),
+        "model_warmup": model_warmer.stats(),
+        "stream_coalescing": stream_coalescer.stats(),
+        "streams": stream_metrics.stats(),
+        "websockets": ws_metrics.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "rate_limits": {
+            "chat_requests": chat_request_limiter.stats(),
+            "chat_tokens": chat_token_limiter.stats(),
+            "batch_items": batch_item_limiter.stats(),
+            "login": login_limiter.stats(),
+        },
+        "session_cache": session_cache.stats(),
+        "session_compaction": session_compactor.stats(),
+        "conversations": conversation_store.stats(),
+        "employee_directory": employee_directory.stats(),
+    }
+    if settings.SEMANTIC_CACHE_ENABLED:
+        from ..services.semantic_cache import semantic_cache
+        result["semantic_cache"] = semantic_cache.stats()
+    return result
 
 def sync_stream_generator(request: ChatRequest):
     """동기 스트리밍 생성기"""
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable
+from starlette.types import Receive
+
+# StreamResponse(text=..., done=...)를 json.dumps 한 것과 같은 형식의 프레임을 모델 생성 없이 직접 만든다
+_TEXT_PREFIX = b'data: {"text": '
+_TEXT_SUFFIX = b', "done": false}\n\n'
+DONE_FRAME = b'data: {"text": "", "done": true}\n\n'
+
+def text_frame(text: str) -> bytes:
+    return _TEXT_PREFIX + json.dumps(text, ensure_ascii=False).encode() + _TEXT_SUFFIX
+
+def error_frame(message: str) -> bytes:
+    return f"data: {json.dumps({'error': message})}\n\n".encode()
+
+def timing_frame(spans: dict[str, float]) -> bytes:
+    """구간별 소요 시간(ms)을 담은 마지막 이벤트 (이름 있는 이벤트라 onmessage 처리에는 영향 없음)"""
+    return b"event: timing\ndata: " + json.dumps(spans).encode() + b"\n\n"
+
+async def sse_frames(
+    chunks: AsyncIterator[str],
+    flush_ms: int = 0,
+    flush_bytes: int = 0,
+    frame: Callable[[str], bytes | str] = text_frame,
+    done: bytes | str | None = DONE_FRAME
+) -> AsyncIterator[bytes | str]:
+    """텍스트 청크를 SSE 프레임(bytes)으로 변환
+
+    flush_ms/flush_bytes가 설정되면 토큰을 모아 두었다가 버퍼가 flush_bytes 이상이 되거나
+    첫 토큰이 버퍼에 들어온 뒤 flush_ms가 지나면 한 프레임으로 보낸다.
+    frame/done으로 다른 전송 형식(WebSocket 등)의 프레임을 만들 수 있고, done이 None이면 완료 프레임을 생략한다.
+    """
+    if flush_ms <= 0 and flush_bytes <= 0:
+        async for text in chunks:
+            yield frame(text)
+        if done is not None:
+            yield done
+        return
+
+    if flush_ms <= 0:
+        # 크기 기준만 있으면 타이머가 필요 없으므로 이 태스크에서 바로 읽음
+        buffer: list[str] = []
+        buffered_bytes = 0
+        async for text in chunks:
+            buffer.append(text)
+            buffered_bytes += len(text.encode())
+            if buffered_bytes >= flush_bytes:
+                yield frame("".join(buffer))
+                buffer.clear()
+                buffered_bytes = 0
+        if buffer:
+            yield frame("".join(buffer))
+        if done is not None:
+            yield done
+        return
+
+    coalescer = _TimedCoalescer(chunks, flush_ms / 1000, flush_bytes)
+    try:
+        while (text := await coalescer.next_text()) is not None:
+            yield frame(text)
+    finally:
+        await coalescer.aclose()
+    if done is not None:
+        yield done
+
+# 시간 창만 설정된 경우에도 보내지 못한 버퍼가 이 크기를 넘으면 읽기를 멈춤 (느린 클라이언트 대비)
+_MAX_BUFFERED_BYTES = 64 * 1024
+
+class _TimedCoalescer:
+    """시간 창 코얼레싱: 태스크 하나가 청크를 버퍼에 모으고, 소비 쪽은 프레임마다 한 번만 깨어남
+
+    토큰마다 __anext__ 태스크와 asyncio.wait를 만드는 대신, 스트림 전체에서 읽기 태스크 하나를 쓰고
+    버퍼에 첫 토큰이 들어올 때 flush 타이머(loop.call_at)를 하나 건다. 보낼 버퍼가 flush_bytes
+    (없으면 _MAX_BUFFERED_BYTES) 이상 쌓이면 소비 쪽이 가져갈 때까지 업스트림 읽기를 멈춘다.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], window: float, flush_bytes: int):
+        self._loop = asyncio.get_running_loop()
+        self._window = window
+        self._limit = flush_bytes if flush_bytes > 0 else _MAX_BUFFERED_BYTES
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._ready = False  # 시간 창이 지났거나 크기 기준을 넘어 바로 보낼 수 있음
+        self._finished = False
+        self._error: BaseException | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._waiter: asyncio.Future | None = None  # 소비 쪽이 다음 프레임을 기다림
+        self._drained: asyncio.Future | None = None  # 읽기 태스크가 버퍼가 비워지길 기다림
+        self._task = asyncio.ensure_future(self._pump(chunks))
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _flush_due(self):
+        self._timer = None
+        self._ready = True
+        self._wake()
+
+    async def _pump(self, chunks: AsyncIterator[str]):
+        try:
+            async for text in chunks:
+                if not self._buffer:
+                    self._timer = self._loop.call_at(self._loop.time() + self._window, self._flush_due)
+                self._buffer.append(text)
+                self._buffered_bytes += len(text.encode())
+                if self._buffered_bytes >= self._limit:
+                    self._ready = True
+                    self._wake()
+                    self._drained = self._loop.create_future()
+                    await self._drained
+        except Exception as e:
+            self._error = e
+        finally:
+            self._finished = True
+            self._wake()
+
+    async def next_text(self) -> str | None:
+        """다음 프레임으로 보낼 텍스트 (스트림이 끝나고 버퍼가 비었으면 None)"""
+        while not (self._ready or self._finished):
+            self._waiter = self._loop.create_future()
+            await self._waiter
+        self._waiter = None
+        if self._error is not None:
+            raise self._error
+        if not self._buffer:
+            return None
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        self._ready = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._drained is not None and not self._drained.done():
+            self._drained.set_result(None)
+        return text
+
+    async def aclose(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if not self._task.done():
+            # 업스트림 제너레이터를 닫기 전에 진행 중인 읽기가 끝나도록 기다림
+            self._task.cancel()
+            await asyncio.wait((self._task,))
+
+class StreamMetrics:
+    """스트리밍 응답 수와 클라이언트 연결 종료로 취소된 스트림 수"""
+
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    def stats(self) -> dict:
+        return {
+            "active": self.started - self.completed - self.cancelled,
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+        }
+
+stream_metrics = StreamMetrics()
+
+async def _wait_for_disconnect(receive: Receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def cancel_on_disconnect(frames: AsyncIterator[bytes], receive: Receive) -> AsyncIterator[bytes]:
+    """클라이언트 연결이 끊기면 프레임 생성(업스트림 Ollama 요청 포함)을 즉시 취소
+
+    스트림마다 http.disconnect를 기다리는 감시 태스크 하나만 두고 프레임은 이 제너레이터에서 바로 읽는다.
+    끊김을 감지했을 때 응답 태스크가 업스트림 토큰을 기다리는 중이면 그 태스크를 취소하고, 전송 중이면
+    다음 프레임을 읽기 전에 멈춘다. 전송 실패나 서버 측 취소로 응답이 중단돼도 업스트림 스트림을 닫는다.
+    """
+    stream_metrics.started += 1
+    consumer = asyncio.current_task()
+    disconnected = False
+    pulling = False
+
+    async def watch():
+        nonlocal disconnected
+        await _wait_for_disconnect(receive)
+        disconnected = True
+        if pulling:
+            # 업스트림을 기다리던 응답 태스크를 취소하면 스트림이 닫히며 Ollama 연결도 끊김
+            consumer.cancel()
+
+    watcher = asyncio.ensure_future(watch())
+    iterator = frames.__aiter__()
+    completed = False
+    try:
+        while not disconnected:
+            pulling = True
+            try:
+                frame = await iterator.__anext__()
+            except StopAsyncIteration:
+                completed = True
+                break
+            except asyncio.CancelledError:
+                # 감시 태스크가 건 취소만 응답 종료로 처리 (서버 종료 등 다른 취소는 그대로 전파)
+                if not disconnected or consumer.cancelling() > 1:
+                    raise
+                consumer.uncancel()
+                break
+            finally:
+                pulling = False
+            yield frame
+    finally:
+        watcher.cancel()
+        if completed:
+            stream_metrics.completed += 1
+        else:
+            stream_metrics.cancelled += 1
+        await frames.aclose()
+
+__all__ = ['sse_frames', 'text_frame', 'error_frame', 'DONE_FRAME', 'cancel_on_disconnect', 'stream_metrics']
@@ -0,0 +1,80 @@
+import asyncio
+import cProfile
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.settings import settings
+from ..core.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# cProfile은 스레드당 하나만 활성화할 수 있으므로 동시에 한 요청만 기록
+_profile_lock = threading.Lock()
+
+class TracingMiddleware:
+    """요청별 구간 시간 추적과 선택적 프로파일링
+
+    요청마다 RequestTrace를 컨텍스트에 두고, 응답 헤더를 보낼 때까지 기록된 구간을 Server-Timing
+    헤더로 붙인다 (스트리밍 응답은 routes.stream_generator가 마지막 timing 이벤트로 전체 구간을 전송).
+    PROFILING_ENABLED일 때 `X-Profile: 1` 헤더가 있거나 PROFILING_SAMPLE_RATE로 뽑힌 요청은
+    응답이 끝날 때까지 cProfile로 기록해 PROFILING_DIR에 .prof 파일로 남긴다. 프로파일러는 이벤트 루프
+    스레드 전체를 기록하므로 같은 시간에 처리된 다른 요청도 결과에 섞인다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if not settings.PROFILING_ENABLED:
+            return False
+        if (b"x-profile", b"1") in scope["headers"]:
+            return True
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = start_trace() if settings.SERVER_TIMING_ENABLED else None
+        profile_path = None
+        profiler = None
+        if self._should_profile(scope) and _profile_lock.acquire(blocking=False):
+            name = scope["path"].strip("/").replace("/", "_") or "root"
+            profile_path = Path(settings.PROFILING_DIR) / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{random.getrandbits(32):08x}.prof"
+            profiler = cProfile.Profile()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if trace is not None:
+                    headers.append((b"server-timing", trace.server_timing().encode()))
+                if profile_path is not None:
+                    headers.append((b"x-profile-file", profile_path.name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if profiler is None:
+            await self.app(scope, receive, send_with_timing)
+            return
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profiler.disable()
+            _profile_lock.release()
+            try:
+                await asyncio.to_thread(_dump, profiler, profile_path)
+            except OSError as e:
+                logger.warning("Failed to write profile %s: %s", profile_path, e)
+
+def _dump(profiler: cProfile.Profile, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(path))
+    logger.info("Request profile written to %s", path)
+
+__all__ = ['TracingMiddleware']
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+from fastapi import HTTPException
+from starlette import status
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+from ..core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TURN_ID_LENGTH = 64
+
+def dumps(payload: dict) -> str:
+    """공백 없는 JSON 프레임"""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+def turn_text_frame(turn_id: str) -> Callable[[str], str]:
+    """턴의 텍스트 프레임 생성 함수 (가장 자주 보내는 프레임이므로 앞부분을 미리 만들어 둠)"""
+    prefix = '{"type":"text","id":' + json.dumps(turn_id, ensure_ascii=False) + ',"text":'
+    return lambda text: prefix + json.dumps(text, ensure_ascii=False) + "}"
+
+def error_payload(turn_id: str | None, status_code: int, detail: str, retry_after: str | None = None) -> dict:
+    payload = {"type": "error", "id": turn_id, "status": status_code, "detail": detail}
+    if retry_after is not None:
+        payload["retry_after"] = int(retry_after)
+    return payload
+
+class _SlowClient(Exception):
+    """클라이언트가 프레임을 읽지 않아 전송이 WS_SEND_TIMEOUT 이상 막힘"""
+
+class WebSocketMetrics:
+    """WebSocket 채팅 연결과 턴 처리 결과"""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.slow_clients = 0
+        self.turns_started = 0
+        self.turns_completed = 0
+        self.turns_cancelled = 0
+        self.turns_failed = 0
+        self.frames_sent = 0
+        self.backpressure_waits = 0
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.opened - self.closed,
+            "opened": self.opened,
+            "slow_clients": self.slow_clients,
+            "turns_active": self.turns_started - self.turns_completed - self.turns_cancelled - self.turns_failed,
+            "turns_started": self.turns_started,
+            "turns_completed": self.turns_completed,
+            "turns_cancelled": self.turns_cancelled,
+            "turns_failed": self.turns_failed,
+            "frames_sent": self.frames_sent,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+ws_metrics = WebSocketMetrics()
+
+# (연결, 턴 ID, 클라이언트 메시지)를 받아 send()로 프레임을 보내는 턴 처리 함수
+TurnHandler = Callable[["ChatSocket", str, dict], Awaitable[None]]
+
+class ChatSocket:
+    """WebSocket 연결 하나의 턴 다중화와 전송 대기열
+
+    수신 루프는 클라이언트 메시지(chat/cancel/ping)를 받아 chat마다 턴 태스크를 만들고, 전송은
+    전용 태스크 하나가 대기열 순서대로 처리한다. 턴이 보내는 프레임은 연결별 WS_SEND_QUEUE_SIZE
+    크레딧을 얻어야 대기열에 들어가므로, 클라이언트가 느리게 읽으면 턴은 send()에서 멈추고 더 이상
+    업스트림 토큰을 읽지 않는다. pong/cancelled 같은 제어 프레임은 수신 루프가 막히지 않도록 크레딧
+    없이 넣되 같은 한도를 넘게 쌓이거나, 프레임 하나의 전송이 WS_SEND_TIMEOUT보다 오래 막히면
+    읽지 않는 클라이언트로 보고 연결을 닫는다.
+    """
+
+    def __init__(self, websocket: WebSocket, handle_turn: TurnHandler):
+        self.websocket = websocket
+        self.handle_turn = handle_turn
+        self.turns: dict[str, asyncio.Task] = {}
+        self._outbox: asyncio.Queue[tuple[str, bool]] = asyncio.Queue()
+        self._credits = asyncio.Semaphore(settings.WS_SEND_QUEUE_SIZE)
+        self._pending_controls = 0
+
+    async def send(self, frame: str):
+        """턴의 프레임 전송 (대기열이 가득 차 있으면 클라이언트가 읽어 자리가 날 때까지 기다림)"""
+        if self._credits.locked():
+            ws_metrics.backpressure_waits += 1
+        await self._credits.acquire()
+        self._outbox.put_nowait((frame, True))
+
+    def send_control(self, payload: dict):
+        if self._pending_controls >= settings.WS_SEND_QUEUE_SIZE:
+            raise _SlowClient()
+        self._pending_controls += 1
+        self._outbox.put_nowait((dumps(payload), False))
+
+    async def _send_loop(self):
+        while True:
+            frame, is_turn_frame = await self._outbox.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame), settings.WS_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise _SlowClient() from None
+            finally:
+                if is_turn_frame:
+                    self._credits.release()
+                else:
+                    self._pending_controls -= 1
+            ws_metrics.frames_sent += 1
+
+    async def _receive_loop(self):
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+            raw = message.get("text")
+            if raw is None:
+                raw = message.get("bytes") or b""
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                self.send_control(error_payload(None, status.HTTP_400_BAD_REQUEST, "Invalid JSON message"))
+                continue
+            if not isinstance(payload, dict):
+                self.send_control(error_payload(None, status.HTTP_400_BAD_REQUEST, "Message must be a JSON object"))
+                continue
+
+            kind = payload.get("type")
+            if kind == "ping":
+                pong = {"type": "pong"}
+                if "id" in payload:
+                    pong["id"] = payload["id"]
+                self.send_control(pong)
+            elif kind == "chat":
+                self._start_turn(payload)
+            elif kind == "cancel":
+                self._cancel_turn(payload)
+            else:
+                self.send_control(error_payload(None, status.HTTP_400_BAD_REQUEST, f"Unknown message type: {kind}"))
+
+    def _turn_id(self, payload: dict) -> str | None:
+        turn_id = payload.get("id")
+        if isinstance(turn_id, bool) or not isinstance(turn_id, (str, int)):
+            return None
+        turn_id = str(turn_id)
+        return turn_id if 0 < len(turn_id) <= MAX_TURN_ID_LENGTH else None
+
+    def _start_turn(self, payload: dict):
+        turn_id = self._turn_id(payload)
+        if turn_id is None:
+            self.send_control(error_payload(
+                None, status.HTTP_400_BAD_REQUEST, f"Turn id must be a string or integer of up to {MAX_TURN_ID_LENGTH} characters"
+            ))
+        elif turn_id in self.turns:
+            self.send_control(error_payload(turn_id, status.HTTP_409_CONFLICT, "Turn id is already in progress"))
+        elif len(self.turns) >= settings.WS_MAX_TURNS_PER_CONNECTION:
+            self.send_control(error_payload(turn_id, status.HTTP_429_TOO_MANY_REQUESTS, "Too many concurrent turns"))
+        else:
+            self.turns[turn_id] = asyncio.create_task(self._run_turn(turn_id, payload))
+
+    def _cancel_turn(self, payload: dict):
+        """진행 중인 턴 취소 (이미 끝난 턴이면 무시). 취소된 턴은 더 이상 프레임을 보내지 않음"""
+        turn_id = self._turn_id(payload)
+        task = self.turns.get(turn_id) if turn_id is not None else None
+        if task is not None:
+            # 턴 태스크가 취소되면 스트림이 닫히며 업스트림 Ollama 요청도 끊김
+            task.cancel()
+            self.send_control({"type": "cancelled", "id": turn_id})
+
+    async def _run_turn(self, turn_id: str, payload: dict):
+        ws_metrics.turns_started += 1
+        try:
+            await self.handle_turn(self, turn_id, payload)
+            ws_metrics.turns_completed += 1
+        except asyncio.CancelledError:
+            ws_metrics.turns_cancelled += 1
+            raise
+        except HTTPException as e:
+            # HTTP 경로와 같은 예외(400/429/503 등)를 해당 턴의 오류 프레임으로 전송
+            ws_metrics.turns_failed += 1
+            retry_after = (e.headers or {}).get("Retry-After")
+            await self.send(dumps(error_payload(turn_id, e.status_code, str(e.detail), retry_after)))
+        except Exception as e:
+            ws_metrics.turns_failed += 1
+            logger.exception("WebSocket turn %s failed", turn_id)
+            await self.send(dumps(error_payload(turn_id, status.HTTP_500_INTERNAL_SERVER_ERROR, f"Internal server error: {str(e)}")))
+        finally:
+            self.turns.pop(turn_id, None)
+
+    async def run(self, ready: dict | None = None):
+        """연결이 끊기거나 느린 클라이언트로 판단될 때까지 메시지 처리 (accept 이후 호출)"""
+        ws_metrics.opened += 1
+        if ready is not None:
+            self.send_control(ready)
+        sender = asyncio.create_task(self._send_loop())
+        receiver = asyncio.create_task(self._receive_loop())
+        close_code = None
+        try:
+            done, _ = await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if isinstance(error, _SlowClient):
+                    ws_metrics.slow_clients += 1
+                    close_code = status.WS_1008_POLICY_VIOLATION
+                elif not isinstance(error, WebSocketDisconnect):
+                    logger.error("WebSocket connection failed", exc_info=error)
+                    close_code = status.WS_1011_INTERNAL_ERROR
+        finally:
+            tasks = [sender, receiver, *self.turns.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            ws_metrics.closed += 1
+            if close_code is not None and self.websocket.application_state == WebSocketState.CONNECTED:
+                # 읽지 않는 클라이언트에게는 닫기 프레임도 전송되지 않을 수 있으므로 오래 기다리지 않음
+                try:
+                    await asyncio.wait_for(self.websocket.close(close_code), 1.0)
+                except Exception:
+                    pass
+
+__all__ = ['ChatSocket', 'turn_text_frame', 'dumps', 'ws_metrics']
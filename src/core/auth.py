@@ -1,6 +1,10 @@
-from fastapi import Depends, HTTPException, status
+import math
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from ..core.database import verify_session
+from .exceptions import TooManyRequestsError
+from .tracing import span
+from .rate_limit import batch_item_limiter, chat_request_limiter, chat_token_limiter, login_limiter
 
 security = HTTPBearer()
 
@@ -13,7 +17,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     
     token = credentials.credentials
-    user = verify_session(token)
+    with span("auth"):
+        user = verify_session(token)
     
     if not user:
         raise HTTPException(
@@ -23,3 +28,44 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     
     return user
+
+async def get_websocket_user(websocket: WebSocket):
+    """WebSocket 연결 시 한 번만 인증 (브라우저는 헤더를 지정할 수 없으므로 token 쿼리 파라미터도 허용)"""
+    scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = websocket.query_params.get("token")
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) if token else None
+    try:
+        return await get_current_user(credentials)
+    except HTTPException as e:
+        # accept 전에 닫으면 핸드셰이크가 403으로 거절됨
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
+    if current_user['username'] != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+async def rate_limit_chat(current_user: dict = Depends(get_current_user)):
+    """사용자별 채팅 요청 수와 생성 토큰 예산 확인 (생성 토큰은 응답을 보내면서 차감)"""
+    wait = chat_request_limiter.consume(current_user['id']) or chat_token_limiter.retry_after(current_user['id'])
+    if wait:
+        raise TooManyRequestsError("Rate limit exceeded", retry_after=math.ceil(wait))
+    return current_user
+
+async def rate_limit_batch(current_user: dict, items: int):
+    """배치 항목 수만큼 사용자별 배치 예산을 차감하고 생성 토큰 예산 확인 (항목 하나가 채팅 요청 하나)"""
+    wait = batch_item_limiter.consume(current_user['id'], items) or chat_token_limiter.retry_after(current_user['id'])
+    if wait:
+        raise TooManyRequestsError("Rate limit exceeded", retry_after=math.ceil(wait))
+    return current_user
+
+async def rate_limit_login(request: Request):
+    """IP별 로그인 시도 수 제한"""
+    client = request.client.host if request.client else "unknown"
+    wait = login_limiter.consume(client)
+    if wait:
+        raise TooManyRequestsError("Too many login attempts", retry_after=math.ceil(wait))
@@ -1,135 +1,274 @@
+import asyncio
+import secrets
 import sqlite3
+import threading
+import time
 import jwt
 import datetime
-import bcrypt
 from typing import Optional
 from pathlib import Path
 from .settings import settings
+from .session_cache import session_cache
+from .metrics import AUTH_DB_OPERATION_DURATION
+from .tracing import span
+from .passwords import hash_password, verify_password, hash_password_async, verify_password_async
 
-DB_PATH = Path(__file__).parent.parent.parent / "users.db"
+DB_PATH = Path(settings.DATABASE_PATH) if settings.DATABASE_PATH else Path(__file__).parent.parent.parent / "users.db"
 
-def get_db():
-    conn = sqlite3.connect(str(DB_PATH))
+# 스레드별로 재사용하는 SQLite 연결
+_local = threading.local()
+
+# 스키마 마이그레이션 (PRAGMA user_version 기준으로 순서대로 한 번씩 적용)
+MIGRATIONS = [
+    # 1: 세션 조회/만료 정리용 인덱스
+    [
+        'CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)',
+    ],
+    # 2: 만료 세션 정리 후 빈 페이지를 증분 VACUUM으로 반환할 수 있도록 설정 (기존 파일은 VACUUM 필요)
+    [
+        'PRAGMA auto_vacuum = INCREMENTAL',
+        'VACUUM',
+    ],
+    # 3: 서버 측 대화 기록 (요약된 메시지는 summary_upto 이하 ID)
+    [
+        '''CREATE TABLE IF NOT EXISTS conversations (
+            user_id INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            summary TEXT,
+            summary_upto INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS conversation_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            conversation_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            tokens INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_conversation_messages_conversation ON conversation_messages (user_id, conversation_id, id)',
+    ],
+    # 4: 직원 검색 원본과 변경 로그 (검색 인덱스가 바뀐 직원만 다시 읽도록 트리거로 기록)
+    [
+        '''CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            position TEXT NOT NULL DEFAULT '',
+            department TEXT NOT NULL DEFAULT ''
+        )''',
+        '''CREATE TABLE IF NOT EXISTS employee_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id INTEGER NOT NULL
+        )''',
+        '''CREATE TRIGGER IF NOT EXISTS employees_after_insert AFTER INSERT ON employees BEGIN
+            INSERT INTO employee_changes (employee_id) VALUES (NEW.id);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS employees_after_update AFTER UPDATE ON employees BEGIN
+            INSERT INTO employee_changes (employee_id) VALUES (OLD.id);
+            INSERT INTO employee_changes (employee_id) SELECT NEW.id WHERE NEW.id != OLD.id;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS employees_after_delete AFTER DELETE ON employees BEGIN
+            INSERT INTO employee_changes (employee_id) VALUES (OLD.id);
+        END''',
+    ],
+]
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        str(DB_PATH),
+        timeout=settings.DB_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=settings.DB_CACHED_STATEMENTS,
+    )
     conn.row_factory = sqlite3.Row
+    # WAL: 읽기와 쓰기가 서로를 막지 않음, NORMAL: WAL에서 안전하면서 fsync 횟수를 줄임
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}')
     return conn
 
+def get_db() -> sqlite3.Connection:
+    """현재 스레드의 SQLite 연결 반환 (호출 측에서 닫지 않음)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+def close_db():
+    """현재 스레드의 SQLite 연결 종료"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+def migrate(conn: sqlite3.Connection):
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
+
 def init_db():
     conn = get_db()
-    c = conn.cursor()
-    
-    # 사용자 테이블 생성
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 세션 테이블 생성
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            token TEXT UNIQUE NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode(), salt).decode()
+    with conn:
+        # 사용자 테이블 생성
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(password.encode(), password_hash.encode())
+        # 세션 테이블 생성
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                token TEXT UNIQUE NOT NULL,
+                expires_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
 
-def create_user(username: str, password: str) -> bool:
+    migrate(conn)
+
+@AUTH_DB_OPERATION_DURATION.time("insert_user")
+def _insert_user(username: str, password_hash: str) -> bool:
     try:
-        conn = get_db()
-        c = conn.cursor()
-        password_hash = hash_password(password)
-        c.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)',
-                 (username, password_hash))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)',
+                         (username, password_hash))
         return True
     except sqlite3.IntegrityError:
         return False
 
+def create_user(username: str, password: str) -> bool:
+    return _insert_user(username, hash_password(password))
+
+async def create_user_async(username: str, password: str) -> bool:
+    """bcrypt 해시는 프로세스 풀에서, DB 쓰기는 워커 스레드에서 실행"""
+    password_hash = await hash_password_async(password)
+    return await asyncio.to_thread(_insert_user, username, password_hash)
+
+@AUTH_DB_OPERATION_DURATION.time("get_user")
+def get_user_by_username(username: str) -> Optional[dict]:
+    user = get_db().execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    return dict(user) if user else None
+
 def verify_user(username: str, password: str) -> Optional[dict]:
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username = ?', (username,))
-    user = c.fetchone()
-    conn.close()
-    
+    user = get_user_by_username(username)
+
     if user and verify_password(password, user['password_hash']):
-        return dict(user)
+        return user
     return None
 
+async def verify_user_async(username: str, password: str) -> Optional[dict]:
+    started = time.perf_counter()
+    try:
+        user = await asyncio.to_thread(get_user_by_username, username)
+
+        if user and await verify_password_async(password, user['password_hash']):
+            return user
+        return None
+    finally:
+        # 사용자 조회와 bcrypt 검증(프로세스 풀 대기 포함)을 합친 로그인 확인 시간
+        AUTH_DB_OPERATION_DURATION.observe(time.perf_counter() - started, "verify_user")
+
+def list_users() -> list[dict]:
+    rows = get_db().execute('SELECT id, username, created_at FROM users ORDER BY id').fetchall()
+    return [dict(row) for row in rows]
+
+@AUTH_DB_OPERATION_DURATION.time("create_session")
 def create_session(user_id: int) -> str:
     # JWT 토큰 생성
     expires_at = datetime.datetime.utcnow() + datetime.timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
     token = jwt.encode(
         {
             'user_id': user_id,
-            'exp': expires_at
+            'exp': expires_at,
+            # 같은 초에 같은 사용자가 다시 로그인해도 토큰(UNIQUE)이 겹치지 않도록
+            'jti': secrets.token_hex(8)
         },
         settings.SECRET_KEY,
         algorithm='HS256'
     )
-    
+
     # DB에 세션 저장
     conn = get_db()
-    c = conn.cursor()
-    c.execute('INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, ?)',
-             (user_id, token, expires_at))
-    conn.commit()
-    conn.close()
-    
+    with conn:
+        conn.execute('INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, ?)',
+                     (user_id, token, expires_at))
+
     return token
 
+def token_expiry(token: str) -> int:
+    """토큰의 만료 시각 (Unix 초, 서명은 검증하지 않으므로 이미 검증된 토큰에만 사용)"""
+    return jwt.decode(token, options={'verify_signature': False})['exp']
+
+@AUTH_DB_OPERATION_DURATION.time("verify_session")
 def verify_session(token: str) -> Optional[dict]:
+    # 최근에 검증된 토큰은 JWT 디코딩과 DB 조회 없이 반환
+    if (cached := session_cache.get(token)) is not None:
+        return cached
+
     try:
         # JWT 토큰 검증
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        with span("jwt"):
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
         user_id = payload['user_id']
-        
+
         # DB에서 세션 확인
-        conn = get_db()
-        c = conn.cursor()
-        c.execute('''
-            SELECT u.* FROM users u
-            JOIN sessions s ON u.id = s.user_id
-            WHERE s.token = ? AND s.expires_at > CURRENT_TIMESTAMP
-        ''', (token,))
-        user = c.fetchone()
-        conn.close()
-        
+        with span("session_db"):
+            conn = get_db()
+            user = conn.execute('''
+                SELECT u.* FROM users u
+                JOIN sessions s ON u.id = s.user_id
+                WHERE s.token = ? AND s.expires_at > CURRENT_TIMESTAMP
+            ''', (token,)).fetchone()
+
         if user:
-            return dict(user)
+            user = dict(user)
+            session_cache.set(token, user, payload['exp'])
+            return user
     except jwt.ExpiredSignatureError:
         delete_session(token)
     except jwt.InvalidTokenError:
         pass
     return None
 
+@AUTH_DB_OPERATION_DURATION.time("delete_session")
 def delete_session(token: str):
+    session_cache.invalidate(token)
     conn = get_db()
-    c = conn.cursor()
-    c.execute('DELETE FROM sessions WHERE token = ?', (token,))
-    conn.commit()
-    conn.close()
-
-# 데이터베이스 초기화
-init_db()
-
-# 기본 관리자 계정 생성
-if not verify_user("admin", "admin"):
-    create_user("admin", "admin")
-    create_user("jinwoo1126", "jinwoo1126!")
+    with conn:
+        conn.execute('DELETE FROM sessions WHERE token = ?', (token,))
+
+# 기본 계정 (이미 있으면 건너뜀)
+DEFAULT_USERS = [
+    ("admin", "admin"),
+    ("jinwoo1126", "jinwoo1126!"),
+]
+
+def seed_default_users():
+    for username, password in DEFAULT_USERS:
+        if get_user_by_username(username) is None:
+            create_user(username, password)
+
+def bootstrap_db():
+    """스키마 생성/마이그레이션과 기본 계정 생성 (여러 번 실행해도 안전)
+
+    import 시에는 실행되지 않으며, FastAPI lifespan 또는 `python -m src.core.database`로 실행한다.
+    """
+    init_db()
+    seed_default_users()
+
+if __name__ == "__main__":
+    bootstrap_db()
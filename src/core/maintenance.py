@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from .settings import settings
+from .database import get_db
+
+logger = logging.getLogger(__name__)
+
+class SessionCompactor:
+    """만료된 세션을 작은 배치 트랜잭션으로 주기적으로 삭제하는 백그라운드 작업
+
+    각 실행마다 증분 VACUUM으로 빈 페이지를 반환하고, 일정 횟수마다 ANALYZE로
+    쿼리 플래너 통계를 갱신한다.
+    """
+
+    def __init__(self, interval: float, batch_size: int, vacuum_pages: int, analyze_every: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.analyze_every = analyze_every
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.rows_purged = 0
+        self.last_run_purged = 0
+        self.last_run_duration = 0.0
+        self.last_run_at: float | None = None
+        self.table_rows = 0
+        self.db_bytes = 0
+
+    def compact_once(self) -> int:
+        """만료 세션을 삭제하고 삭제한 행 수를 반환 (블로킹, 워커 스레드에서 실행)"""
+        start = time.perf_counter()
+        conn = get_db()
+        purged = 0
+        while True:
+            # 한 번에 batch_size개씩만 지워 로그인/세션 확인 쓰기를 오래 막지 않음
+            with conn:
+                cursor = conn.execute('''
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP LIMIT ?
+                    )
+                ''', (self.batch_size,))
+            purged += cursor.rowcount
+            if cursor.rowcount < self.batch_size:
+                break
+
+        conn.execute(f'PRAGMA incremental_vacuum({self.vacuum_pages})').fetchall()
+        self.runs += 1
+        if self.analyze_every and self.runs % self.analyze_every == 0:
+            conn.execute('ANALYZE sessions')
+
+        self.table_rows = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        self.db_bytes = page_count * page_size
+
+        self.rows_purged += purged
+        self.last_run_purged = purged
+        self.last_run_duration = time.perf_counter() - start
+        self.last_run_at = time.time()
+        return purged
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.compact_once)
+            except Exception as e:
+                logger.warning("Session compaction failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """백그라운드 정리 태스크 시작 (lifespan에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rows_purged": self.rows_purged,
+            "last_run_purged": self.last_run_purged,
+            "last_run_duration_seconds": self.last_run_duration,
+            "last_run_at": self.last_run_at,
+            "table_rows": self.table_rows,
+            "db_bytes": self.db_bytes,
+        }
+
+session_compactor = SessionCompactor(
+    interval=settings.SESSION_COMPACTION_INTERVAL_SECONDS,
+    batch_size=settings.SESSION_COMPACTION_BATCH_SIZE,
+    vacuum_pages=settings.SESSION_COMPACTION_VACUUM_PAGES,
+    analyze_every=settings.SESSION_COMPACTION_ANALYZE_EVERY,
+)
+
+__all__ = ['SessionCompactor', 'session_compactor']
@@ -0,0 +1,175 @@
+import bisect
+import threading
+import time
+from functools import wraps
+from typing import Iterable
+
+# 지연 시간 기본 버킷(초), 스트리밍 응답 전체 시간까지 담을 수 있도록 수 분까지 포함
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+INTER_TOKEN_BUCKETS = (0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def render_family(name: str, kind: str, help: str, samples: Iterable[tuple[str, float]]) -> str:
+    """(레이블 문자열, 값) 목록을 Prometheus 텍스트 형식 한 블록으로 변환"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{labels} {_number(value)}" for labels, value in samples)
+    return "\n".join(lines)
+
+class _Metric:
+    """스레드별 샤드에 기록하고 수집할 때만 합치는 지표
+
+    기록하는 쪽은 자기 스레드의 dict만 갱신하므로 락이 없고(스레드가 처음 기록할 때 한 번만 샤드를
+    등록), 이벤트 루프와 DB 워커 스레드가 동시에 기록해도 값을 잃지 않는다.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> list[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        # dict.copy()는 GIL 안에서 한 번에 실행되므로 기록 중인 샤드도 안전하게 복사됨
+        return [shard.copy() for shard in shards]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def render(self) -> str:
+        totals: dict[tuple, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        samples = ((format_labels(self.labelnames, labels), value) for labels, value in sorted(totals.items()))
+        return render_family(self.name, self.kind, self.help, samples)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        # [버킷별 개수..., +Inf 개수, 합계]
+        data = shard.get(labels)
+        if data is None:
+            data = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        data[bisect.bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def time(self, *labels):
+        """동기 함수의 실행 시간을 기록하는 데코레이터"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *labels)
+            return wrapper
+        return decorator
+
+    def render(self) -> str:
+        totals: dict[tuple, list] = {}
+        for shard in self._snapshots():
+            for labels, data in shard.items():
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(data)
+                else:
+                    for i, value in enumerate(data):
+                        total[i] += value
+
+        samples = []
+        bounds = self.buckets + (float("inf"),)
+        for labels, data in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, data):
+                cumulative += count
+                samples.append((f"_bucket{format_labels(self.labelnames + ('le',), labels + (_number(bound),))}", cumulative))
+            label_text = format_labels(self.labelnames, labels)
+            samples.append((f"_sum{label_text}", data[-1]))
+            samples.append((f"_count{label_text}", cumulative))
+        return render_family(self.name, self.kind, self.help, samples)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics)
+
+registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request duration until the response body is complete",
+    ("method", "route", "status"))
+
+# LLM 생성
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds", "Time from upstream request to the first streamed token", ("model",))
+LLM_INTER_TOKEN_LATENCY = Histogram(
+    "llm_inter_token_latency_seconds", "Mean gap between streamed tokens, one sample per generation",
+    ("model",), INTER_TOKEN_BUCKETS)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_tokens_per_second", "Decode throughput after the first token, one sample per generation",
+    ("model",), TOKENS_PER_SECOND_BUCKETS)
+LLM_GENERATION_DURATION = Histogram(
+    "llm_generation_duration_seconds", "Upstream generation duration", ("model", "mode"))
+LLM_GENERATED_TOKENS = Counter(
+    "llm_generated_tokens_total", "Generated tokens (streamed chunks or reported eval count)", ("model",))
+LLM_GENERATION_ERRORS = Counter(
+    "llm_generation_errors_total", "Failed upstream generations", ("model", "mode"))
+
+# 인증/DB
+AUTH_DB_OPERATION_DURATION = Histogram(
+    "auth_db_operation_duration_seconds", "Duration of auth and user database operations", ("operation",), DB_BUCKETS)
+
+__all__ = [
+    'Counter', 'Histogram', 'MetricsRegistry', 'registry', 'render_family', 'format_labels',
+    'HTTP_REQUESTS', 'HTTP_REQUEST_DURATION',
+    'LLM_TIME_TO_FIRST_TOKEN', 'LLM_INTER_TOKEN_LATENCY', 'LLM_TOKENS_PER_SECOND',
+    'LLM_GENERATION_DURATION', 'LLM_GENERATED_TOKENS', 'LLM_GENERATION_ERRORS',
+    'AUTH_DB_OPERATION_DURATION'
+]
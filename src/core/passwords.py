@@ -0,0 +1,60 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from .settings import settings
+from .exceptions import ServiceBusyError
+
+def hash_password(password: str) -> str:
+    salt = bcrypt.gensalt()
+    return bcrypt.hashpw(password.encode(), salt).decode()
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+# bcrypt 전용 프로세스 풀 (CPU 비용이 이벤트 루프와 GIL을 점유하지 않도록)
+_executor: ProcessPoolExecutor | None = None
+_semaphore: asyncio.Semaphore | None = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+    return _semaphore
+
+async def _run_in_pool(fn, *args):
+    # 동시에 처리할 해시 연산 수를 제한하고, 로그인 폭주로 대기가 길어지면 바로 거절
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ServiceBusyError("Too many concurrent authentication requests")
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        semaphore.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _run_in_pool(verify_password, password, password_hash)
+
+def shutdown_password_pool():
+    """bcrypt 프로세스 풀 종료"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+__all__ = ['hash_password', 'verify_password', 'hash_password_async', 'verify_password_async', 'shutdown_password_pool']
@@ -0,0 +1,116 @@
+import math
+import threading
+import time
+from typing import Hashable
+from .settings import settings
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 생성 토큰 수를 대략 추정 (한글/영문 혼합 기준 약 3자당 1토큰)"""
+    return math.ceil(len(text) / 3)
+
+class RateLimiter:
+    """키(사용자 ID, IP 등)별 토큰 버킷 저장소
+
+    버킷은 초당 rate만큼 충전되고 최대 capacity까지 적립된다. 확인은 O(1)이며, 가득 찰 만큼
+    오래 사용되지 않은 버킷은 새 버킷과 같으므로 sweep_interval마다 정리한다. rate가 0 이하이면
+    제한하지 않는다.
+    """
+
+    def __init__(self, rate: float, capacity: float, sweep_interval: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.sweep_interval = sweep_interval
+        # key -> [남은 토큰, 마지막 갱신 시각]
+        self._buckets: dict[Hashable, list[float]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.rejected = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _bucket(self, key: Hashable, now: float) -> list[float]:
+        if now >= self._next_sweep:
+            self._evict_idle(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def _evict_idle(self, now: float):
+        idle = [key for key, (tokens, updated) in self._buckets.items()
+                if tokens + (now - updated) * self.rate >= self.capacity]
+        for key in idle:
+            del self._buckets[key]
+        self.evicted += len(idle)
+        self._next_sweep = now + self.sweep_interval
+
+    def consume(self, key: Hashable, cost: float = 1.0) -> float:
+        """cost만큼 차감. 허용되면 0, 부족하면 다시 시도할 수 있을 때까지 남은 시간(초)"""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            self.rejected += 1
+            return (cost - bucket[0]) / self.rate
+
+    def charge(self, key: Hashable, cost: float) -> float:
+        """잔량과 관계없이 cost만큼 차감하고 남은 토큰 수를 반환 (음수면 충전될 때까지 요청이 거절됨)"""
+        if not self.enabled:
+            return self.capacity
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            bucket[0] -= cost
+            return bucket[0]
+
+    def retry_after(self, key: Hashable, cost: float = 1.0) -> float:
+        """차감하지 않고 cost만큼 쓸 수 있을 때까지 남은 시간(초)을 확인"""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            if bucket[0] >= cost:
+                return 0.0
+            self.rejected += 1
+            return (cost - bucket[0]) / self.rate
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"buckets": len(self._buckets), "rejected": self.rejected, "evicted": self.evicted}
+
+def _limiter(rate: float, capacity: float) -> RateLimiter:
+    return RateLimiter(
+        rate=rate if settings.RATE_LIMIT_ENABLED else 0,
+        capacity=capacity,
+        sweep_interval=settings.RATE_LIMIT_SWEEP_INTERVAL,
+    )
+
+# 사용자별 채팅 요청 수 (초당)
+chat_request_limiter = _limiter(settings.RATE_LIMIT_CHAT_RPS, settings.RATE_LIMIT_CHAT_BURST)
+# 사용자별 생성 토큰 수 (분당, 1분 치 예산까지 적립)
+chat_token_limiter = _limiter(settings.RATE_LIMIT_TOKENS_PER_MINUTE / 60, settings.RATE_LIMIT_TOKENS_PER_MINUTE)
+# 사용자별 배치 항목 수 (분당, 최대 크기의 배치 하나는 항상 받을 수 있도록 적립 한도를 맞춤)
+batch_item_limiter = _limiter(
+    settings.RATE_LIMIT_BATCH_ITEMS_PER_MINUTE / 60,
+    max(settings.RATE_LIMIT_BATCH_ITEMS_BURST, settings.BATCH_MAX_ITEMS),
+)
+# IP별 로그인 시도 수 (분당)
+login_limiter = _limiter(settings.RATE_LIMIT_LOGIN_PER_MINUTE / 60, settings.RATE_LIMIT_LOGIN_BURST)
+
+def charge_generated_tokens(user_id: Hashable, text: str) -> float:
+    """생성된 텍스트만큼 사용자의 토큰 예산을 차감. 예산을 넘었으면 다시 충전될 때까지 남은 시간(초)"""
+    remaining = chat_token_limiter.charge(user_id, estimate_tokens(text))
+    return -remaining / chat_token_limiter.rate if remaining < 0 else 0.0
+
+__all__ = [
+    'RateLimiter', 'estimate_tokens', 'charge_generated_tokens',
+    'chat_request_limiter', 'chat_token_limiter', 'batch_item_limiter', 'login_limiter'
+]
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from .settings import settings
+
+class SessionCache:
+    """검증된 토큰 → 사용자 정보 TTL 캐시
+
+    항목의 만료 시각은 설정된 TTL과 JWT의 exp 중 이른 쪽으로 정해지므로, 캐시가 토큰의
+    유효 기간을 늘리지 않는다. 로그아웃 시 delete_session에서 즉시 무효화된다.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # token -> (사용자 정보, 만료 시각(epoch))
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(user)
+
+    def set(self, token: str, user: dict, exp: float):
+        if self.ttl <= 0:
+            return
+        expires_at = min(time.time() + self.ttl, exp)
+        with self._lock:
+            self._entries[token] = (dict(user), expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        with self._lock:
+            if self._entries.pop(token, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+session_cache = SessionCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    ttl=settings.SESSION_CACHE_TTL_SECONDS,
+)
+
+__all__ = ['SessionCache', 'session_cache']
@@ -1,5 +1,11 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
+class OllamaBackend(BaseModel):
+    url: str
+    weight: float = 1.0
+    models: list[str] | None = None  # None이면 모든 모델 처리 가능
+
 class Settings(BaseSettings):
     # API Configuration
     API_V1_STR: str = "/api/v1"
@@ -9,10 +15,132 @@ class Settings(BaseSettings):
     # Security Configuration
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_HOURS: int = 24
+    # 검증된 세션 캐시 (다른 프로세스에서의 로그아웃은 최대 TTL만큼 늦게 반영됨, 0이면 비활성화)
+    SESSION_CACHE_TTL_SECONDS: float = 60.0
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+    # bcrypt 해시 연산 (별도 프로세스 풀에서 실행)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4  # 동시에 처리할 최대 해시 연산 수
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0  # 대기 한도(초), 초과 시 503 응답
+
+    # Rate Limit Configuration (각 한도를 0으로 두면 해당 제한 비활성화)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CHAT_RPS: float = 2.0  # 사용자별 초당 채팅 요청 수
+    RATE_LIMIT_CHAT_BURST: int = 10
+    RATE_LIMIT_BATCH_ITEMS_PER_MINUTE: float = 120.0  # 사용자별 분당 배치 항목 수 (항목마다 1씩 차감)
+    RATE_LIMIT_BATCH_ITEMS_BURST: int = 100  # BATCH_MAX_ITEMS보다 작으면 BATCH_MAX_ITEMS로 올림
+    RATE_LIMIT_TOKENS_PER_MINUTE: int = 20000  # 사용자별 분당 생성 토큰 수 (스트리밍 중에도 차감)
+    RATE_LIMIT_LOGIN_PER_MINUTE: float = 10.0  # IP별 분당 로그인 시도 수
+    RATE_LIMIT_LOGIN_BURST: int = 5
+    RATE_LIMIT_SWEEP_INTERVAL: float = 60.0  # 유휴 버킷 정리 주기(초)
     
+    # Database Configuration
+    DATABASE_PATH: str | None = None  # 기본값: 프로젝트 루트의 users.db
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_CACHED_STATEMENTS: int = 128  # 연결별로 재사용할 준비된 문장 수
+
+    # Session Compaction Configuration
+    SESSION_COMPACTION_ENABLED: bool = True
+    SESSION_COMPACTION_INTERVAL_SECONDS: float = 300.0
+    SESSION_COMPACTION_BATCH_SIZE: int = 500  # 트랜잭션 하나에서 삭제할 최대 행 수
+    SESSION_COMPACTION_VACUUM_PAGES: int = 1000  # 실행마다 증분 VACUUM으로 반환할 최대 페이지 수
+    SESSION_COMPACTION_ANALYZE_EVERY: int = 12  # N회 실행마다 ANALYZE (0이면 비활성화)
+
     # Ollama Configuration
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     MODEL_NAME: str = "gemma3"
+    # 여러 Ollama 서버로 분산할 때 JSON으로 지정 (비어 있으면 OLLAMA_BASE_URL 하나만 사용)
+    # 예: [{"url": "http://gpu1:11434", "weight": 2}, {"url": "http://gpu2:11434", "models": ["gemma3"]}]
+    OLLAMA_BACKENDS: list[OllamaBackend] = []
+    OLLAMA_BALANCER: str = "least_outstanding"  # "least_outstanding" 또는 "ewma"(지연 시간 가중)
+    OLLAMA_STICKY_ROUTING: bool = True  # 같은 대화는 같은 서버로 보내 KV 캐시 재사용
+    OLLAMA_STICKY_MAX_ENTRIES: int = 10000
+    OLLAMA_HEALTH_CHECK_INTERVAL: float = 10.0  # 능동 헬스체크 주기(초), 0이면 비활성화
+    OLLAMA_HEALTH_CHECK_TIMEOUT: float = 2.0
+    OLLAMA_EJECT_AFTER_FAILURES: int = 3  # 연속 실패 횟수가 이만큼 되면 일시적으로 제외
+    OLLAMA_EJECT_SECONDS: float = 30.0
+
+    # Model Warm-up Configuration
+    OLLAMA_KEEP_ALIVE: str | None = "30m"  # 요청 후 모델을 메모리에 유지할 시간 ("-1"이면 계속 유지, 비우면 Ollama 기본값)
+    OLLAMA_WARMUP_ENABLED: bool = True  # 서버 시작 시 모델 예열
+    OLLAMA_WARMUP_MODELS: list[str] = []  # 비어 있으면 MODEL_NAME만 예열
+    OLLAMA_WARMUP_TIMEOUT: float = 120.0
+    OLLAMA_KEEPER_ENABLED: bool = True  # 업무 시간 동안 모델이 내려가지 않도록 주기적으로 다시 로드
+    OLLAMA_KEEPER_INTERVAL: float = 600.0  # OLLAMA_KEEP_ALIVE보다 짧게 설정
+    OLLAMA_KEEPER_START_HOUR: int = 9
+    OLLAMA_KEEPER_END_HOUR: int = 18
+    OLLAMA_KEEPER_WEEKDAYS_ONLY: bool = True
+
+    # Conversation Configuration (conversation_id로 이어지는 서버 측 대화 기록)
+    CONVERSATION_CONTEXT_TOKENS: int = 2048  # 프롬프트에 넣을 이전 대화(요약 포함)의 최대 토큰 수(추정치)
+    CONVERSATION_CACHE_MAX_ENTRIES: int = 1000  # 메모리에 유지할 최근 대화 수
+    CONVERSATION_LOAD_MAX_MESSAGES: int = 200  # 캐시에 없는 대화를 DB에서 불러올 때 읽을 최근 메시지 수
+    CONVERSATION_SUMMARY_ENABLED: bool = True  # 프롬프트에서 잘려 나간 이전 대화를 LLM으로 요약해 유지
+    CONVERSATION_SUMMARY_TRIGGER_TOKENS: int = 1024  # 잘려 나간 대화가 이만큼 쌓이면 요약 (요약을 끄면 바로 버림)
+
+    # LLM Execution Configuration
+    LLM_SYNC_FALLBACK: bool = False  # 동기 백엔드용 스레드 풀 폴백 사용 여부
+    LLM_SYNC_MAX_WORKERS: int = 4
+
+    # LLM Scheduler Configuration (Ollama로 보내는 생성 요청의 동시 실행/대기열 제한)
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_QUEUE_MAX_SIZE: int = 64  # 전체 대기열 한도, 초과 시 503
+    LLM_QUEUE_MAX_PER_USER: int = 8  # 사용자별 대기 한도, 초과 시 429
+    LLM_QUEUE_TIMEOUT: float = 30.0  # 슬롯을 기다리는 최대 시간(초), 초과 시 503
+
+    # LLM Client Pool Configuration
+    LLM_POOL_MAX_CONNECTIONS: int = 20
+    LLM_POOL_MAX_KEEPALIVE: int = 10
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0  # 유휴 keep-alive 연결 유지 시간(초)
+    LLM_CLIENT_IDLE_TIMEOUT: float = 600.0  # 사용되지 않는 클라이언트를 닫기까지의 시간(초)
+
+    # Response Cache Configuration
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    RESPONSE_CACHE_REPLAY_CHUNK_CHARS: int = 32  # 캐시 히트 스트리밍 재생 시 청크 크기
+
+    # Semantic Cache Configuration
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_EMBEDDER: str = "ollama"  # "ollama" 또는 "hashing"(테스트/로컬용)
+    SEMANTIC_CACHE_EMBEDDING_MODEL: str = "nomic-embed-text"
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # 코사인 유사도 임계값
+    SEMANTIC_CACHE_CAPACITY: int = 10000
+    SEMANTIC_CACHE_SNAPSHOT_PATH: str | None = None  # 설정 시 종료 시 저장, 시작 시 복원
+
+    # Request Coalescing Configuration
+    SINGLEFLIGHT_ENABLED: bool = True  # 동일한 동시 스트리밍 요청을 하나의 생성으로 합침
+    SINGLEFLIGHT_QUEUE_SIZE: int = 64  # 구독자별 청크 큐 크기
+
+    # Streaming Configuration (요청에서 coalesce_ms/coalesce_bytes를 지정하지 않았을 때의 기본값)
+    SSE_COALESCE_MS: int = 0
+    SSE_COALESCE_BYTES: int = 0
+
+    # WebSocket Configuration (/chat/ws 연결 하나에서 여러 턴을 스트리밍)
+    WS_SEND_QUEUE_SIZE: int = 32  # 연결별로 전송을 기다릴 수 있는 최대 프레임 수, 가득 차면 생성을 멈추고 클라이언트가 읽을 때까지 대기
+    WS_SEND_TIMEOUT: float = 30.0  # 프레임 하나의 전송이 이 시간(초)보다 오래 막히면 읽지 않는 클라이언트로 보고 연결 종료
+    WS_MAX_TURNS_PER_CONNECTION: int = 4  # 연결 하나에서 동시에 진행할 수 있는 최대 턴 수
+
+    # Batch Configuration
+    BATCH_MAX_ITEMS: int = 100
+    BATCH_MAX_CONCURRENCY: int = 4  # 배치 요청 하나가 동시에 실행할 수 있는 최대 생성 수
+
+    # Tracing Configuration
+    SERVER_TIMING_ENABLED: bool = True  # 요청별 구간 시간을 Server-Timing 헤더(스트리밍은 마지막 timing 이벤트)로 전송
+    PROFILING_ENABLED: bool = False  # "X-Profile: 1" 헤더가 있는 요청을 cProfile로 기록 (운영 환경에서는 필요할 때만 켬)
+    PROFILING_SAMPLE_RATE: float = 0.0  # 헤더 없이도 이 비율의 요청을 기록
+    PROFILING_DIR: str = "profiles"  # .prof 파일 저장 위치 (python -m pstats 또는 snakeviz로 확인)
+
+    # Employee Directory Configuration (직원 검색 메모리 인덱스)
+    EMPLOYEE_DIRECTORY_ENABLED: bool = True
+    EMPLOYEE_DIRECTORY_CSV: str | None = None  # 설정 시 CSV(id,name,position,department)에서 로드, 비우면 SQLite employees 테이블
+    EMPLOYEE_DIRECTORY_REFRESH_INTERVAL: float = 30.0  # 바뀐 직원을 인덱스에 반영하는 주기(초)
+    EMPLOYEE_DIRECTORY_REBUILD_THRESHOLD: int = 5000  # 한 번에 바뀐 직원이 이보다 많으면 전체 재색인
+    EMPLOYEE_SEARCH_MAX_LIMIT: int = 100  # 검색 한 페이지의 최대 결과 수
+
+    # Metrics Configuration
+    METRICS_ENABLED: bool = True  # /metrics (Prometheus 텍스트 형식, 인증 없음) 노출과 HTTP 요청 지표 수집
     
     # Server Configuration
     HOST: str = "0.0.0.0"
@@ -24,4 +152,4 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-__all__ = ['settings']
+__all__ = ['settings', 'OllamaBackend']
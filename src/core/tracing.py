@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+class RequestTrace:
+    """요청 하나의 구간별 소요 시간 (같은 이름의 구간은 합산)"""
+
+    __slots__ = ("started", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # 이름 -> 누적 시간(초), 처음 기록된 순서 유지
+        self.spans: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """구간별 시간(ms)과 지금까지의 전체 시간(total)"""
+        result = {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+        result["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        return result
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={duration}" for name, duration in self.as_dict().items())
+
+# 현재 요청의 추적 정보 (미들웨어가 설정, 스트리밍 응답과 워커 스레드에도 컨텍스트로 전달됨)
+_current: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+
+def start_trace() -> RequestTrace:
+    trace = RequestTrace()
+    _current.set(trace)
+    return trace
+
+def current_trace() -> RequestTrace | None:
+    return _current.get()
+
+def record(name: str, seconds: float):
+    """이미 측정한 시간을 현재 요청의 구간으로 기록 (추적 중이 아니면 무시)"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+@contextmanager
+def span(name: str):
+    """with 블록의 실행 시간을 현재 요청의 구간으로 기록"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+__all__ = ['RequestTrace', 'start_trace', 'current_trace', 'record', 'span']
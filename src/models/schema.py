@@ -1,14 +1,77 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class ChatRequest(BaseModel):
     message: str
     system_prompt: Optional[str] = None
     stream: bool = False
+    bypass_cache: bool = Field(False, description="응답 캐시를 사용하지 않고 항상 새로 생성")
+    coalesce_ms: Optional[int] = Field(None, ge=0, description="스트리밍 시 토큰을 모아 보낼 최대 시간(ms), 0이면 토큰마다 전송")
+    coalesce_bytes: Optional[int] = Field(None, ge=0, description="스트리밍 시 모아 둔 토큰이 이 크기(bytes) 이상이면 전송")
+    conversation_id: Optional[str] = Field(
+        None, min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$",
+        description="대화 ID (클라이언트가 정함). 지정하면 서버에 저장된 이전 대화를 이어서 응답하고 이번 턴을 기록"
+    )
 
 class ChatResponse(BaseModel):
     response: str = Field(..., description="The generated response text")
+    conversation_id: Optional[str] = None
 
 class StreamResponse(BaseModel):
     text: str
     done: bool
+
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest] = Field(..., min_length=1, description="처리할 채팅 요청 목록 (각 항목의 stream, conversation_id 값은 무시)")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="동시에 처리할 최대 요청 수 (서버 상한 이내)")
+    stream: bool = Field(False, description="완료되는 순서대로 결과를 NDJSON으로 전송")
+
+class BatchChatItemResult(BaseModel):
+    index: int = Field(..., description="요청 목록에서의 위치")
+    response: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItemResult]
+
+class ConversationMessage(BaseModel):
+    role: str
+    content: str
+    created_at: str
+
+class ConversationResponse(BaseModel):
+    conversation_id: str
+    summary: Optional[str] = Field(None, description="프롬프트에서 밀려난 이전 대화의 요약")
+    messages: List[ConversationMessage]
+
+class LoginRequest(BaseModel):
+    username: str
+    password: str
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: int = Field(..., description="토큰 만료 시각 (Unix 초)")
+
+class UserCreateRequest(BaseModel):
+    username: str = Field(..., min_length=1)
+    password: str = Field(..., min_length=1)
+
+class UserResponse(BaseModel):
+    id: int
+    username: str
+
+class SessionUserResponse(UserResponse):
+    expires_at: int = Field(..., description="현재 토큰의 만료 시각 (Unix 초)")
+
+class Employee(BaseModel):
+    id: int
+    name: str
+    position: str
+    department: str
+
+class EmployeeSearchResponse(BaseModel):
+    results: List[Employee]
+    offset: int
+    limit: int
+    has_more: bool = Field(..., description="다음 페이지(offset + limit)에 결과가 더 있는지 여부")
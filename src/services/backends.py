@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Hashable
+from ..core.settings import settings, OllamaBackend
+from ..core.exceptions import LLMServiceError
+
+logger = logging.getLogger(__name__)
+
+class Backend:
+    """Ollama 서버 하나의 상태"""
+
+    def __init__(self, url: str, weight: float = 1.0, models: list[str] | None = None):
+        self.url = url.rstrip("/")
+        self.weight = weight
+        self.models = set(models) if models else None
+        self.outstanding = 0
+        # 응답 지연(스트리밍은 첫 토큰까지)의 지수 이동 평균, 측정 전에는 0
+        self.latency_ewma = 0.0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+    def serves(self, model: str) -> bool:
+        return self.models is None or model in self.models
+
+    def available(self, now: float) -> bool:
+        return self.healthy and self.ejected_until <= now
+
+class BackendPool:
+    """여러 Ollama 서버 사이의 부하 분산
+
+    모델을 처리할 수 있고 정상인 서버 중 진행 중인 요청 수(least_outstanding) 또는 지연 시간
+    EWMA x (진행 중 요청 + 1)(ewma)를 가중치로 나눈 값이 가장 작은 서버를 고른다. 같은 대화 키는
+    가능한 한 같은 서버로 보내 Ollama의 KV 캐시를 재사용한다. 연속으로 실패한 서버는 일정 시간
+    제외(passive ejection)하고, 주기적인 /api/tags 요청으로 서버 상태를 확인한다(active probing).
+    정상인 서버가 하나도 없으면 제외된 서버까지 포함해 시도한다.
+    """
+
+    def __init__(
+        self,
+        backends: list[Backend],
+        strategy: str,
+        sticky: bool,
+        sticky_max_entries: int,
+        eject_after_failures: int,
+        eject_seconds: float,
+        probe_interval: float,
+        probe_timeout: float,
+    ):
+        self.backends = backends
+        self.strategy = strategy
+        self.sticky = sticky
+        self.sticky_max_entries = sticky_max_entries
+        self.eject_after_failures = eject_after_failures
+        self.eject_seconds = eject_seconds
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        # 대화 키 -> 서버 URL (LRU)
+        self._affinity: OrderedDict[Hashable, str] = OrderedDict()
+        self._prober: asyncio.Task | None = None
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    def _score(self, backend: Backend) -> tuple[float, float]:
+        load = (backend.outstanding + 1) / backend.weight
+        if self.strategy == "ewma":
+            # 아직 지연을 측정하지 않은 서버(0)를 먼저 시도하고, 같으면 진행 중 요청 수로 비교
+            return backend.latency_ewma * load, load
+        return load, backend.latency_ewma
+
+    def pick(self, model: str, sticky_key: Hashable = None) -> Backend:
+        now = time.monotonic()
+        capable = [b for b in self.backends if b.serves(model)]
+        if not capable:
+            raise LLMServiceError(f"No Ollama backend is configured for model '{model}'")
+        candidates = [b for b in capable if b.available(now)] or capable
+
+        if self.sticky and sticky_key is not None:
+            url = self._affinity.get(sticky_key)
+            if url is not None:
+                for backend in candidates:
+                    if backend.url == url:
+                        self._affinity.move_to_end(sticky_key)
+                        return backend
+            backend = min(candidates, key=self._score)
+            self._affinity[sticky_key] = backend.url
+            self._affinity.move_to_end(sticky_key)
+            if len(self._affinity) > self.sticky_max_entries:
+                self._affinity.popitem(last=False)
+            return backend
+
+        return min(candidates, key=self._score)
+
+    def acquire(self, model: str, sticky_key: Hashable = None) -> Backend:
+        """서버를 골라 진행 중 요청으로 등록 (끝나면 release 호출)"""
+        backend = self.pick(model, sticky_key)
+        backend.outstanding += 1
+        backend.requests += 1
+        return backend
+
+    def release(self, backend: Backend, latency: float | None = None, failed: bool = False):
+        backend.outstanding -= 1
+        if failed:
+            self.record_failure(backend)
+            return
+        backend.consecutive_failures = 0
+        if latency is not None:
+            if backend.latency_ewma:
+                backend.latency_ewma += 0.3 * (latency - backend.latency_ewma)
+            else:
+                backend.latency_ewma = latency
+
+    def record_failure(self, backend: Backend):
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.eject_after_failures:
+            backend.ejected_until = time.monotonic() + self.eject_seconds
+            backend.consecutive_failures = 0
+            backend.ejections += 1
+            logger.warning("Ejected Ollama backend %s for %.0fs", backend.url, self.eject_seconds)
+
+    async def probe_once(self):
+        """모든 서버에 /api/tags를 요청해 상태 갱신"""
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.probe_timeout) as client:
+            async def probe(backend: Backend):
+                try:
+                    response = await client.get(f"{backend.url}/api/tags")
+                    response.raise_for_status()
+                except Exception as e:
+                    if backend.healthy:
+                        logger.warning("Ollama backend %s failed health check: %s", backend.url, e)
+                    backend.healthy = False
+                else:
+                    backend.healthy = True
+
+            await asyncio.gather(*(probe(backend) for backend in self.backends))
+
+    async def _probe_forever(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.probe_interval)
+
+    def start(self):
+        """헬스체크 태스크 시작 (lifespan에서 호출, 서버가 여러 대일 때만 실행)"""
+        if self._prober is None and self.probe_interval > 0 and len(self.backends) > 1:
+            self._prober = asyncio.create_task(self._probe_forever())
+
+    async def stop(self):
+        if self._prober is not None:
+            self._prober.cancel()
+            try:
+                await self._prober
+            except asyncio.CancelledError:
+                pass
+            self._prober = None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "sticky_entries": len(self._affinity),
+            "backends": [
+                {
+                    "url": b.url,
+                    "weight": b.weight,
+                    "healthy": b.healthy,
+                    "ejected": b.ejected_until > now,
+                    "outstanding": b.outstanding,
+                    "latency_ewma_seconds": round(b.latency_ewma, 4),
+                    "requests": b.requests,
+                    "failures": b.failures,
+                    "ejections": b.ejections,
+                }
+                for b in self.backends
+            ],
+        }
+
+def _configured_backends() -> list[Backend]:
+    configs = settings.OLLAMA_BACKENDS or [OllamaBackend(url=settings.OLLAMA_BASE_URL)]
+    return [Backend(config.url, config.weight, config.models) for config in configs]
+
+backend_pool = BackendPool(
+    _configured_backends(),
+    strategy=settings.OLLAMA_BALANCER,
+    sticky=settings.OLLAMA_STICKY_ROUTING,
+    sticky_max_entries=settings.OLLAMA_STICKY_MAX_ENTRIES,
+    eject_after_failures=settings.OLLAMA_EJECT_AFTER_FAILURES,
+    eject_seconds=settings.OLLAMA_EJECT_SECONDS,
+    probe_interval=settings.OLLAMA_HEALTH_CHECK_INTERVAL,
+    probe_timeout=settings.OLLAMA_HEALTH_CHECK_TIMEOUT,
+)
+
+__all__ = ['Backend', 'BackendPool', 'backend_pool']
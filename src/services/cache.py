@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from ..core.settings import settings
+
+def normalize_prompt(text: str | None) -> str:
+    """캐시 키 비교를 위해 앞뒤 공백 제거 및 연속 공백을 하나로 정규화"""
+    return " ".join(text.split()) if text else ""
+
+class ResponseCache:
+    """LLM 응답 완전 일치 캐시 (LRU + TTL, 메모리 예산 제한)"""
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (응답 텍스트, 만료 시각, 크기)
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str | None, message: str, params: dict | None = None) -> str:
+        raw = json.dumps(
+            [model, normalize_prompt(system_prompt), message, params or {}],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            text, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def set(self, key: str, text: str):
+        size = len(key) + len(text.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (text, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            # 예산을 초과하면 가장 오래 사용되지 않은 항목부터 제거
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+__all__ = ['ResponseCache', 'response_cache', 'normalize_prompt']
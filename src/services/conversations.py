@@ -0,0 +1,259 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from ..core.settings import settings
+from ..core.database import get_db
+from ..core.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "너는 대화 기록을 요약하는 도우미다. 이전 요약과 이어지는 대화를 합쳐, 이후 대화에 필요한 "
+    "사실, 사용자의 요청과 선호, 결정된 내용을 빠짐없이 담은 간결한 한국어 요약을 작성하라."
+)
+
+class Turn:
+    """저장된 메시지 하나 (토큰 수와 LangChain 메시지 객체를 캐시)"""
+
+    __slots__ = ("id", "role", "content", "tokens", "_message")
+
+    def __init__(self, id: int, role: str, content: str, tokens: int):
+        self.id = id
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+        self._message = None
+
+    @property
+    def message(self):
+        if self._message is None:
+            from langchain_core.messages import AIMessage, HumanMessage
+
+            cls = HumanMessage if self.role == "user" else AIMessage
+            self._message = cls(content=self.content)
+        return self._message
+
+class Conversation:
+    """메모리에 올라온 대화 (요약되지 않은 최근 메시지와 이전 대화 요약)"""
+
+    def __init__(self, user_id: int, conversation_id: str, turns: list[Turn], summary: str | None, summary_upto: int):
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.turns = turns
+        self.summary = summary
+        self.summary_tokens = estimate_tokens(summary) if summary else 0
+        self.summary_upto = summary_upto
+        self._summary_message = None
+        self.summarizing = False
+
+    @property
+    def summary_message(self):
+        if self._summary_message is None and self.summary:
+            from langchain_core.messages import SystemMessage
+
+            self._summary_message = SystemMessage(content=f"이전 대화 요약:\n{self.summary}")
+        return self._summary_message
+
+    def set_summary(self, summary: str, upto: int):
+        self.summary = summary
+        self.summary_tokens = estimate_tokens(summary)
+        self.summary_upto = upto
+        self._summary_message = None
+        self.turns = [turn for turn in self.turns if turn.id > upto]
+
+    def window_start(self, budget: int) -> int:
+        """budget 토큰 안에 들어가는 최근 메시지의 시작 위치 (뒤에서부터 누적)"""
+        used = self.summary_tokens
+        start = len(self.turns)
+        while start > 0 and used + self.turns[start - 1].tokens <= budget:
+            start -= 1
+            used += self.turns[start].tokens
+        return start
+
+class ConversationStore:
+    """conversation_id별 대화 기록 저장소 (SQLite + 최근 대화 메모리 캐시)
+
+    메시지는 추가될 때 토큰 수를 한 번만 추정해 저장하고, 프롬프트는 최근 메시지부터 토큰 예산
+    (context_tokens)만큼만 거꾸로 모아 만든다. 예산 밖으로 밀려난 메시지가 summary_trigger_tokens
+    이상 쌓이면 백그라운드에서 이전 요약과 합쳐 다시 요약하고 메모리에서 내려놓으므로, 대화가
+    길어져도 프롬프트 구성 비용과 업스트림 프롬프트 크기가 일정하게 유지된다. 전체 기록은 DB에 남는다.
+    메모리 캐시는 이벤트 루프 스레드에서만 접근한다.
+    """
+
+    def __init__(self, max_entries: int, context_tokens: int, load_max_messages: int,
+                 summary_enabled: bool, summary_trigger_tokens: int):
+        self.max_entries = max_entries
+        self.context_tokens = context_tokens
+        self.load_max_messages = load_max_messages
+        self.summary_enabled = summary_enabled
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self._entries: OrderedDict[tuple[int, str], Conversation] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.turns_trimmed = 0
+        self.summaries = 0
+        self.summary_errors = 0
+        self.contexts_built = 0
+        self.context_tokens_total = 0
+
+    def _load(self, user_id: int, conversation_id: str) -> Conversation:
+        conn = get_db()
+        row = conn.execute('SELECT summary, summary_upto FROM conversations WHERE user_id = ? AND id = ?',
+                           (user_id, conversation_id)).fetchone()
+        summary, summary_upto = (row['summary'], row['summary_upto']) if row else (None, 0)
+        rows = conn.execute('''
+            SELECT id, role, content, tokens FROM conversation_messages
+            WHERE user_id = ? AND conversation_id = ? AND id > ?
+            ORDER BY id DESC LIMIT ?
+        ''', (user_id, conversation_id, summary_upto, self.load_max_messages)).fetchall()
+        turns = [Turn(r['id'], r['role'], r['content'], r['tokens']) for r in reversed(rows)]
+        return Conversation(user_id, conversation_id, turns, summary, summary_upto)
+
+    def _insert(self, user_id: int, conversation_id: str, messages: list[tuple[str, str, int]]) -> list[int]:
+        with get_db() as conn:
+            conn.execute('''
+                INSERT INTO conversations (user_id, id) VALUES (?, ?)
+                ON CONFLICT (user_id, id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+            ''', (user_id, conversation_id))
+            return [
+                conn.execute('''
+                    INSERT INTO conversation_messages (user_id, conversation_id, role, content, tokens)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (user_id, conversation_id, role, content, tokens)).lastrowid
+                for role, content, tokens in messages
+            ]
+
+    def _save_summary(self, user_id: int, conversation_id: str, summary: str, upto: int):
+        with get_db() as conn:
+            conn.execute('UPDATE conversations SET summary = ?, summary_upto = ? WHERE user_id = ? AND id = ?',
+                         (summary, upto, user_id, conversation_id))
+
+    def _delete(self, user_id: int, conversation_id: str) -> bool:
+        with get_db() as conn:
+            conn.execute('DELETE FROM conversation_messages WHERE user_id = ? AND conversation_id = ?',
+                         (user_id, conversation_id))
+            return conn.execute('DELETE FROM conversations WHERE user_id = ? AND id = ?',
+                                (user_id, conversation_id)).rowcount > 0
+
+    def history(self, user_id: int, conversation_id: str, limit: int) -> dict | None:
+        """DB에 저장된 대화 기록 (블로킹, 워커 스레드에서 실행)"""
+        conn = get_db()
+        row = conn.execute('SELECT summary FROM conversations WHERE user_id = ? AND id = ?',
+                           (user_id, conversation_id)).fetchone()
+        if row is None:
+            return None
+        rows = conn.execute('''
+            SELECT role, content, created_at FROM conversation_messages
+            WHERE user_id = ? AND conversation_id = ?
+            ORDER BY id DESC LIMIT ?
+        ''', (user_id, conversation_id, limit)).fetchall()
+        return {"summary": row['summary'], "messages": [dict(r) for r in reversed(rows)]}
+
+    async def load(self, user_id: int, conversation_id: str) -> Conversation:
+        """대화를 메모리 캐시에서 찾고, 없으면 DB에서 요약 이후의 최근 메시지만 불러옴"""
+        key = (user_id, conversation_id)
+        conversation = self._entries.get(key)
+        if conversation is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return conversation
+
+        self.misses += 1
+        loaded = await asyncio.to_thread(self._load, user_id, conversation_id)
+        # 불러오는 동안 같은 대화가 먼저 캐시에 올라왔으면 그것을 사용
+        conversation = self._entries.setdefault(key, loaded)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return conversation
+
+    def context(self, conversation: Conversation) -> list:
+        """토큰 예산 안의 이전 대화를 LangChain 메시지 목록으로 구성 (요약 + 최근 메시지)"""
+        start = conversation.window_start(self.context_tokens)
+        messages = [conversation.summary_message] if conversation.summary else []
+        messages.extend(turn.message for turn in conversation.turns[start:])
+        self.contexts_built += 1
+        self.context_tokens_total += conversation.summary_tokens + sum(t.tokens for t in conversation.turns[start:])
+        return messages
+
+    async def append(self, conversation: Conversation, message: str, response: str):
+        """완료된 한 턴(사용자 메시지와 응답)을 저장하고 예산 밖으로 밀려난 메시지를 정리"""
+        messages = [("user", message, estimate_tokens(message)), ("assistant", response, estimate_tokens(response))]
+        ids = await asyncio.to_thread(self._insert, conversation.user_id, conversation.conversation_id, messages)
+        conversation.turns.extend(Turn(id, role, content, tokens) for id, (role, content, tokens) in zip(ids, messages))
+        self._trim(conversation)
+
+    def _trim(self, conversation: Conversation):
+        start = conversation.window_start(self.context_tokens)
+        if start == 0 or conversation.summarizing:
+            return
+        dropped = conversation.turns[:start]
+        if not self.summary_enabled:
+            conversation.turns = conversation.turns[start:]
+            self.turns_trimmed += len(dropped)
+            return
+        if sum(turn.tokens for turn in dropped) >= self.summary_trigger_tokens:
+            conversation.summarizing = True
+            task = asyncio.create_task(self._summarize(conversation, dropped))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, conversation: Conversation, dropped: list[Turn]):
+        from .llm import generate_response
+        from .scheduler import PRIORITY_BATCH
+
+        lines = [f"이전 요약:\n{conversation.summary}\n"] if conversation.summary else []
+        lines.extend(f"{'사용자' if turn.role == 'user' else '어시스턴트'}: {turn.content}" for turn in dropped)
+        upto = dropped[-1].id
+        try:
+            summary = await generate_response(
+                "\n".join(lines),
+                SUMMARY_SYSTEM_PROMPT,
+                use_cache=False,
+                user=conversation.user_id,
+                priority=PRIORITY_BATCH
+            )
+            await asyncio.to_thread(self._save_summary, conversation.user_id, conversation.conversation_id, summary, upto)
+            conversation.set_summary(summary, upto)
+            self.summaries += 1
+        except Exception as e:
+            # 요약에 실패하면 밀려난 메시지를 버려 메모리와 프롬프트 크기를 유지 (DB 기록은 남음)
+            logger.warning("Conversation summary failed: %s", e)
+            self.summary_errors += 1
+            conversation.turns = [turn for turn in conversation.turns if turn.id > upto]
+        finally:
+            self.turns_trimmed += len(dropped)
+            conversation.summarizing = False
+
+    async def delete(self, user_id: int, conversation_id: str) -> bool:
+        self._entries.pop((user_id, conversation_id), None)
+        return await asyncio.to_thread(self._delete, user_id, conversation_id)
+
+    async def stop(self):
+        """진행 중인 요약 작업 취소 (lifespan 종료 시 호출)"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "turns_trimmed": self.turns_trimmed,
+            "summaries": self.summaries,
+            "summary_errors": self.summary_errors,
+            "summarizing": len(self._tasks),
+            "avg_context_tokens": round(self.context_tokens_total / self.contexts_built, 1) if self.contexts_built else 0.0,
+        }
+
+conversation_store = ConversationStore(
+    max_entries=settings.CONVERSATION_CACHE_MAX_ENTRIES,
+    context_tokens=settings.CONVERSATION_CONTEXT_TOKENS,
+    load_max_messages=settings.CONVERSATION_LOAD_MAX_MESSAGES,
+    summary_enabled=settings.CONVERSATION_SUMMARY_ENABLED,
+    summary_trigger_tokens=settings.CONVERSATION_SUMMARY_TRIGGER_TOKENS,
+)
+
+__all__ = ['ConversationStore', 'Conversation', 'conversation_store']
@@ -0,0 +1,527 @@
+import argparse
+import asyncio
+import bisect
+import csv
+import heapq
+import logging
+import os
+import time
+import unicodedata
+from itertools import chain
+from pathlib import Path
+from ..core.settings import settings
+from ..core.database import get_db
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("name", "position")
+
+# 한글 음절 -> 자모 (겹모음/겹받침은 낱자로 풀어 입력 중인 글자와도 접두 일치하도록)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ",
+              "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ",
+              "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ",
+    "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ",
+    "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+
+# 정렬 키에서 음절 끝 표시 (어떤 글자보다 앞에 정렬되어 "가나"가 "각"보다 앞에 오는 가나다순이 됨)
+_SYLLABLE_END = "\x00"
+
+def _translation_tables() -> tuple[dict[int, str], dict[int, str], dict[int, str]]:
+    jamo, keys, initials = {}, {}, {}
+    for code in range(0xAC00, 0xD7A4):
+        offset = code - 0xAC00
+        jamo[code] = _CHOSEONG[offset // 588] + _JUNGSEONG[offset % 588 // 28] + _JONGSEONG[offset % 28]
+        keys[code] = jamo[code] + _SYLLABLE_END
+        initials[code] = _CHOSEONG[offset // 588]
+    for char, parts in _COMPOUND_JAMO.items():
+        jamo[ord(char)] = keys[ord(char)] = parts
+    return jamo, keys, initials
+
+_JAMO_TABLE, _KEY_TABLE, _INITIALS_TABLE = _translation_tables()
+# 완성되지 않은 낱자 (한글 호환 자모)
+_LONE_JAMO = "".join(chr(code) for code in range(0x3131, 0x3164))
+_CHOSEONG_SET = frozenset(_CHOSEONG)
+
+def normalize(text: str) -> str:
+    """비교용 정규화 (NFC, 대소문자 무시, 연속 공백은 하나로)"""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+def to_jamo(text: str) -> str:
+    return text.translate(_JAMO_TABLE)
+
+def to_key(text: str) -> str:
+    """접두 검색용 정렬 키 (음절마다 자모 뒤에 음절 끝 표시를 붙임)"""
+    return text.translate(_KEY_TABLE)
+
+def _syllable_jamo(char: str) -> tuple[str, str, str] | None:
+    """한글 음절의 (초성, 중성, 종성) 자모, 음절이 아니면 None"""
+    offset = ord(char) - 0xAC00
+    if not 0 <= offset < 11172:
+        return None
+    return _CHOSEONG[offset // 588], _JUNGSEONG[offset % 588 // 28], _JONGSEONG[offset % 28]
+
+def _key_prefixes(compact: str) -> list[str]:
+    """입력 중인 검색어와 자모 단위로 접두 일치하는 키의 접두 (서로 겹치지 않음)
+
+    마지막 글자의 받침은 다음 글자의 초성일 수 있고("김" -> "기민"), 끝의 낱자는 앞 글자의 받침일 수 있다
+    ("기ㅁ" -> "김"). 첫 번째 접두가 검색어 자체의 키를 포함한다.
+    """
+    head, last = compact[:-1], compact[-1]
+    jamo = _syllable_jamo(last)
+    if jamo is not None:
+        choseong, jungseong, jongseong = jamo
+        base = to_key(head) + choseong + jungseong
+        if not jongseong:
+            return [base]
+        return [base + jongseong, base + jongseong[:-1] + _SYLLABLE_END + jongseong[-1]]
+    prefixes = [to_key(compact)]
+    if last in _LONE_JAMO and head and (jamo := _syllable_jamo(head[-1])) is not None:
+        prefixes.append(to_key(head[:-1]) + "".join(jamo) + to_key(last))
+    return prefixes
+
+def to_initials(text: str) -> str:
+    """한글 음절을 초성으로 바꾼 문자열 ("김진우" -> "ㄱㅈㅇ")"""
+    return text.translate(_INITIALS_TABLE)
+
+def read_csv(path) -> dict[int, dict]:
+    """CSV(id,name,position,department 헤더)의 직원 행 (id 열이 없으면 줄 번호를 ID로 사용)"""
+    rows = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for line, row in enumerate(csv.DictReader(f), start=1):
+            employee_id = int(row.get("id") or line)
+            rows[employee_id] = {
+                "id": employee_id,
+                "name": (row.get("name") or "").strip(),
+                "position": (row.get("position") or "").strip(),
+                "department": (row.get("department") or "").strip(),
+            }
+    return rows
+
+def _prefix_range(keys: list[tuple[str, int, str]], prefix: str):
+    """정렬된 (키, 단어 위치, 값) 목록에서 키가 prefix로 시작하는 항목의 값을 키 순서대로"""
+    i = bisect.bisect_left(keys, (prefix,))
+    while i < len(keys) and keys[i][0].startswith(prefix):
+        yield keys[i][2]
+        i += 1
+
+def _prefix_bounds(entries: list[tuple], prefix: str) -> tuple[int, int]:
+    """첫 항목(키) 순으로 정렬된 목록에서 키가 prefix로 시작하는 구간 [lo, hi)"""
+    lo = bisect.bisect_left(entries, (prefix,))
+    return lo, bisect.bisect_left(entries, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), lo)
+
+def _prefix_ranges(entries: list[tuple], prefixes: list[str], exclude: str | None) -> list[tuple[int, int]]:
+    """키가 prefixes 중 하나로 시작하고 exclude로는 시작하지 않는 구간들 (위치 순)"""
+    ranges = []
+    for prefix in prefixes:
+        if exclude is not None and prefix.startswith(exclude):
+            continue
+        lo, hi = _prefix_bounds(entries, prefix)
+        if exclude is not None and exclude.startswith(prefix):
+            excluded_lo, excluded_hi = _prefix_bounds(entries, exclude)
+            ranges += [(lo, excluded_lo), (excluded_hi, hi)]
+        else:
+            ranges.append((lo, hi))
+    return sorted((lo, hi) for lo, hi in ranges if lo < hi)
+
+class FieldIndex:
+    """필드 하나(이름 또는 직책)의 검색 인덱스
+
+    같은 값을 가진 직원은 하나로 묶어 색인한다. 각 단어 시작부터의 문자열을 음절 끝 표시를 넣은 자모 키로
+    정렬해 두되 값 길이별로 나눠 두어, 접두 일치를 글자 단위 접두(완전 일치 포함) -> 자모 단위 접두 순으로,
+    같은 단계 안에서는 짧은 값 -> 가나다순으로 필요한 만큼만 읽는다. 초성 문자열도 같은 방식으로 정렬해
+    둔다. 부분 일치는 공백을 뺀 값의 1/2글자 n-gram 역색인(값 순으로 정렬된 목록) 중 가장 짧은 목록을
+    순서대로 훑으며 확인하므로, 한 페이지를 채우면 더 읽지 않는다 (깊은 페이지는 offset에 비례해 느려짐).
+    부분 일치에서는 완성된 글자가 그대로 포함되어야 하며, 입력 중인 글자는 끝의 낱자만 자모로 비교한다.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, list[int]] = {}                             # 값 -> 직원 ID (오름차순)
+        self.keys: dict[int, list[tuple[str, str]]] = {}                # 값 길이 -> (값의 키, 값), 정렬 유지
+        self.word_keys: dict[int, list[tuple[str, str, str]]] = {}      # 값 길이 -> (중간 단어부터의 키, 값의 키, 값), 정렬 유지
+        self.initials: list[tuple[str, int, str]] = []                  # (단어 시작부터의 초성 문자열, 단어 위치, 값), 정렬 유지
+        self.grams: dict[str, list[str]] = {}                           # n-gram -> 값 (정렬 유지)
+        self.compact: dict[str, str] = {}                               # 값 -> 정규화하고 공백을 뺀 문자열
+
+    @staticmethod
+    def _entries(value: str) -> tuple[tuple[str, str], list[tuple[str, str, str]], list[tuple[str, int, str]], set[str], str]:
+        """정렬 목록에 넣을 키, 중간 단어 키, 초성 키, n-gram, 공백을 뺀 문자열"""
+        words = normalize(value).split(" ")
+        compact = "".join(words)
+        key = to_key(compact)
+        word_keys = [(to_key("".join(words[i:])), key, value) for i in range(1, len(words))]
+        initials = [(to_initials("".join(words[i:])), i, value) for i in range(len(words))]
+        grams = set(compact) | {compact[i:i + 2] for i in range(len(compact) - 1)}
+        return (key, value), word_keys, initials, grams, compact
+
+    @classmethod
+    def build(cls, pairs) -> "FieldIndex":
+        """(직원 ID, 값) 목록으로 한 번에 생성 (정렬은 마지막에 한 번만)"""
+        index = cls()
+        for employee_id, value in pairs:
+            if ids := index.ids.get(value):
+                ids.append(employee_id)
+                continue
+            key, word_keys, initials, grams, compact = cls._entries(value)
+            if not compact:
+                continue
+            index.ids[value] = [employee_id]
+            index.keys.setdefault(len(compact), []).append(key)
+            if word_keys:
+                index.word_keys.setdefault(len(compact), []).extend(word_keys)
+            index.initials.extend(initials)
+            for gram in grams:
+                index.grams.setdefault(gram, []).append(value)
+            index.compact[value] = compact
+        for sorted_list in (*index.keys.values(), *index.word_keys.values(), index.initials, *index.grams.values()):
+            sorted_list.sort()
+        for ids in index.ids.values():
+            ids.sort()
+        return index
+
+    def add(self, value: str, employee_id: int):
+        if (ids := self.ids.get(value)) is not None:
+            i = bisect.bisect_left(ids, employee_id)
+            if i == len(ids) or ids[i] != employee_id:
+                ids.insert(i, employee_id)
+            return
+        key, word_keys, initials, grams, compact = self._entries(value)
+        if not compact:
+            return
+        self.ids[value] = [employee_id]
+        bisect.insort(self.keys.setdefault(len(compact), []), key)
+        for entry in word_keys:
+            bisect.insort(self.word_keys.setdefault(len(compact), []), entry)
+        for entry in initials:
+            bisect.insort(self.initials, entry)
+        for gram in grams:
+            bisect.insort(self.grams.setdefault(gram, []), value)
+        self.compact[value] = compact
+
+    def remove(self, value: str, employee_id: int):
+        ids = self.ids.get(value)
+        if ids is None:
+            return
+        i = bisect.bisect_left(ids, employee_id)
+        if i < len(ids) and ids[i] == employee_id:
+            del ids[i]
+        if ids:
+            return
+        # 이 값을 가진 직원이 더 없으면 색인에서도 제거
+        del self.ids[value]
+        key, word_keys, initials, grams, compact = self._entries(value)
+        length = len(compact)
+        for sorted_list, entries in ((self.keys.get(length, []), (key,)), (self.word_keys.get(length, []), word_keys),
+                                     (self.initials, initials), *((self.grams.get(gram, []), (value,)) for gram in grams)):
+            for entry in entries:
+                i = bisect.bisect_left(sorted_list, entry)
+                if i < len(sorted_list) and sorted_list[i] == entry:
+                    del sorted_list[i]
+        for buckets, bucket in ((self.keys, length), (self.word_keys, length), *((self.grams, gram) for gram in grams)):
+            if not buckets.get(bucket, True):
+                del buckets[bucket]
+        del self.compact[value]
+
+    def _prefix_matches(self, prefixes: list[str], exclude: str | None = None):
+        """키가 prefixes 중 하나로 시작하고 exclude로는 시작하지 않는 값을 값 길이 -> 키 순서대로 (중복 포함)"""
+        for length in sorted(self.keys.keys() | self.word_keys.keys()):
+            streams = []
+            if keys := self.keys.get(length):
+                ranges = _prefix_ranges(keys, prefixes, exclude)
+                streams.append(keys[i] for lo, hi in ranges for i in range(lo, hi))
+            if word_keys := self.word_keys.get(length):
+                # 중간 단어 일치는 드물므로 구간을 모아 값의 키 순서로 정렬해 합침
+                ranges = _prefix_ranges(word_keys, prefixes, exclude)
+                streams.append(sorted(word_keys[i][1:] for lo, hi in ranges for i in range(lo, hi)))
+            for _, value in heapq.merge(*streams):
+                yield value
+
+    def matches(self, query: str):
+        """일치하는 값을 순위 순서대로 (글자 접두 일치, 자모 접두 일치, 초성 일치, 부분 일치 순, 필요한 만큼만 계산)
+
+        접두 일치에서는 완전 일치가 가장 짧으므로 맨 앞에 오고, 입력 중인 마지막 글자의 받침이 다음 글자의
+        초성인 경우("김" -> "기민")처럼 자모 단위로만 이어지는 값은 글자 단위로 이어지는 값 뒤에 온다.
+        """
+        compact = normalize(query).replace(" ", "")
+        if not compact:
+            return
+        seen = set()
+        query_key = to_key(compact)
+        for value in chain(self._prefix_matches([query_key]), self._prefix_matches(_key_prefixes(compact), query_key)):
+            if value not in seen:
+                seen.add(value)
+                yield value
+
+        if len(compact) > 1 and all(char in _CHOSEONG_SET for char in compact):
+            for value in _prefix_range(self.initials, compact):
+                if value not in seen:
+                    seen.add(value)
+                    yield value
+
+        # 입력 중인 마지막 낱자는 n-gram에 없으므로 완성된 글자만으로 후보를 찾고 낱자는 자모로 확인
+        complete = compact.rstrip(_LONE_JAMO)
+        if not complete:
+            return
+        typing = len(complete) < len(compact)
+        query_jamo = to_jamo(compact)
+        if len(complete) == 1:
+            grams = [complete]
+        else:
+            grams = [complete[i:i + 2] for i in range(len(complete) - 1)]
+        # 검색어를 포함하는 값은 모든 n-gram을 포함하므로 가장 짧은 목록만 훑으며 확인하면 됨
+        rarest = min((self.grams.get(gram, ()) for gram in grams), key=len)
+        for value in rarest:
+            if value in seen or complete not in (text := self.compact[value]):
+                continue
+            if not typing or query_jamo in to_jamo(text):
+                yield value
+
+class EmployeeDirectory:
+    """직원 검색용 메모리 인덱스 (SQLite employees 테이블 또는 CSV에서 로드)
+
+    시작 시 전체를 워커 스레드에서 색인해 교체하고, 이후 refresh_interval마다 바뀐 직원만 반영한다.
+    SQLite는 트리거가 기록하는 employee_changes 로그로, CSV는 파일이 바뀌었을 때 현재 인덱스와
+    비교해 바뀐 행을 찾는다. 바뀐 행이 rebuild_threshold를 넘으면 전체를 다시 색인한다. 인덱스에
+    반영한 로그는 바로 지워 로그가 계속 쌓이지 않게 한다.
+    인덱스는 이벤트 루프 스레드에서만 변경하고 조회하므로 잠금이 필요 없다.
+    """
+
+    # 이벤트 루프를 오래 잡지 않도록 증분 반영 시 이만큼씩 나눠 처리
+    APPLY_BATCH_SIZE = 64
+
+    def __init__(self, csv_path: str | None, refresh_interval: float, rebuild_threshold: int):
+        self.csv_path = Path(csv_path) if csv_path else None
+        self.refresh_interval = refresh_interval
+        self.rebuild_threshold = rebuild_threshold
+        self.employees: dict[int, dict] = {}
+        self.fields = {field: FieldIndex() for field in FIELDS}
+        self.ready = False
+        # SQLite: 마지막으로 반영한 employee_changes.seq, CSV: (mtime_ns, size)
+        self._version = None
+        self._task: asyncio.Task | None = None
+        self.searches = 0
+        self.full_loads = 0
+        self.refreshes = 0
+        self.rows_applied = 0
+        self.changes_pruned = 0
+        self.last_load_seconds = 0.0
+        self.last_refresh_at: float | None = None
+        self.last_error: str | None = None  # 마지막 색인/반영 실패 (성공하면 None)
+
+    # --- 원본 읽기 (워커 스레드) ---
+
+    @staticmethod
+    def _log_version(conn) -> int:
+        """employee_changes에 마지막으로 기록된 seq (AUTOINCREMENT 값이므로 로그를 지워도 줄지 않음)"""
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'employee_changes'").fetchone()
+        return row[0] if row else 0
+
+    def _csv_version(self) -> tuple[int, int]:
+        stat = os.stat(self.csv_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_all(self) -> tuple[dict[int, dict], object]:
+        if self.csv_path is not None:
+            version = self._csv_version()
+            return read_csv(self.csv_path), version
+        conn = get_db()
+        # 버전을 먼저 읽으므로 그 사이의 변경은 다음 증분 반영에서 다시 읽힘 (같은 행을 두 번 반영해도 안전)
+        version = self._log_version(conn)
+        rows = conn.execute('SELECT id, name, position, department FROM employees').fetchall()
+        return {row['id']: dict(row) for row in rows}, version
+
+    def _read_changes(self) -> tuple[dict[int, dict | None] | None, object]:
+        """바뀐 직원 ID -> 현재 행(삭제되었으면 None), 바뀐 행이 너무 많으면 None (전체 재색인)"""
+        if self.csv_path is not None:
+            version = self._csv_version()
+            if version == self._version:
+                return {}, version
+            rows = read_csv(self.csv_path)
+            changes = {employee_id: row for employee_id, row in rows.items() if self.employees.get(employee_id) != row}
+            changes.update({employee_id: None for employee_id in self.employees.keys() - rows.keys()})
+            return changes, version
+
+        conn = get_db()
+        version = self._log_version(conn)
+        if version == self._version:
+            return {}, version
+        # 반영하지 않은 로그가 이미 지워졌으면 (다른 프로세스가 정리) 바뀐 행을 알 수 없으므로 전체 재색인
+        oldest = conn.execute('SELECT MIN(seq) FROM employee_changes').fetchone()[0]
+        if oldest is None or oldest > self._version + 1:
+            return None, version
+        changed_ids = [row[0] for row in conn.execute(
+            'SELECT DISTINCT employee_id FROM employee_changes WHERE seq > ? AND seq <= ?', (self._version, version)
+        )]
+        if len(changed_ids) > self.rebuild_threshold:
+            return None, version
+        changes = dict.fromkeys(changed_ids)
+        for start in range(0, len(changed_ids), 500):
+            chunk = changed_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                f'SELECT id, name, position, department FROM employees WHERE id IN ({placeholders})', chunk
+            ):
+                changes[row['id']] = dict(row)
+        return changes, version
+
+    def _prune_changes(self, version: int) -> int:
+        """인덱스에 반영한 seq까지의 변경 로그 삭제"""
+        conn = get_db()
+        with conn:
+            return conn.execute('DELETE FROM employee_changes WHERE seq <= ?', (version,)).rowcount
+
+    async def _prune_applied(self, version):
+        """SQLite 원본이면 반영한 변경 로그를 워커 스레드에서 삭제"""
+        if self.csv_path is None:
+            self.changes_pruned += await asyncio.to_thread(self._prune_changes, version)
+
+    @staticmethod
+    def _build(rows: dict[int, dict]) -> dict[str, FieldIndex]:
+        ordered = sorted(rows.values(), key=lambda row: row["id"])
+        return {field: FieldIndex.build((row["id"], row[field]) for row in ordered) for field in FIELDS}
+
+    def _load_all(self) -> tuple[dict[int, dict], dict[str, FieldIndex], object]:
+        rows, version = self._read_all()
+        return rows, self._build(rows), version
+
+    # --- 인덱스 갱신 (이벤트 루프) ---
+
+    async def load(self):
+        """전체를 워커 스레드에서 색인한 뒤 한 번에 교체"""
+        started = time.perf_counter()
+        rows, fields, version = await asyncio.to_thread(self._load_all)
+        self.employees, self.fields, self._version = rows, fields, version
+        self.ready = True
+        self.full_loads += 1
+        self.last_load_seconds = time.perf_counter() - started
+        logger.info("Employee directory loaded: %d employees in %.2fs", len(rows), self.last_load_seconds)
+        await self._prune_applied(version)
+
+    def _apply_one(self, employee_id: int, row: dict | None):
+        old = self.employees.get(employee_id)
+        for field in FIELDS:
+            if old is not None and (row is None or old[field] != row[field]):
+                self.fields[field].remove(old[field], employee_id)
+            if row is not None and (old is None or old[field] != row[field]):
+                self.fields[field].add(row[field], employee_id)
+        if row is None:
+            self.employees.pop(employee_id, None)
+        else:
+            self.employees[employee_id] = row
+
+    async def refresh(self):
+        """바뀐 직원만 반영 (처음이거나 바뀐 행이 많으면 전체 재색인)"""
+        if not self.ready:
+            await self.load()
+            return
+        changes, version = await asyncio.to_thread(self._read_changes)
+        if changes is None or len(changes) > self.rebuild_threshold:
+            await self.load()
+            return
+        items = list(changes.items())
+        for start in range(0, len(items), self.APPLY_BATCH_SIZE):
+            for employee_id, row in items[start:start + self.APPLY_BATCH_SIZE]:
+                self._apply_one(employee_id, row)
+            await asyncio.sleep(0)
+        advanced, self._version = version != self._version, version
+        self.refreshes += 1
+        self.rows_applied += len(items)
+        self.last_refresh_at = time.time()
+        if advanced:
+            await self._prune_applied(version)
+
+    def search(self, query: str, field: str = "name", offset: int = 0, limit: int = 20) -> tuple[list[dict], bool]:
+        """순위 순서의 직원 목록에서 offset부터 limit개와 다음 페이지가 있는지 여부"""
+        self.searches += 1
+        index = self.fields[field]
+        results = []
+        skip = offset
+        for value in index.matches(query):
+            ids = index.ids[value]
+            if skip >= len(ids):
+                skip -= len(ids)
+                continue
+            # 다음 페이지 여부를 알기 위해 하나 더 가져옴
+            for employee_id in ids[skip:skip + limit + 1 - len(results)]:
+                results.append(self.employees[employee_id])
+            skip = 0
+            if len(results) > limit:
+                break
+        return results[:limit], len(results) > limit
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("Employee directory refresh failed: %s", e)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """초기 색인과 주기적 증분 반영 태스크 시작 (lifespan에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "source": str(self.csv_path) if self.csv_path else "sqlite",
+            "employees": len(self.employees),
+            "distinct_values": {field: len(index.ids) for field, index in self.fields.items()},
+            "searches": self.searches,
+            "full_loads": self.full_loads,
+            "last_load_seconds": self.last_load_seconds,
+            "refreshes": self.refreshes,
+            "rows_applied": self.rows_applied,
+            "changes_pruned": self.changes_pruned,
+            "last_refresh_at": self.last_refresh_at,
+            "last_error": self.last_error,
+        }
+
+def sync_from_csv(path: str) -> dict:
+    """CSV(id,name,position,department) 내용과 같아지도록 employees 테이블을 갱신 (바뀐 행만 기록됨)"""
+    rows = read_csv(path)
+    conn = get_db()
+    with conn:
+        cursor = conn.executemany('''
+            INSERT INTO employees (id, name, position, department) VALUES (:id, :name, :position, :department)
+            ON CONFLICT(id) DO UPDATE SET name = excluded.name, position = excluded.position, department = excluded.department
+            WHERE name IS NOT excluded.name OR position IS NOT excluded.position OR department IS NOT excluded.department
+        ''', list(rows.values()))
+        upserted = cursor.rowcount
+        existing = [row[0] for row in conn.execute('SELECT id FROM employees')]
+        removed = [(employee_id,) for employee_id in existing if employee_id not in rows]
+        conn.executemany('DELETE FROM employees WHERE id = ?', removed)
+    return {"rows": len(rows), "upserted": upserted, "deleted": len(removed)}
+
+employee_directory = EmployeeDirectory(
+    csv_path=settings.EMPLOYEE_DIRECTORY_CSV,
+    refresh_interval=settings.EMPLOYEE_DIRECTORY_REFRESH_INTERVAL,
+    rebuild_threshold=settings.EMPLOYEE_DIRECTORY_REBUILD_THRESHOLD,
+)
+
+__all__ = ['EmployeeDirectory', 'FieldIndex', 'employee_directory', 'normalize', 'read_csv', 'sync_from_csv']
+
+if __name__ == "__main__":
+    from ..core.database import bootstrap_db
+
+    parser = argparse.ArgumentParser(description="Sync the employees table from a CSV file")
+    parser.add_argument("csv", help="id,name,position,department 헤더가 있는 CSV")
+    args = parser.parse_args()
+    bootstrap_db()
+    print(sync_from_csv(args.csv))
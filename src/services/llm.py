@@ -1,79 +1,402 @@
-from typing import AsyncIterator, Iterator
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, aclosing, contextmanager
+from typing import AsyncIterator, Hashable, Iterator
 from ..core.settings import settings
-from ..models.schema import StreamResponse
-from ..core.exceptions import LLMServiceError
+from fastapi import HTTPException
+from ..models.schema import StreamResponse, ChatRequest, BatchChatItemResult
+from ..core.exceptions import LLMServiceError, InvalidRequestError
+from ..core.metrics import (
+    LLM_TIME_TO_FIRST_TOKEN, LLM_INTER_TOKEN_LATENCY, LLM_TOKENS_PER_SECOND,
+    LLM_GENERATION_DURATION, LLM_GENERATED_TOKENS, LLM_GENERATION_ERRORS
+)
+from ..core.rate_limit import estimate_tokens
+from ..core.tracing import span, record
+from .llm_pool import llm_registry
+from .backends import backend_pool
+from .warmup import model_warmer
+from .cache import response_cache
+from .singleflight import stream_coalescer
+from .scheduler import llm_scheduler, SchedulerSlot, PRIORITY_INTERACTIVE, PRIORITY_BATCH
 
-def get_llm(stream: bool = False):
-    try:
-        return ChatOllama(
-            base_url=settings.OLLAMA_BASE_URL,
-            model=settings.MODEL_NAME,
-            streaming=stream
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def lease_llm(stream: bool = False, base_url: str | None = None) -> Iterator:
+    """커넥션 풀을 가진 클라이언트를 빌려 사용 (with 블록이 끝날 때까지 유휴 정리로 닫히지 않음)"""
+    with ExitStack() as stack:
+        try:
+            # 요청마다 새 클라이언트를 만들지 않고 커넥션 풀을 가진 클라이언트를 재사용
+            with span("llm_init"):
+                llm = stack.enter_context(
+                    llm_registry.lease(base_url or backend_pool.primary.url, settings.MODEL_NAME, stream)
+                )
+        except Exception as e:
+            raise LLMServiceError(f"Failed to initialize LLM service: {str(e)}")
+        yield llm
+
+# 동기 백엔드 폴백용 스레드 풀 (LLM_SYNC_FALLBACK 사용 시에만 생성)
+_sync_executor: ThreadPoolExecutor | None = None
+
+def _get_sync_executor() -> ThreadPoolExecutor:
+    global _sync_executor
+    if _sync_executor is None:
+        _sync_executor = ThreadPoolExecutor(
+            max_workers=settings.LLM_SYNC_MAX_WORKERS,
+            thread_name_prefix="llm-sync"
         )
-    except Exception as e:
-        raise LLMServiceError(f"Failed to initialize LLM service: {str(e)}")
+    return _sync_executor
+
+def shutdown_sync_executor():
+    """동기 폴백 스레드 풀 종료"""
+    global _sync_executor
+    if _sync_executor is not None:
+        _sync_executor.shutdown(wait=False, cancel_futures=True)
+        _sync_executor = None
+
+def build_messages(message: str, system_prompt: str | None = None, history: list | None = None) -> list:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    messages = []
+    if system_prompt:
+        messages.append(SystemMessage(content=system_prompt))
+    if history:
+        messages.extend(history)
+    messages.append(HumanMessage(content=message))
+    return messages
+
+class CacheLookup:
+    """캐시 조회 결과와 응답 저장에 필요한 키/임베딩"""
+
+    def __init__(self):
+        self.response: str | None = None
+        self.key: str | None = None
+        self.scope: int | None = None
+        self.vector = None
+
+async def lookup_cache(message: str, system_prompt: str | None = None, use_cache: bool = True) -> CacheLookup:
+    """완전 일치 캐시, 의미 유사도 캐시 순으로 조회"""
+    lookup = CacheLookup()
+    if not use_cache:
+        return lookup
+
+    if settings.RESPONSE_CACHE_ENABLED:
+        lookup.key = response_cache.make_key(settings.MODEL_NAME, system_prompt, message)
+        if (cached := response_cache.get(lookup.key)) is not None:
+            lookup.response = cached
+            return lookup
+
+    if settings.SEMANTIC_CACHE_ENABLED:
+        # NumPy 등 의미 캐시 의존성은 활성화된 경우에만 불러옴
+        from .semantic_cache import semantic_cache, semantic_scope
 
-def generate_response(message: str, system_prompt: str | None = None) -> str:
+        try:
+            lookup.vector = await semantic_cache.embed(message)
+        except Exception as e:
+            # 임베딩 실패는 캐시를 건너뛸 뿐 요청을 실패시키지 않음
+            logger.warning("Semantic cache embedding failed: %s", e)
+            return lookup
+        lookup.scope = semantic_scope(settings.MODEL_NAME, system_prompt)
+        # 항목이 많으면 행렬 연산이 수 ms 걸리므로 이벤트 루프 밖에서 실행 (NumPy는 GIL을 해제)
+        cached = await asyncio.to_thread(semantic_cache.search, lookup.vector, lookup.scope)
+        if cached is not None:
+            lookup.response = cached
+            if lookup.key:
+                response_cache.set(lookup.key, cached)
+    return lookup
+
+def store_cache(lookup: CacheLookup, text: str):
+    if lookup.key:
+        response_cache.set(lookup.key, text)
+    if lookup.vector is not None:
+        from .semantic_cache import semantic_cache
+        semantic_cache.insert(lookup.vector, lookup.scope, text)
+
+def replay_chunks(text: str) -> Iterator[str]:
+    """캐시된 응답을 스트리밍 청크 단위로 재생"""
+    size = settings.RESPONSE_CACHE_REPLAY_CHUNK_CHARS
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+async def generate_response(
+    message: str,
+    system_prompt: str | None = None,
+    use_cache: bool = True,
+    user: Hashable = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    history: list | None = None,
+    sticky_key: Hashable = None
+) -> str:
+    """비동기 일반 응답 생성 (이벤트 루프를 블로킹하지 않음)
+
+    history(이전 대화 메시지)가 있으면 같은 메시지라도 응답이 달라지므로 캐시를 사용하지 않는다.
+    sticky_key((사용자, 대화 ID))가 있을 때만 같은 대화를 같은 Ollama 서버로 보낸다.
+    """
+    with span("cache"):
+        lookup = await lookup_cache(message, system_prompt, use_cache and not history)
+    if lookup.response is not None:
+        return lookup.response
+
+    # 캐시 미스일 때만 생성 슬롯을 기다림 (대기열이 가득 차면 429/503)
+    with span("queue"):
+        slot = await llm_scheduler.acquire(user, priority)
     try:
-        llm = get_llm()
-        messages = []
-        
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-        messages.append(HumanMessage(content=message))
-        
-        response = llm.invoke(messages)
-        # 응답 텍스트 인코딩 처리
+        backend = backend_pool.acquire(settings.MODEL_NAME, sticky_key=sticky_key)
+        started = time.monotonic()
         try:
-            return response.content.encode().decode('utf-8')
-        except UnicodeError:
-            raise LLMServiceError("Failed to encode model response")
+            with lease_llm(base_url=backend.url) as llm:
+                with span("build"):
+                    messages = build_messages(message, system_prompt, history)
+
+                if settings.LLM_SYNC_FALLBACK:
+                    # 비동기 API를 지원하지 않는 백엔드는 제한된 스레드 풀에서 실행
+                    loop = asyncio.get_running_loop()
+                    response = await loop.run_in_executor(_get_sync_executor(), llm.invoke, messages)
+                else:
+                    response = await llm.ainvoke(messages)
+        except Exception:
+            backend_pool.release(backend, failed=True)
+            LLM_GENERATION_ERRORS.inc(settings.MODEL_NAME, "invoke")
+            raise
+        except BaseException:
+            backend_pool.release(backend)
+            raise
+        latency = time.monotonic() - started
+        backend_pool.release(backend, latency=latency)
+        model_warmer.record_first_response(latency)
+        record("generate", latency)
+        text = response.content
+        LLM_GENERATION_DURATION.observe(latency, settings.MODEL_NAME, "invoke")
+        usage = getattr(response, "usage_metadata", None) or {}
+        LLM_GENERATED_TOKENS.inc(settings.MODEL_NAME, amount=usage.get("output_tokens") or estimate_tokens(text))
+        store_cache(lookup, text)
+        return text
+    except HTTPException:
+        raise
     except Exception as e:
         raise LLMServiceError(f"Failed to generate response: {str(e)}")
+    finally:
+        slot.release()
 
 def generate_stream_sync(message: str, system_prompt: str | None = None) -> Iterator[StreamResponse]:
     """동기적 스트리밍 응답 생성"""
     try:
-        llm = get_llm(stream=True)
-        messages = []
-        
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-        messages.append(HumanMessage(content=message))
-        
-        for chunk in llm.stream(messages):
-            try:
-                encoded_text = chunk.content.encode().decode('utf-8')
-                yield StreamResponse(text=encoded_text, done=False)
-            except UnicodeError:
-                raise LLMServiceError("Failed to encode streaming response")
-                
+        with lease_llm(stream=True) as llm:
+            messages = build_messages(message, system_prompt)
+
+            for chunk in llm.stream(messages):
+                yield StreamResponse(text=chunk.content, done=False)
+
         yield StreamResponse(text="", done=True)
     except Exception as e:
         raise LLMServiceError(f"Failed to generate streaming response: {str(e)}")
 
-async def generate_stream_async(message: str, system_prompt: str | None = None) -> AsyncIterator[StreamResponse]:
-    """비동기적 스트리밍 응답 생성"""
+async def _generate_upstream(
+    message: str,
+    system_prompt: str | None,
+    lookup: CacheLookup,
+    slot: SchedulerSlot,
+    sticky_key: Hashable = None,
+    history: list | None = None
+) -> AsyncIterator[str]:
+    """Ollama 스트리밍 생성 (캐시 저장 포함, 끝나면 생성 슬롯 반납)"""
+    backend = None
+    latency = None
+    failed = False
+    parts = []
+    model = settings.MODEL_NAME
     try:
-        llm = get_llm(stream=True)
-        messages = []
-        
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-        messages.append(HumanMessage(content=message))
-        
-        async for chunk in llm.astream(messages):
-            try:
-                encoded_text = chunk.content.encode().decode('utf-8')
-                yield StreamResponse(text=encoded_text, done=False)
-            except UnicodeError:
-                raise LLMServiceError("Failed to encode streaming response")
-                
-        yield StreamResponse(text="", done=True)
+        backend = backend_pool.acquire(model, sticky_key)
+        started = time.monotonic()
+        # 스트림이 열려 있는 동안 클라이언트가 유휴 정리로 닫히지 않도록 빌려서 사용
+        with lease_llm(stream=True, base_url=backend.url) as llm:
+            with span("build"):
+                messages = build_messages(message, system_prompt, history)
+
+            async for chunk in llm.astream(messages):
+                if latency is None:
+                    latency = time.monotonic() - started
+                    model_warmer.record_first_token(latency)
+                    LLM_TIME_TO_FIRST_TOKEN.observe(latency, model)
+                    record("ttft", latency)
+                text = chunk.content
+                if not text:
+                    continue
+                parts.append(text)
+                yield text
+
+        # 토큰마다 기록하지 않고 생성이 끝난 뒤 한 번에 기록 (Ollama는 청크 하나가 토큰 하나)
+        duration = time.monotonic() - started
+        LLM_GENERATION_DURATION.observe(duration, model, "stream")
+        record("generate", duration)
+        if len(parts) > 1 and duration > latency:
+            inter_token = (duration - latency) / (len(parts) - 1)
+            LLM_INTER_TOKEN_LATENCY.observe(inter_token, model)
+            LLM_TOKENS_PER_SECOND.observe(1 / inter_token, model)
+
+        # 끝까지 생성된 응답만 캐시에 저장
+        store_cache(lookup, "".join(parts))
+    except HTTPException:
+        raise
     except Exception as e:
+        # 첫 토큰 전에 실패한 경우만 서버 장애로 보고 기록 (생성 도중 끊긴 경우는 제외)
+        failed = latency is None
+        LLM_GENERATION_ERRORS.inc(model, "stream")
         raise LLMServiceError(f"Failed to generate streaming response: {str(e)}")
+    finally:
+        if parts:
+            LLM_GENERATED_TOKENS.inc(model, amount=len(parts))
+        if backend is not None:
+            backend_pool.release(backend, latency, failed)
+        slot.release()
+
+class TextStream:
+    """open_text_stream이 반환하는 텍스트 청크 스트림
+
+    생성 슬롯은 스트림을 읽기 시작하면 생성기의 finally에서 반납되지만, 한 번도 읽지 않은 생성기는
+    닫아도 본문이 실행되지 않는다. 이 경우 aclose()가 슬롯을 바로 반납하므로 응답을 시작하기 전에
+    요청이 끝나도 슬롯 회수가 GC에 의존하지 않는다.
+    """
+    __slots__ = ("_chunks", "_slot")
+
+    def __init__(self, chunks: AsyncIterator[str], slot: SchedulerSlot | None = None):
+        self._chunks = chunks
+        self._slot = slot
+
+    def __aiter__(self) -> "TextStream":
+        return self
+
+    def __anext__(self):
+        # 한 번이라도 읽으면 슬롯 반납은 생성기가 맡음 (동일 요청 합치기에서는 생성 태스크가 반납)
+        self._slot = None
+        return self._chunks.__anext__()
+
+    async def aclose(self):
+        slot, self._slot = self._slot, None
+        try:
+            await self._chunks.aclose()
+        finally:
+            if slot is not None:
+                slot.release()
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    for chunk in replay_chunks(text):
+        yield chunk
+
+async def _join_flight(
+    key: str,
+    message: str,
+    system_prompt: str | None,
+    lookup: CacheLookup,
+    slot: SchedulerSlot | None,
+    sticky_key: Hashable = None
+) -> AsyncIterator[str]:
+    started = False
+
+    def start() -> AsyncIterator[str]:
+        nonlocal started
+        started = True
+        return _generate_upstream(message, system_prompt, lookup, slot, sticky_key)
+
+    try:
+        async with aclosing(stream_coalescer.subscribe(key, start)) as stream:
+            async for text in stream:
+                yield text
+    finally:
+        # 그 사이 다른 요청이 같은 생성을 시작해 합류만 한 경우 확보해 둔 슬롯을 반납
+        if slot is not None and not started:
+            slot.release()
+
+async def open_text_stream(
+    message: str,
+    system_prompt: str | None = None,
+    use_cache: bool = True,
+    user: Hashable = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    history: list | None = None,
+    sticky_key: Hashable = None
+) -> TextStream:
+    """스트리밍 응답 준비 (캐시 조회와 생성 슬롯 확보를 마친 뒤 텍스트 청크 스트림을 반환)
+
+    슬롯 확보는 응답을 시작하기 전에 끝나므로 대기열이 가득 차면 429/503 응답을 그대로 돌려줄 수 있다.
+    호출한 쪽은 읽기를 시작하지 않았더라도 반드시 aclose()로 스트림을 닫아 슬롯을 반납해야 한다.
+    캐시 히트와 이미 진행 중인 동일 생성에 합류하는 요청은 슬롯을 사용하지 않는다.
+    이전 대화(history)가 있는 요청은 캐시와 동일 요청 합치기를 사용하지 않는다.
+    """
+    with span("cache"):
+        lookup = await lookup_cache(message, system_prompt, use_cache and not history)
+    if lookup.response is not None:
+        return TextStream(_replay(lookup.response))
+
+    if history or not settings.SINGLEFLIGHT_ENABLED:
+        with span("queue"):
+            slot = await llm_scheduler.acquire(user, priority)
+        return TextStream(_generate_upstream(message, system_prompt, lookup, slot, sticky_key, history), slot)
+
+    # 동시에 들어온 동일 요청은 하나의 업스트림 생성을 공유
+    key = lookup.key or response_cache.make_key(settings.MODEL_NAME, system_prompt, message)
+    slot = None
+    if not stream_coalescer.in_flight(key):
+        with span("queue"):
+            slot = await llm_scheduler.acquire(user, priority)
+    return TextStream(_join_flight(key, message, system_prompt, lookup, slot, sticky_key), slot)
+
+async def generate_text_stream_async(
+    message: str,
+    system_prompt: str | None = None,
+    use_cache: bool = True,
+    user: Hashable = None,
+    priority: int = PRIORITY_INTERACTIVE
+) -> AsyncIterator[str]:
+    """비동기 스트리밍 응답 생성 (텍스트 청크만 전달, 완료 표시는 스트림 종료로 대신함)"""
+    stream = await open_text_stream(message, system_prompt, use_cache, user, priority)
+    async with aclosing(stream) as chunks:
+        async for text in chunks:
+            yield text
+
+async def generate_stream_async(message: str, system_prompt: str | None = None, use_cache: bool = True) -> AsyncIterator[StreamResponse]:
+    """비동기적 스트리밍 응답 생성"""
+    async with aclosing(generate_text_stream_async(message, system_prompt, use_cache)) as stream:
+        async for text in stream:
+            yield StreamResponse(text=text, done=False)
+    yield StreamResponse(text="", done=True)
+
+async def generate_batch(requests: list[ChatRequest], max_concurrency: int | None = None, user: Hashable = None) -> AsyncIterator[BatchChatItemResult]:
+    """여러 요청을 제한된 동시성으로 처리하고 완료되는 순서대로 결과를 반환
+
+    개별 요청의 실패는 해당 항목의 error로만 기록되고 배치 전체를 실패시키지 않는다.
+    """
+    limit = min(max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(index: int, request: ChatRequest) -> BatchChatItemResult:
+        async with semaphore:
+            try:
+                if not request.message.strip():
+                    raise InvalidRequestError("Message cannot be empty")
+                response = await generate_response(
+                    request.message,
+                    request.system_prompt,
+                    use_cache=not request.bypass_cache,
+                    user=user,
+                    priority=PRIORITY_BATCH
+                )
+                return BatchChatItemResult(index=index, response=response)
+            except HTTPException as e:
+                return BatchChatItemResult(index=index, error=e.detail)
+            except Exception as e:
+                return BatchChatItemResult(index=index, error=f"Internal server error: {str(e)}")
+
+    tasks = [asyncio.create_task(run(i, request)) for i, request in enumerate(requests)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # 클라이언트 연결이 끊기는 등 중간에 종료되면 남은 요청 취소
+        for task in tasks:
+            task.cancel()
 
 # 기존 generate_stream을 generate_stream_async로 대체하기 위한 별칭
 generate_stream = generate_stream_async
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+from ..core.settings import settings
+
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama
+
+def keep_alive_value() -> int | str | None:
+    """OLLAMA_KEEP_ALIVE를 Ollama가 받는 형식으로 변환 ("-1" 같은 숫자는 초 단위 정수, 나머지는 "30m" 등 기간 문자열)"""
+    value = settings.OLLAMA_KEEP_ALIVE
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+class LLMClientRegistry:
+    """(base_url, model, streaming) 별로 커넥션 풀을 가진 ChatOllama 클라이언트를 재사용하는 레지스트리
+
+    lease()로 빌려 간 클라이언트는 반납될 때까지 유휴 정리 대상에서 빠지므로, idle_timeout보다 오래
+    열려 있는 스트림의 클라이언트가 도중에 닫히지 않는다.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive: int, keepalive_expiry: float, idle_timeout: float):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.idle_timeout = idle_timeout
+        self._clients: dict[tuple[str, str, bool], "ChatOllama"] = {}
+        self._last_used: dict[tuple[str, str, bool], float] = {}
+        self._in_use: dict[tuple[str, str, bool], int] = {}
+        self._lock = threading.Lock()
+        self._reaper: asyncio.Task | None = None
+
+    def _build(self, base_url: str, model: str, streaming: bool) -> "ChatOllama":
+        # langchain_ollama는 import 비용이 커서 첫 클라이언트 생성 시점에 불러옴
+        import httpx
+        from langchain_ollama import ChatOllama
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return ChatOllama(
+            base_url=base_url,
+            model=model,
+            streaming=streaming,
+            keep_alive=keep_alive_value(),
+            client_kwargs={"limits": limits},
+        )
+
+    def _checkout(self, key: tuple[str, str, bool]) -> "ChatOllama":
+        # self._lock을 잡은 상태에서 호출
+        llm = self._clients.get(key)
+        if llm is None:
+            llm = self._build(*key)
+            self._clients[key] = llm
+        self._last_used[key] = time.monotonic()
+        return llm
+
+    def get(self, base_url: str, model: str, streaming: bool = False) -> "ChatOllama":
+        with self._lock:
+            return self._checkout((base_url, model, streaming))
+
+    @contextmanager
+    def lease(self, base_url: str, model: str, streaming: bool = False) -> Iterator["ChatOllama"]:
+        """사용이 끝날 때까지 닫히지 않는 클라이언트 (스트림을 끝까지 읽은 뒤 반납)"""
+        key = (base_url, model, streaming)
+        with self._lock:
+            llm = self._checkout(key)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield llm
+        finally:
+            with self._lock:
+                remaining = self._in_use.get(key, 0) - 1
+                if remaining > 0:
+                    self._in_use[key] = remaining
+                else:
+                    self._in_use.pop(key, None)
+                # 유휴 시간은 마지막 사용이 끝난 시점부터 계산
+                if key in self._clients:
+                    self._last_used[key] = time.monotonic()
+
+    async def _close_client(self, llm: "ChatOllama"):
+        llm._client.close()
+        await llm._async_client.close()
+
+    async def evict_idle(self) -> int:
+        """idle_timeout 동안 사용되지 않은 클라이언트를 닫고 제거 (빌려 간 클라이언트는 제외)"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [
+                key for key, used in self._last_used.items()
+                if used < deadline and key not in self._in_use
+            ]
+            evicted = [self._clients.pop(key) for key in expired]
+            for key in expired:
+                del self._last_used[key]
+        for llm in evicted:
+            await self._close_client(llm)
+        return len(evicted)
+
+    async def _reap_forever(self):
+        interval = max(self.idle_timeout / 2, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    def start(self):
+        """유휴 클라이언트 정리 태스크 시작 (lifespan에서 호출)"""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def aclose(self):
+        """정리 태스크를 멈추고 모든 클라이언트 연결을 닫음 (lifespan 종료 시 호출)"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._last_used.clear()
+        for llm in clients:
+            await self._close_client(llm)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"clients": len(self._clients), "in_use": sum(self._in_use.values())}
+
+llm_registry = LLMClientRegistry(
+    max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+    max_keepalive=settings.LLM_POOL_MAX_KEEPALIVE,
+    keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+    idle_timeout=settings.LLM_CLIENT_IDLE_TIMEOUT,
+)
+
+__all__ = ['LLMClientRegistry', 'llm_registry', 'keep_alive_value']
@@ -0,0 +1,181 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Hashable
+from ..core.settings import settings
+from ..core.exceptions import ServiceBusyError, TooManyRequestsError
+
+# 우선순위 클래스 (값이 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+class _Waiter:
+    __slots__ = ("user", "priority", "future", "enqueued_at")
+
+    def __init__(self, user: Hashable, priority: int, future: asyncio.Future):
+        self.user = user
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class SchedulerSlot:
+    """확보한 생성 슬롯 (release는 여러 번 호출해도 한 번만 반납)"""
+
+    def __init__(self, scheduler: "LLMScheduler"):
+        self._scheduler = scheduler
+        self._acquired_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release(time.monotonic() - self._acquired_at)
+
+    def __del__(self):
+        # 반납은 스트림의 finally/aclose가 명시적으로 처리하고, 이는 반납이 누락된 경우를 위한 안전장치
+        self.release()
+
+class LLMScheduler:
+    """Ollama로 보내는 생성 요청의 동시 실행 수 제한과 대기열 관리
+
+    슬롯이 모두 사용 중이면 요청은 우선순위 클래스별 대기열에 들어가고, 같은 클래스 안에서는
+    사용자별로 번갈아(라운드 로빈) 슬롯을 받으므로 한 사용자가 대기열을 독점하지 못한다.
+    대기열이 가득 차면 503, 사용자별 대기 한도를 넘으면 429를 Retry-After와 함께 바로 반환하고,
+    queue_timeout 안에 슬롯을 받지 못한 요청은 503으로 실패한다.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_queue_per_user: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        # 우선순위 -> (사용자 -> 대기자 FIFO), 사용자 순서가 라운드 로빈 순서
+        self._queues: dict[int, OrderedDict[Hashable, deque[_Waiter]]] = {p: OrderedDict() for p in PRIORITY_NAMES}
+        self._queued = 0
+        self._queued_per_user: dict[Hashable, int] = {}
+        # 슬롯 점유 시간의 지수 이동 평균 (Retry-After 추정용)
+        self._service_time = 1.0
+        self._waits: deque[float] = deque(maxlen=1024)
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_user_limit = 0
+        self.timed_out = 0
+        self.wait_seconds_total = 0.0
+
+    def _retry_after(self) -> int:
+        estimate = self._service_time * (self._queued + 1) / self.max_concurrency
+        return min(max(math.ceil(estimate), 1), 60)
+
+    def _admit(self, wait: float) -> SchedulerSlot:
+        self.admitted += 1
+        self.wait_seconds_total += wait
+        self._waits.append(wait)
+        return SchedulerSlot(self)
+
+    async def acquire(self, user: Hashable, priority: int = PRIORITY_INTERACTIVE) -> SchedulerSlot:
+        """생성 슬롯을 확보 (대기열이 가득 찼거나 대기 시간이 초과되면 429/503 예외)"""
+        if self._active < self.max_concurrency and self._queued == 0:
+            self._active += 1
+            return self._admit(0.0)
+
+        if self._queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise ServiceBusyError("LLM request queue is full", retry_after=self._retry_after())
+        if self._queued_per_user.get(user, 0) >= self.max_queue_per_user:
+            self.rejected_user_limit += 1
+            raise TooManyRequestsError("Too many queued requests for this user", retry_after=self._retry_after())
+
+        waiter = _Waiter(user, priority, asyncio.get_running_loop().create_future())
+        self._queues[priority].setdefault(user, deque()).append(waiter)
+        self._queued += 1
+        self._queued_per_user[user] = self._queued_per_user.get(user, 0) + 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await asyncio.shield(waiter.future)
+        except TimeoutError:
+            if not self._abandon(waiter):
+                self.timed_out += 1
+                raise ServiceBusyError("Timed out waiting for an LLM slot", retry_after=self._retry_after())
+        except BaseException:
+            if self._abandon(waiter):
+                # 취소된 요청이 넘겨받은 슬롯은 다음 대기자에게 넘김
+                self._release(None)
+            raise
+        return self._admit(time.monotonic() - waiter.enqueued_at)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """대기를 포기한 요청을 대기열에서 제거. 이미 슬롯을 넘겨받은 경우 True"""
+        if waiter.future.done():
+            return True
+        self._dequeue(waiter)
+        waiter.future.cancel()
+        return False
+
+    def _dequeue(self, waiter: _Waiter):
+        queue = self._queues[waiter.priority]
+        waiters = queue[waiter.user]
+        waiters.remove(waiter)
+        if not waiters:
+            del queue[waiter.user]
+        self._queued -= 1
+        remaining = self._queued_per_user[waiter.user] - 1
+        if remaining:
+            self._queued_per_user[waiter.user] = remaining
+        else:
+            del self._queued_per_user[waiter.user]
+
+    def _next_waiter(self) -> _Waiter | None:
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            if queue:
+                # 맨 앞 사용자의 가장 오래된 요청을 꺼내고 그 사용자는 순서의 맨 뒤로 보냄
+                user, waiters = next(iter(queue.items()))
+                waiter = waiters[0]
+                self._dequeue(waiter)
+                if user in queue:
+                    queue.move_to_end(user)
+                return waiter
+        return None
+
+    def _release(self, held: float | None):
+        if held is not None:
+            self._service_time += 0.2 * (held - self._service_time)
+        waiter = self._next_waiter()
+        if waiter is None:
+            self._active -= 1
+        else:
+            # 슬롯을 반납하지 않고 다음 대기자에게 그대로 넘김
+            waiter.future.set_result(None)
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": self._queued,
+            "queued_by_priority": {
+                PRIORITY_NAMES[p]: sum(len(w) for w in queue.values()) for p, queue in self._queues.items()
+            },
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_user_limit": self.rejected_user_limit,
+            "timed_out": self.timed_out,
+            "wait_seconds": {
+                "total": round(self.wait_seconds_total, 3),
+                "p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+                "max_recent": round(waits[-1], 3) if waits else 0.0,
+            },
+        }
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_QUEUE_MAX_SIZE,
+    max_queue_per_user=settings.LLM_QUEUE_MAX_PER_USER,
+    queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+)
+
+__all__ = ['LLMScheduler', 'SchedulerSlot', 'llm_scheduler', 'PRIORITY_INTERACTIVE', 'PRIORITY_BATCH']
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from ..core.settings import settings
+from .cache import normalize_prompt
+
+def semantic_scope(model: str, system_prompt: str | None) -> int:
+    """같은 모델/시스템 프롬프트 안에서만 유사 응답을 재사용하도록 범위를 정수 해시로 표현"""
+    raw = f"{model}\0{normalize_prompt(system_prompt)}".encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little", signed=True)
+
+class HashingEmbedder:
+    """외부 의존성 없는 결정적 임베더 (문자 n-gram 해싱, 테스트/로컬용)"""
+
+    def __init__(self, dim: int = 256, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def embed_sync(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {normalize_prompt(text).lower()} "
+        features = [padded[i:i + self.ngram] for i in range(max(len(padded) - self.ngram + 1, 1))]
+        features += padded.split()
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def embed(self, text: str) -> np.ndarray:
+        return self.embed_sync(text)
+
+class OllamaEmbedder:
+    """Ollama 임베딩 모델을 사용하는 임베더 (운영용)"""
+
+    def __init__(self, base_url: str, model: str):
+        from langchain_ollama import OllamaEmbeddings
+        self._embeddings = OllamaEmbeddings(base_url=base_url, model=model)
+
+    async def embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self._embeddings.aembed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class SemanticCache:
+    """임베딩 유사도 기반 응답 캐시
+
+    정규화된 임베딩을 하나의 연속된 (capacity, dim) 행렬에 저장하고, 조회는 행렬-벡터 곱
+    한 번으로 모든 항목의 코사인 유사도를 계산한다. 용량이 차면 가장 오래 사용되지 않은
+    항목을 덮어쓴다.
+
+    search는 워커 스레드에서, insert는 이벤트 루프에서 실행되므로 상태 변경은 락 안에서 한다.
+    행렬 곱은 락 밖에서 하되, 고른 슬롯이 그사이 덮어쓰였으면(슬롯 버전이 바뀜) 다른 프롬프트의
+    응답을 돌려주지 않도록 미스로 처리한다.
+    """
+
+    def __init__(self, embedder, capacity: int, threshold: float):
+        self.embedder = embedder
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors: np.ndarray | None = None  # 첫 삽입 시 임베딩 차원에 맞춰 할당
+        self._scopes = np.zeros(capacity, dtype=np.int64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._responses: list[str | None] = [None] * capacity
+        self._versions = np.zeros(capacity, dtype=np.int64)  # 슬롯을 덮어쓸 때마다 증가
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        return await self.embedder.embed(text)
+
+    def search(self, vector: np.ndarray, scope: int) -> str | None:
+        with self._lock:
+            vectors, size = self._vectors, self._size
+            if size == 0 or vectors is None or vector.shape[0] != vectors.shape[1]:
+                self.misses += 1
+                return None
+            scopes = self._scopes[:size].copy()
+            versions = self._versions[:size].copy()
+
+        similarities = vectors[:size] @ vector
+        similarities[scopes != scope] = -1.0
+        index = int(np.argmax(similarities))
+
+        with self._lock:
+            if (similarities[index] < self.threshold or self._vectors is not vectors
+                    or self._versions[index] != versions[index]):
+                self.misses += 1
+                return None
+            self._last_used[index] = time.monotonic()
+            self.hits += 1
+            return self._responses[index]
+
+    def insert(self, vector: np.ndarray, scope: int, response: str):
+        with self._lock:
+            if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+                # 임베딩 모델(차원)이 바뀌면 기존 항목은 비교할 수 없으므로 초기화
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+                self._size = 0
+
+            if self._size < self.capacity:
+                index = self._size
+                self._size += 1
+            else:
+                index = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._versions[index] += 1
+            self._vectors[index] = vector
+            self._scopes[index] = scope
+            self._last_used[index] = time.monotonic()
+            self._responses[index] = response
+
+    def save(self, path: str | Path):
+        """웜 리스타트를 위해 현재 항목을 디스크에 저장"""
+        with self._lock:
+            if self._vectors is None:
+                return
+            vectors = self._vectors[:self._size].copy()
+            scopes = self._scopes[:self._size].copy()
+            responses = self._responses[:self._size]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                vectors=vectors,
+                scopes=scopes,
+                responses=np.array(json.dumps(responses, ensure_ascii=False)),
+            )
+
+    def load(self, path: str | Path) -> int:
+        """저장된 스냅샷을 불러오고 불러온 항목 수를 반환"""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        with np.load(path) as data:
+            vectors = data["vectors"][:self.capacity]
+            scopes = data["scopes"][:self.capacity]
+            responses = json.loads(str(data["responses"]))[:self.capacity]
+
+        with self._lock:
+            self._vectors = np.zeros((self.capacity, vectors.shape[1]), dtype=np.float32)
+            self._size = len(vectors)
+            self._vectors[:self._size] = vectors
+            self._scopes[:self._size] = scopes
+            self._last_used[:self._size] = time.monotonic()
+            self._responses[:self._size] = responses
+            self._versions[:self._size] += 1
+            return self._size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def build_embedder():
+    if settings.SEMANTIC_CACHE_EMBEDDER == "hashing":
+        return HashingEmbedder()
+    return OllamaEmbedder(settings.OLLAMA_BASE_URL, settings.SEMANTIC_CACHE_EMBEDDING_MODEL)
+
+semantic_cache = SemanticCache(
+    embedder=build_embedder() if settings.SEMANTIC_CACHE_ENABLED else None,
+    capacity=settings.SEMANTIC_CACHE_CAPACITY,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+)
+
+__all__ = ['SemanticCache', 'HashingEmbedder', 'OllamaEmbedder', 'semantic_cache', 'semantic_scope']
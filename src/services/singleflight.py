@@ -0,0 +1,120 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+from ..core.settings import settings
+
+_END = object()
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # 큐로 전달된(또는 이력에서 직접 읽은) 청크 수
+        self.delivered = 0
+        # 큐가 가득 차서 이력(flight.chunks)에서 직접 따라잡아야 하는 상태
+        self.lagging = True
+
+class _Flight:
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.subscribers: set[_Subscriber] = set()
+        self.task: asyncio.Task | None = None
+        self.finished = False
+        self.error: BaseException | None = None
+
+class StreamCoalescer:
+    """동일한 요청의 스트리밍 생성을 하나로 합쳐 모든 구독자에게 전달 (single-flight)
+
+    첫 요청이 업스트림 생성을 시작하고, 같은 키로 들어온 요청은 그 생성에 구독자로 붙는다.
+    청크는 구독자별 제한된 큐로 전달되며, 늦게 붙은 구독자나 큐가 가득 찬 느린 구독자는
+    지금까지 생성된 청크 이력에서 먼저 따라잡는다. 마지막 구독자가 떠나면 생성을 취소한다.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._flights: dict[str, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+        self.cancelled = 0
+
+    def _publish(self, flight: _Flight, item):
+        for subscriber in flight.subscribers:
+            if subscriber.lagging:
+                continue
+            try:
+                subscriber.queue.put_nowait(item)
+                if item is not _END:
+                    subscriber.delivered += 1
+            except asyncio.QueueFull:
+                subscriber.lagging = True
+
+    async def _run(self, key: str, flight: _Flight, factory: Callable[[], AsyncIterator[str]]):
+        try:
+            async with aclosing(factory()) as upstream:
+                async for chunk in upstream:
+                    flight.chunks.append(chunk)
+                    self._publish(flight, chunk)
+        except asyncio.CancelledError:
+            flight.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.finished = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            self._publish(flight, _END)
+
+    async def subscribe(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, factory))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        subscriber = _Subscriber(self.queue_size)
+        flight.subscribers.add(subscriber)
+        try:
+            while True:
+                if subscriber.lagging and subscriber.queue.empty():
+                    if subscriber.delivered < len(flight.chunks):
+                        chunk = flight.chunks[subscriber.delivered]
+                        subscriber.delivered += 1
+                        yield chunk
+                        continue
+                    if flight.finished:
+                        break
+                    subscriber.lagging = False
+
+                item = await subscriber.queue.get()
+                if item is _END:
+                    break
+                yield item
+
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.subscribers.discard(subscriber)
+            if not flight.subscribers and not flight.finished:
+                # 마지막 구독자가 떠나면 업스트림 생성을 취소
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self.cancelled += 1
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._flights
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "joined": self.joined,
+            "cancelled": self.cancelled,
+        }
+
+stream_coalescer = StreamCoalescer(queue_size=settings.SINGLEFLIGHT_QUEUE_SIZE)
+
+__all__ = ['StreamCoalescer', 'stream_coalescer']
@@ -0,0 +1,133 @@
+import asyncio
+import datetime
+import logging
+import time
+from ..core.settings import settings
+from .backends import BackendPool, backend_pool
+from .llm_pool import keep_alive_value
+
+logger = logging.getLogger(__name__)
+
+def in_business_hours(now: datetime.datetime) -> bool:
+    if settings.OLLAMA_KEEPER_WEEKDAYS_ONLY and now.weekday() >= 5:
+        return False
+    return settings.OLLAMA_KEEPER_START_HOUR <= now.hour < settings.OLLAMA_KEEPER_END_HOUR
+
+class ModelWarmer:
+    """모델 예열과 유지
+
+    서버 시작 시 각 Ollama 서버에 설정된 모델로 아주 짧은 생성을 보내 모델을 메모리에 올리고,
+    업무 시간 동안에는 keep_alive가 끝나기 전에 주기적으로 모델을 다시 건드려 내려가지 않게 한다.
+    시작 후 첫 요청의 첫 토큰까지 걸린 시간을 기록해 예열 효과를 확인할 수 있다.
+    """
+
+    def __init__(self, pool: BackendPool, models: list[str], timeout: float, keeper_interval: float):
+        self.pool = pool
+        self.models = models
+        self.timeout = timeout
+        self.keeper_interval = keeper_interval
+        self._tasks: list[asyncio.Task] = []
+        self.warmup_seconds: dict[str, float] = {}
+        self.warmup_errors = 0
+        self.keeper_touches = 0
+        self.keeper_errors = 0
+        self.first_request_ttft: float | None = None  # 서버 시작 후 첫 스트리밍 요청의 첫 토큰까지 시간
+        self.first_request_latency: float | None = None  # 첫 일반(비스트리밍) 요청의 전체 생성 시간
+
+    def _targets(self) -> list[tuple[str, str]]:
+        return [(backend.url, model) for backend in self.pool.backends for model in self.models if backend.serves(model)]
+
+    async def _request(self, client, url: str, model: str, generate: bool):
+        payload = {"model": model, "stream": False}
+        if (keep_alive := keep_alive_value()) is not None:
+            payload["keep_alive"] = keep_alive
+        if generate:
+            # 토큰 하나만 생성해 모델 로드와 첫 추론 준비까지 끝냄
+            payload.update(prompt="hi", options={"num_predict": 1})
+        response = await client.post(f"{url}/api/generate", json=payload)
+        response.raise_for_status()
+
+    async def warm_up(self):
+        """모든 서버에 설정된 모델을 미리 로드"""
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async def warm(url: str, model: str):
+                started = time.monotonic()
+                try:
+                    await self._request(client, url, model, generate=True)
+                except Exception as e:
+                    self.warmup_errors += 1
+                    logger.warning("Failed to warm up %s on %s: %s", model, url, e)
+                else:
+                    self.warmup_seconds[f"{url} {model}"] = round(time.monotonic() - started, 3)
+
+            await asyncio.gather(*(warm(url, model) for url, model in self._targets()))
+
+    async def touch(self):
+        """생성 없이 모델을 다시 로드 요청해 keep_alive 만료 시각을 연장"""
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async def keep(url: str, model: str):
+                try:
+                    await self._request(client, url, model, generate=False)
+                    self.keeper_touches += 1
+                except Exception as e:
+                    self.keeper_errors += 1
+                    logger.warning("Failed to keep %s loaded on %s: %s", model, url, e)
+
+            await asyncio.gather(*(keep(url, model) for url, model in self._targets()))
+
+    async def _keep_forever(self):
+        while True:
+            await asyncio.sleep(self.keeper_interval)
+            if in_business_hours(datetime.datetime.now()):
+                await self.touch()
+
+    def start(self):
+        """예열과 유지 태스크 시작 (lifespan에서 호출, 예열은 서버 시작을 막지 않음)"""
+        if self._tasks:
+            return
+        if settings.OLLAMA_WARMUP_ENABLED:
+            self._tasks.append(asyncio.create_task(self.warm_up()))
+        if settings.OLLAMA_KEEPER_ENABLED and self.keeper_interval > 0:
+            self._tasks.append(asyncio.create_task(self._keep_forever()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def record_first_token(self, latency: float):
+        if self.first_request_ttft is None:
+            self.first_request_ttft = latency
+
+    def record_first_response(self, latency: float):
+        """일반 응답은 첫 토큰 시점을 알 수 없으므로 TTFT와 따로 전체 생성 시간을 기록"""
+        if self.first_request_latency is None:
+            self.first_request_latency = latency
+
+    def stats(self) -> dict:
+        return {
+            "models": self.models,
+            "keep_alive": keep_alive_value(),
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_errors": self.warmup_errors,
+            "keeper_touches": self.keeper_touches,
+            "keeper_errors": self.keeper_errors,
+            "first_request_ttft_seconds": round(self.first_request_ttft, 4) if self.first_request_ttft is not None else None,
+            "first_request_latency_seconds": (
+                round(self.first_request_latency, 4) if self.first_request_latency is not None else None
+            ),
+        }
+
+model_warmer = ModelWarmer(
+    backend_pool,
+    models=settings.OLLAMA_WARMUP_MODELS or [settings.MODEL_NAME],
+    timeout=settings.OLLAMA_WARMUP_TIMEOUT,
+    keeper_interval=settings.OLLAMA_KEEPER_INTERVAL,
+)
+
+__all__ = ['ModelWarmer', 'model_warmer']
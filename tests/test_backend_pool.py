@@ -0,0 +1,185 @@
+"""여러 Ollama 서버 사이의 부하 분산, 장애 서버 제외/복귀, 대화 고정 라우팅 확인
+
+가짜 Ollama 서버 여러 대를 띄우고, 기본 설정(대화 고정 포함)으로 만든 BackendPool을 생성 경로
+(generate_response/open_text_stream)에 연결해 요청이 어느 서버로 가는지 확인한다. 설정은 import
+시점에 읽히므로 OLLAMA_BACKENDS 대신 풀을 직접 만들어 끼운다.
+
+    python -m unittest discover -s tests -t .
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+SERVERS = 3
+EJECT_AFTER_FAILURES = 2
+EJECT_SECONDS = 0.3
+
+
+class BackendPoolTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = [
+            start_fake_ollama(config=FakeOllamaConfig(ttft=0.05, token_delay=0.005, tokens=5))
+            for _ in range(SERVERS)
+        ]
+        cls.urls = [f"http://127.0.0.1:{server.server_address[1]}" for server in cls.servers]
+        # 설정은 import 시점에 읽으므로 서버 모듈을 불러오기 전에 환경 변수를 지정
+        os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.mkdtemp(prefix="backends-test-")) / "users.db"))
+        os.environ.setdefault("OLLAMA_WARMUP_ENABLED", "false")
+        os.environ.setdefault("OLLAMA_KEEPER_ENABLED", "false")
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+
+    def setUp(self):
+        from src.core.settings import settings
+        from src.services import llm
+        from src.services.backends import Backend, BackendPool
+
+        # 대화 고정은 끄지 않고 기본값 그대로 사용
+        self.assertTrue(settings.OLLAMA_STICKY_ROUTING)
+        self.pool = BackendPool(
+            [Backend(url) for url in self.urls],
+            strategy=settings.OLLAMA_BALANCER,
+            sticky=settings.OLLAMA_STICKY_ROUTING,
+            sticky_max_entries=settings.OLLAMA_STICKY_MAX_ENTRIES,
+            eject_after_failures=EJECT_AFTER_FAILURES,
+            eject_seconds=EJECT_SECONDS,
+            probe_interval=0,
+            probe_timeout=1.0,
+        )
+        # 어떤 대화 키가 어느 서버로 갔는지 기록
+        self.routes: list[tuple[object, str]] = []
+        acquire = self.pool.acquire
+
+        def recording_acquire(model, sticky_key=None):
+            backend = acquire(model, sticky_key)
+            self.routes.append((sticky_key, backend.url))
+            return backend
+
+        self.pool.acquire = recording_acquire
+        patcher = mock.patch.object(llm, "backend_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for server in self.servers:
+            server.RequestHandlerClass.config.error_rate = 0.0
+
+    def _run(self, coro):
+        from src.services.llm_pool import llm_registry
+
+        async def run():
+            try:
+                return await coro
+            finally:
+                # 클라이언트의 커넥션 풀은 이벤트 루프에 묶여 있으므로 테스트마다 닫음
+                await llm_registry.aclose()
+
+        return asyncio.run(run())
+
+    def _requests(self) -> dict[str, int]:
+        return {backend.url: backend.requests for backend in self.pool.backends}
+
+    async def _generate(self, count: int, user: int = 1, prefix: str = "q") -> list[BaseException | str]:
+        from src.services.llm import generate_response
+
+        return await asyncio.gather(
+            *(generate_response(f"{prefix} {i}", use_cache=False, user=user) for i in range(count)),
+            return_exceptions=True,
+        )
+
+    def test_requests_without_conversation_spread_across_backends(self):
+        # 같은 사용자의 요청이라도 대화 ID가 없으면 한 서버에 고정하지 않음
+        results = self._run(self._generate(SERVERS * 3))
+
+        self.assertFalse([r for r in results if isinstance(r, BaseException)])
+        self.assertTrue(all(key is None for key, _ in self.routes))
+        for url, requests in self._requests().items():
+            self.assertGreaterEqual(requests, 2, f"{url} received {requests} requests")
+        self.assertEqual(self.pool.stats()["sticky_entries"], 0)
+
+    def test_failing_backend_is_ejected_and_returns_after_probe(self):
+        from src.core.exceptions import LLMServiceError
+
+        failing = self.pool.backends[0]
+        self.servers[0].RequestHandlerClass.config.error_rate = 1.0
+
+        async def scenario():
+            failed = 0
+            for wave in range(4):
+                results = await self._generate(SERVERS, prefix=f"fail {wave}")
+                failed += sum(isinstance(r, LLMServiceError) for r in results)
+            ejected = self.pool.stats()["backends"][0]
+            requests_when_ejected = failing.requests
+
+            # 제외 시간이 지나도 헬스체크가 실패하는 동안은 요청을 보내지 않음
+            await self.pool.probe_once()
+            self.assertFalse(failing.healthy)
+            await asyncio.sleep(EJECT_SECONDS)
+            while_down = await self._generate(SERVERS, prefix="down")
+            requests_while_down = failing.requests - requests_when_ejected
+
+            # 서버가 복구되면 다음 헬스체크 후 다시 요청을 받음
+            self.servers[0].RequestHandlerClass.config.error_rate = 0.0
+            await self.pool.probe_once()
+            recovered = await self._generate(SERVERS * 2, prefix="recovered")
+            return failed, ejected, requests_when_ejected, while_down, requests_while_down, recovered
+
+        with self.assertLogs("src.services.backends", "WARNING") as logs:
+            failed, ejected, requests_when_ejected, while_down, requests_while_down, recovered = self._run(scenario())
+
+        self.assertEqual(failed, EJECT_AFTER_FAILURES)
+        self.assertTrue(ejected["ejected"])
+        self.assertEqual(ejected["ejections"], 1)
+        self.assertEqual(ejected["failures"], EJECT_AFTER_FAILURES)
+        self.assertFalse([r for r in while_down if isinstance(r, BaseException)])
+        self.assertEqual(requests_while_down, 0)
+        self.assertFalse([r for r in recovered if isinstance(r, BaseException)])
+        self.assertTrue(failing.healthy)
+        self.assertTrue(any("Ejected Ollama backend" in line for line in logs.output))
+        self.assertGreater(failing.requests, requests_when_ejected)
+
+    def test_conversation_turns_stay_on_one_backend(self):
+        from src.services.llm import generate_response, open_text_stream
+
+        conversations = [(1, f"conv-{i}") for i in range(SERVERS)]
+
+        async def stream_turn(key, turn: int) -> str:
+            stream = await open_text_stream(f"{key[1]} turn {turn}", use_cache=False, user=key[0], sticky_key=key)
+            try:
+                return "".join([text async for text in stream])
+            finally:
+                await stream.aclose()
+
+        async def scenario():
+            # 첫 턴을 동시에 보내 대화마다 다른 서버가 배정되게 함
+            await asyncio.gather(*(stream_turn(key, 0) for key in conversations))
+            # 이후 턴은 부하와 관계없이 처음 배정된 서버로 감 (스트리밍/일반 응답 모두)
+            for turn in range(1, 4):
+                await asyncio.gather(*(stream_turn(key, turn) for key in conversations))
+                for key in conversations:
+                    await generate_response(f"{key[1]} reply {turn}", use_cache=False, user=key[0], sticky_key=key)
+                # 대화 없는 요청이 섞여도 고정에 영향을 주지 않음
+                await self._generate(SERVERS, prefix=f"other {turn}")
+
+        self._run(scenario())
+
+        assigned: dict[object, set[str]] = {}
+        for key, url in self.routes:
+            if key is not None:
+                assigned.setdefault(key, set()).add(url)
+        self.assertEqual(set(assigned), set(conversations))
+        for key, urls in assigned.items():
+            self.assertEqual(len(urls), 1, f"{key} was routed to {sorted(urls)}")
+        self.assertEqual(len({next(iter(urls)) for urls in assigned.values()}), SERVERS)
+        self.assertEqual(self.pool.stats()["sticky_entries"], len(conversations))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""직원 검색 인덱스의 접두 일치 순위와 SQLite 변경 로그 정리 확인
+
+완전 일치 -> 글자 단위 접두 일치 -> 자모 단위로만 이어지는 접두 일치 순이고, 같은 단계에서는 짧은 값 ->
+가나다순이어야 한다. 초성 일치와 부분 일치는 그 뒤에 온다. 인덱스에 반영한 employee_changes 로그는
+지워져야 하고, 반영하지 않은 로그가 지워졌으면 전체를 다시 읽어야 한다.
+
+    python -m unittest discover -s tests -t .
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+def _use_temp_database():
+    # 설정은 import 시점에 읽으므로 다른 테스트보다 먼저 실행되어도 저장소의 DB를 쓰지 않게 함
+    os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.mkdtemp(prefix="employees-test-")) / "users.db"))
+    os.environ.setdefault("OLLAMA_WARMUP_ENABLED", "false")
+    os.environ.setdefault("OLLAMA_KEEPER_ENABLED", "false")
+
+
+NAMES = ["김진우", "김진수", "기민", "김기민", "진우 김", "기", "김", "이기자", "갈비"]
+
+
+class EmployeeSearchRankingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        _use_temp_database()
+
+    def setUp(self):
+        from src.services.employees import FieldIndex
+
+        self.index = FieldIndex.build(enumerate(NAMES))
+
+    def _matches(self, query: str) -> list[str]:
+        return list(self.index.matches(query))
+
+    def test_exact_match_comes_before_syllable_prefix(self):
+        # "기"로 시작하는 값이 받침이 붙은 "김..."보다 앞에 오고, 부분 일치는 마지막
+        self.assertEqual(self._matches("기"), ["기", "기민", "김", "김기민", "김진수", "김진우", "진우 김", "이기자"])
+
+    def test_jamo_prefix_comes_after_syllable_prefix(self):
+        # 받침이 다음 글자의 초성인 "기민"은 "김"으로 시작하는 값 뒤에 옴
+        self.assertEqual(self._matches("김"), ["김", "김기민", "김진수", "김진우", "진우 김", "기민"])
+        self.assertEqual(self._matches("기ㅁ"), ["기민", "김", "김기민", "김진수", "김진우", "진우 김"])
+
+    def test_typing_and_initials(self):
+        self.assertEqual(self._matches("김ㅈ"), ["김진수", "김진우"])
+        self.assertEqual(self._matches("ㄱ"), ["기", "김", "갈비", "기민", "김기민", "김진수", "김진우", "진우 김"])
+        self.assertEqual(self._matches("ㄱㅈ"), ["김진수", "김진우"])
+
+    def test_ranking_after_add_and_remove(self):
+        self.index.add("김가", len(NAMES))
+        self.index.remove("김", NAMES.index("김"))
+        self.assertEqual(self._matches("김"), ["김가", "김기민", "김진수", "김진우", "진우 김", "기민"])
+
+        for employee_id, name in enumerate(NAMES):
+            self.index.remove(name, employee_id)
+        self.index.remove("김가", len(NAMES))
+        self.assertEqual(self._matches("김"), [])
+        self.assertEqual((self.index.keys, self.index.word_keys, self.index.grams), ({}, {}, {}))
+
+
+
+class EmployeeChangeLogTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        _use_temp_database()
+        from src.core.database import bootstrap_db
+
+        bootstrap_db()
+
+    def setUp(self):
+        from src.core.database import get_db
+        from src.services.employees import EmployeeDirectory
+
+        self.conn = get_db()
+        with self.conn:
+            self.conn.execute("DELETE FROM employees")
+            self.conn.executemany(
+                "INSERT INTO employees (id, name, position) VALUES (?, ?, '연구원')", list(enumerate(NAMES, start=1))
+            )
+        self.directory = EmployeeDirectory(csv_path=None, refresh_interval=0, rebuild_threshold=100)
+
+    def _log_rows(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM employee_changes").fetchone()[0]
+
+    def _names(self, query: str) -> list[str]:
+        return [row["name"] for row in self.directory.search(query, "name", 0, 20)[0]]
+
+    def test_applied_changes_are_pruned(self):
+        asyncio.run(self.directory.refresh())
+        self.assertEqual(self._log_rows(), 0)
+        pruned = self.directory.changes_pruned
+
+        with self.conn:
+            self.conn.execute("UPDATE employees SET name = '김가' WHERE name = '김'")
+            self.conn.execute("DELETE FROM employees WHERE name = '김기민'")
+        asyncio.run(self.directory.refresh())
+
+        self.assertEqual(self.directory.full_loads, 1)
+        self.assertEqual(self._names("김"), ["김가", "김진수", "김진우", "진우 김", "기민"])
+        self.assertEqual(self._log_rows(), 0)
+        # 이름 변경과 삭제가 하나씩 기록됨
+        self.assertEqual(self.directory.stats()["changes_pruned"] - pruned, 2)
+
+    def test_full_reload_when_unapplied_changes_were_pruned(self):
+        asyncio.run(self.directory.refresh())
+        with self.conn:
+            self.conn.execute("UPDATE employees SET name = '김가' WHERE name = '김'")
+            self.conn.execute("DELETE FROM employee_changes")
+        asyncio.run(self.directory.refresh())
+
+        self.assertEqual(self.directory.full_loads, 2)
+        self.assertEqual(self._names("김가"), ["김가"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""SSE 클라이언트가 연결을 끊으면 업스트림 Ollama 생성이 제한 시간 안에 중단되는지 확인
+
+토큰 간격이 긴 가짜 Ollama 서버와 실제 uvicorn 서버를 띄우고, 스트리밍 응답의 첫 프레임만 받은 뒤 연결을
+끊는다. 가짜 서버는 토큰 사이에 대기하는 동안 연결 종료를 바로 감지하므로, 다음 토큰이 오기 전에 API 서버가
+업스트림 요청을 취소해야 MAX_ABORT_MS 안에 통과한다.
+
+uvicorn은 ASGI spec_version 2.3을 알리므로 Starlette StreamingResponse도 연결 종료 시 응답을 취소한다.
+2.4를 알리는 서버에서는 cancel_on_disconnect만 업스트림을 끊으므로 두 경우를 모두 확인한다.
+
+    python -m unittest discover -s tests -t .
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaConfig, start_fake_ollama
+
+TOKEN_DELAY = 2.0  # MAX_ABORT_MS보다 충분히 길어야 다음 토큰 도착으로 끊기는 경우와 구분됨
+MAX_ABORT_MS = 250
+ROUNDS = 3
+FRAMES_BEFORE_CLOSE = 1
+
+
+class _SpecVersionOverride:
+    """요청 scope의 ASGI spec_version을 바꿔 전달 (None이면 서버 값 그대로)"""
+
+    def __init__(self, app):
+        self.app = app
+        self.spec_version: str | None = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.spec_version is not None:
+            scope = {**scope, "asgi": {**scope.get("asgi", {}), "spec_version": self.spec_version}}
+        await self.app(scope, receive, send)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StreamCancellationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = start_fake_ollama(config=FakeOllamaConfig(ttft=0.02, token_delay=TOKEN_DELAY, tokens=100))
+        # 설정은 import 시점에 읽으므로 서버 모듈을 불러오기 전에 환경 변수를 지정
+        os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{cls.fake.server_address[1]}"
+        os.environ["DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="cancel-test-")) / "users.db")
+        os.environ["OLLAMA_WARMUP_ENABLED"] = "false"
+        os.environ["OLLAMA_KEEPER_ENABLED"] = "false"
+
+        import uvicorn
+        from main import app
+        from src.core.database import bootstrap_db, create_session, get_db
+        from src.services.backends import Backend, backend_pool
+
+        # 다른 테스트가 설정을 먼저 읽었을 수 있으므로 서버 목록도 가짜 서버로 교체
+        cls.backends = backend_pool.backends
+        backend_pool.backends = [Backend(os.environ["OLLAMA_BASE_URL"])]
+        bootstrap_db()
+        user = get_db().execute("SELECT id FROM users WHERE username = ?", ("admin",)).fetchone()
+        cls.headers = {"Authorization": f"Bearer {create_session(user['id'])}"}
+
+        cls.app = _SpecVersionOverride(app)
+        cls.port = _free_port()
+        cls.server = uvicorn.Server(uvicorn.Config(cls.app, host="127.0.0.1", port=cls.port, log_level="warning"))
+        cls.thread = threading.Thread(target=cls.server.run, daemon=True)
+        cls.thread.start()
+        deadline = time.monotonic() + 10
+        while not cls.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("API server did not start")
+            time.sleep(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.should_exit = True
+        cls.thread.join(timeout=5)
+        cls.fake.shutdown()
+        from src.services.backends import backend_pool
+        backend_pool.backends = cls.backends
+
+    async def _disconnect_mid_stream(self, client) -> float:
+        """몇 프레임을 받은 뒤 연결을 끊고, 가짜 서버가 업스트림 종료를 감지하기까지의 시간(ms)"""
+        aborted_before = self.fake.stats.aborted
+        body = {"message": f"cancel {time.time_ns()}", "stream": True, "bypass_cache": True}
+        async with client.stream("POST", "/api/v1/chat", json=body, headers=self.headers) as response:
+            self.assertEqual(response.status_code, 200)
+            received = 0
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    received += 1
+                    if received >= FRAMES_BEFORE_CLOSE:
+                        break
+            closed_at = time.monotonic()
+
+        deadline = closed_at + 5
+        while self.fake.stats.aborted == aborted_before and time.monotonic() < deadline:
+            await asyncio.sleep(0.002)
+        self.assertGreater(self.fake.stats.aborted, aborted_before, "upstream generation was not aborted")
+        return (self.fake.stats.last_aborted_at - closed_at) * 1000
+
+    def _assert_upstream_aborted(self):
+        import httpx
+
+        async def run():
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.port}", timeout=10) as client:
+                latencies = [await self._disconnect_mid_stream(client) for _ in range(ROUNDS)]
+                stats = (await client.get("/api/v1/stats", headers=self.headers)).json()["streams"]
+            return latencies, stats
+
+        completed_before = self.fake.stats.completed
+        cancelled_before = self._streams_cancelled()
+        latencies, stats = asyncio.run(run())
+        for latency in latencies:
+            self.assertLess(latency, MAX_ABORT_MS, f"upstream aborted {latency:.0f}ms after disconnect")
+        self.assertEqual(self.fake.stats.completed, completed_before)
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["cancelled"] - cancelled_before, ROUNDS)
+
+    def _streams_cancelled(self) -> int:
+        from src.api.sse import stream_metrics
+        return stream_metrics.cancelled
+
+    def test_upstream_aborted_after_client_disconnect(self):
+        self.app.spec_version = None
+        self._assert_upstream_aborted()
+
+    def test_upstream_aborted_without_starlette_disconnect_listener(self):
+        # spec_version 2.4에서는 StreamingResponse가 http.disconnect를 기다리지 않음
+        self.app.spec_version = "2.4"
+        try:
+            self._assert_upstream_aborted()
+        finally:
+            self.app.spec_version = None
+
+
+if __name__ == "__main__":
+    unittest.main()